@@ -17,5 +17,48 @@ class Config:
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Cache ('memory' per process, 'sqlite' shared by all workers on a host, 'null' to disable)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'memory'
+    CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH')
+    CACHE_DEFAULT_TTL = 300
+
+    # Quote numbers: QUOTE-0001, or QUOTE-2026-0001 / QUOTE-2026-AB-0001 with the options below
+    QUOTE_NUMBER_PREFIX = 'QUOTE'
+    QUOTE_NUMBER_PER_YEAR = False
+    QUOTE_NUMBER_PER_AGENT = False
+    QUOTE_NUMBER_BLOCK_SIZE = 1  # numbers reserved per worker at a time
+
+    # Request instrumentation (SQL count/time and latency per route)
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', '1') != '0'
+    SQL_INSTRUMENTATION_WINDOW = 1000
+
+    # Generated documents; rendered PDFs are cached under STORAGE_DIR/_cache/pdf
+    STORAGE_DIR = os.environ.get('STORAGE_DIR')
+    PDF_RENDER_CACHE = os.environ.get('PDF_RENDER_CACHE', '1') != '0'
+    PDF_RENDER_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+    # Templates: compiled once per deploy into a bytecode cache and loaded at
+    # startup (auto reload follows DEBUG unless set). The cache defaults to the
+    # instance folder; a shared directory must be private to the app's user.
+    TEMPLATE_BYTECODE_CACHE_DIR = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    TEMPLATE_PRECOMPILE = os.environ.get('TEMPLATE_PRECOMPILE', '1') != '0'
+
+    # WeasyPrint runtime: pdf.css and logos/fonts are read from PDF_ASSET_DIR
+    # (default quote_system/templates/pdf) once per process
+    PDF_ASSET_DIR = os.environ.get('PDF_ASSET_DIR')
+    PDF_WARM_UP_ON_START = os.environ.get('PDF_WARM_UP_ON_START', '0') == '1'
+
+    # Background document jobs: the queue lives in a SQLite file (default
+    # instance/jobs.sqlite3) and `flask run-job-worker` renders the documents.
+    # JOB_WORKER_AUTOSTART runs the worker inside the web process instead.
+    JOB_QUEUE_PATH = os.environ.get('JOB_QUEUE_PATH')
+    JOB_OUTPUT_DIR = os.environ.get('JOB_OUTPUT_DIR')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+    JOB_RESULT_TTL = 24 * 3600  # seconds
+    JOB_WORKER_AUTOSTART = os.environ.get('JOB_WORKER_AUTOSTART', '0') == '1'
+    # Hosts job callbacks may always be sent to (comma-separated); any other
+    # callback host must resolve to public addresses only
+    JOB_CALLBACK_HOSTS = [host.strip() for host in os.environ.get('JOB_CALLBACK_HOSTS', '').split(',') if host.strip()]
+
     # Debug Mode
     DEBUG = True
@@ -0,0 +1,54 @@
+"""Add full-text search index
+
+Revision ID: e4b8d2a61f57
+Revises: c3a7e5f29b18
+Create Date: 2026-10-18 11:42:17.630214
+
+Creates an FTS5 table on SQLite, a tsvector table with a GIN index on
+PostgreSQL, or a plain table elsewhere. Fill it afterwards with
+`flask rebuild-search-index`.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8d2a61f57'
+down_revision = 'c3a7e5f29b18'
+branch_labels = None
+depends_on = None
+
+
+# Schema as of this revision (kept here so later changes to the app's
+# search backends do not change what this migration does)
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "kind UNINDEXED, record_id UNINDEXED, owner_id UNINDEXED, title, body, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS search_document ("
+            "kind VARCHAR(20) NOT NULL, record_id INTEGER NOT NULL, owner_id INTEGER, "
+            "title TEXT NOT NULL DEFAULT '', body TEXT NOT NULL DEFAULT '', "
+            "document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', title), 'A') || "
+            "setweight(to_tsvector('simple', body), 'B')) STORED, "
+            "PRIMARY KEY (kind, record_id))"
+        )
+        op.execute('CREATE INDEX IF NOT EXISTS ix_search_document_document ON search_document USING GIN (document)')
+    else:
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS search_document ("
+            "kind VARCHAR(20) NOT NULL, record_id INTEGER NOT NULL, owner_id INTEGER, "
+            "title TEXT NOT NULL, body TEXT NOT NULL, PRIMARY KEY (kind, record_id))"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS search_index')
+    else:
+        op.execute('DROP TABLE IF EXISTS search_document')
@@ -23,11 +23,41 @@ def create_app(config_class=Config):
 
     # Development mode configuration
     app.config['DEVELOPMENT_MODE'] = True
+
+    # Compiled templates are shared through a bytecode cache (before any render)
+    from quote_system.app.document_generation import templating
+    templating.init_app(app)
     
     # Initialize extensions
     db.init_app(app)
     migrate = Migrate(app, db)
     login_manager.init_app(app)
+
+    # Shared cache for dashboard and reference data
+    from quote_system.app.cache import cache
+    cache.init_app(app)
+
+    # Quote number allocation settings
+    from quote_system.app.services.quote_number_service import quote_number_service
+    quote_number_service.init_app(app)
+
+    # Document storage and the cache of rendered PDFs kept in it
+    from quote_system.app.services.file_storage_service import file_storage_service
+    file_storage_service.init_app(app)
+    from quote_system.app.document_generation.render_cache import render_cache
+    render_cache.init_app(app)
+
+    # Background document rendering (PDF/Excel) and the voucher PDF service
+    from quote_system.app.jobs.queue import job_queue
+    job_queue.init_app(app)
+    from quote_system.app.services.pdf_service import pdf_service
+    pdf_service.init_app(app)
+    from quote_system.app.document_generation.pdf_runtime import pdf_runtime
+    pdf_runtime.init_app(app)
+
+    # Per-request SQL count/latency instrumentation
+    from quote_system.app.instrumentation import init_instrumentation
+    init_instrumentation(app)
     
     # Disable login requirement in development mode
     if app.config['DEVELOPMENT_MODE']:
@@ -55,9 +85,38 @@ def create_app(config_class=Config):
     from quote_system.app.quote_wizard import bp as quote_wizard_bp
     app.register_blueprint(quote_wizard_bp)
 
+    # Full-text search; the index is kept in sync with this app's writes
+    from quote_system.app.search import bp as search_bp
+    from quote_system.app.search import index as search_index
+    search_index.init_app(app)
+    app.register_blueprint(search_bp)
+
+    # Background document jobs (enqueue/status/download)
+    from quote_system.app.jobs import bp as jobs_bp
+    app.register_blueprint(jobs_bp)
+
+    # CLI commands
+    from quote_system.management.commands.quote_metrics import backfill_quote_metrics_command
+    app.cli.add_command(backfill_quote_metrics_command)
+    from quote_system.management.commands.search_index import rebuild_search_index_command
+    app.cli.add_command(rebuild_search_index_command)
+    from quote_system.management.commands.rate_import import import_rates_command
+    app.cli.add_command(import_rates_command)
+    from quote_system.management.commands.job_worker import run_job_worker_command
+    app.cli.add_command(run_job_worker_command)
+
     # Create database tables if they don't exist
     with app.app_context():
         db.create_all()
+        search_index.create_search_schema()
+
+        # Pay template compile cost at startup rather than in the first requests
+        if app.config.get('TEMPLATE_PRECOMPILE', True):
+            templating.precompile_app_templates(app)
+
+        # Job workers warm up on start; the web process only when it renders PDFs itself
+        if app.config.get('PDF_WARM_UP_ON_START'):
+            pdf_runtime.warm_up()
         
         # Create a default user for development
         if app.config['DEVELOPMENT_MODE']:
@@ -0,0 +1,54 @@
+from typing import Any, Dict, Hashable, List, Sequence
+
+# Rooms are filled in passenger order, two to a room
+PASSENGERS_PER_ROOM = 2
+
+
+def split_rooms(passengers: Sequence[Any], per_room: int = PASSENGERS_PER_ROOM) -> List[List[Any]]:
+    """Passengers grouped into rooms."""
+    return [list(passengers[i:i + per_room]) for i in range(0, len(passengers), per_room)]
+
+
+def room_allocations(accommodation_items: Sequence[Any], rooms: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Room allocations for accommodation items.
+
+    Every stay uses the same rooms, so split_rooms() runs once per booking
+    and its result is shared by all items (and all supplier vouchers).
+
+    Args:
+        accommodation_items: Items with start_date, end_date and notes
+        rooms: Output of split_rooms()
+
+    Returns:
+        One dict per item and room: room_number, passengers, check_in,
+        check_out and notes.
+    """
+    return [
+        {
+            'room_number': f'Room {number}',
+            'passengers': room,
+            'check_in': item.start_date,
+            'check_out': item.end_date,
+            'notes': item.notes,
+        }
+        for item in accommodation_items
+        for number, room in enumerate(rooms, 1)
+    ]
+
+
+def passenger_allocations(allocations: Sequence[Dict[str, Any]]) -> Dict[Hashable, List[Dict[str, Any]]]:
+    """Allocations per passenger id, so templates need not search every room for each passenger."""
+    by_passenger: Dict[Hashable, List[Dict[str, Any]]] = {}
+    for allocation in allocations:
+        for passenger in allocation['passengers']:
+            by_passenger.setdefault(passenger.id, []).append(allocation)
+    return by_passenger
+
+
+def group_by_supplier(items: Sequence[Any]) -> Dict[Any, List[Any]]:
+    """Items per supplier_id (None for items without a supplier), in first-seen order."""
+    groups: Dict[Any, List[Any]] = {}
+    for item in items:
+        groups.setdefault(item.supplier_id, []).append(item)
+    return groups
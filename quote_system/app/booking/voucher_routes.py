@@ -1,121 +1,156 @@
-from flask import Blueprint, render_template, jsonify, request, send_file
-from flask_login import login_required
-from quote_system.database.models import db, Booking, Passenger, ItineraryItem, ItineraryItemType
+from flask import Blueprint, abort, render_template, request, jsonify
+from flask_login import login_required, current_user
+from quote_system.database.models import db, Booking, Passenger, ItineraryItem, ItineraryItemType, Supplier
 from datetime import datetime
-from app.services.pdf_service import pdf_service
+from quote_system.app.booking.rooming import group_by_supplier, passenger_allocations, room_allocations, split_rooms
+from quote_system.app.document_generation.booking_pack import Voucher, voucher_documents
+from quote_system.app.jobs.queue import PACK_KIND, job_queue
+from quote_system.app.jobs.routes import job_response
+from quote_system.app.services.pdf_service import pdf_service
 
 voucher_bp = Blueprint('voucher', __name__, url_prefix='/bookings/<int:booking_id>')
 
-@voucher_bp.route('/voucher', methods=['GET'])
-@login_required
-def view_voucher(booking_id):
-    """Display the voucher/rooming list for a booking."""
-    # Get the booking and related data
+VOUCHER_TEMPLATE = 'booking/voucher/voucher.html'
+VOUCHER_BATCH_TEMPLATE = 'booking/voucher/voucher_batch.html'
+# Batch PDF modes: one PDF with a section per supplier, or a zip of one PDF per supplier
+BATCH_MODES = ('combined', 'per_supplier')
+
+
+def _load_booking(booking_id):
+    """Booking, its passengers and accommodation items, loaded once per request."""
     booking = Booking.query.get_or_404(booking_id)
     passengers = Passenger.query.filter_by(booking_id=booking_id).all()
-    
+
     # Get accommodation items
     accommodation_type = ItineraryItemType.query.filter_by(name='Accommodation').first()
     accommodation_items = ItineraryItem.query.filter_by(
         quote_id=booking.quote_id,
         type_id=accommodation_type.id
     ).all()
+    return booking, passengers, accommodation_items
+
 
-    # Prepare room allocation data
-    room_allocations = []
-    for item in accommodation_items:
-        # Calculate number of rooms needed (assuming 2 passengers per room)
-        num_rooms = (len(passengers) + 1) // 2
-        
-        # Create room allocations
-        for i in range(num_rooms):
-            start_idx = i * 2
-            end_idx = min(start_idx + 2, len(passengers))
-            passengers_in_room = passengers[start_idx:end_idx]
-            
-            room_allocations.append({
-                'room_number': f'Room {i+1}',
-                'passengers': passengers_in_room,
-                'check_in': item.start_date,
-                'check_out': item.end_date,
-                'notes': item.notes
-            })
-
-    # Render the HTML template
-    context = {
+def _section_context(booking, passengers, rooms, items, supplier=None):
+    allocations = room_allocations(items, rooms)
+    return {
         'booking': booking,
         'passengers': passengers,
-        'room_allocations': room_allocations,
+        'supplier': supplier,
+        'room_allocations': allocations,
+        'passenger_allocations': passenger_allocations(allocations),
         'datetime': datetime
     }
-    
-    # Generate PDF
-    pdf_bytes = pdf_service.generate_voucher_pdf('booking/voucher/voucher.html', context)
-    
-    # Save PDF to file system
-    pdf_path = pdf_service.save_voucher_pdf(pdf_bytes, booking_id)
-    
-    # Return both HTML and PDF download link
-    return render_template('booking/voucher/voucher.html',
-                         booking=booking,
-                         passengers=passengers,
-                         room_allocations=room_allocations,
-                         pdf_path=pdf_path)
-
-@voucher_bp.route('/voucher/pdf/<int:booking_id>', methods=['GET'])
+
+
+def _voucher_context(booking_id):
+    """Booking, passengers and room allocations shown on the voucher."""
+    booking, passengers, accommodation_items = _load_booking(booking_id)
+    return _section_context(booking, passengers, split_rooms(passengers), accommodation_items)
+
+
+def _voucher_sections(booking_id):
+    """
+    One voucher context per accommodation supplier of the booking.
+
+    The passengers, their room split and the suppliers are loaded once and
+    shared by every section.
+    """
+    booking, passengers, accommodation_items = _load_booking(booking_id)
+    rooms = split_rooms(passengers)
+    groups = group_by_supplier(accommodation_items)
+    supplier_ids = [supplier_id for supplier_id in groups if supplier_id is not None]
+    suppliers = {supplier.id: supplier
+                 for supplier in Supplier.query.filter(Supplier.id.in_(supplier_ids)).all()} if supplier_ids else {}
+    sections = [_section_context(booking, passengers, rooms, items, suppliers.get(supplier_id))
+                for supplier_id, items in groups.items()]
+    return booking, sections
+
+
+def _supplier_vouchers(booking_id, sections):
+    return [
+        Voucher(section['supplier'].name if section['supplier'] else f'booking_{booking_id}',
+                pdf_service.render_voucher_html(VOUCHER_TEMPLATE, section),
+                pdf_service.voucher_cache_key(VOUCHER_TEMPLATE, section))
+        for section in sections
+    ]
+
+
+def booking_vouchers(booking_id, quote_id=None):
+    """
+    One voucher per accommodation supplier of a booking, rendered to HTML
+    for a pack (the PDFs are laid out by the job worker).
+
+    Args:
+        booking_id: Booking whose vouchers are rendered
+        quote_id: When given, abort with 404 unless the booking belongs to this quote
+    """
+    booking, sections = _voucher_sections(booking_id)
+    if quote_id is not None and booking.quote_id != quote_id:
+        abort(404, description="Booking not found.")
+    return _supplier_vouchers(booking_id, sections)
+
+
+def _owner_id():
+    return current_user.id if current_user.is_authenticated else None
+
+
+@voucher_bp.route('/voucher', methods=['GET'])
+@login_required
+def view_voucher(booking_id):
+    """Display the voucher/rooming list for a booking."""
+    return render_template(VOUCHER_TEMPLATE, **_voucher_context(booking_id))
+
+
+@voucher_bp.route('/voucher/pdf', methods=['POST'])
 @login_required
 def download_voucher_pdf(booking_id):
-    """Download the voucher as PDF."""
-    # Get the booking and related data
-    booking = Booking.query.get_or_404(booking_id)
-    passengers = Passenger.query.filter_by(booking_id=booking_id).all()
-    
-    # Get accommodation items
-    accommodation_type = ItineraryItemType.query.filter_by(name='Accommodation').first()
-    accommodation_items = ItineraryItem.query.filter_by(
-        quote_id=booking.quote_id,
-        type_id=accommodation_type.id
-    ).all()
+    """
+    Queue the voucher PDF.
 
-    # Prepare room allocation data
-    room_allocations = []
-    for item in accommodation_items:
-        # Calculate number of rooms needed (assuming 2 passengers per room)
-        num_rooms = (len(passengers) + 1) // 2
-        
-        # Create room allocations
-        for i in range(num_rooms):
-            start_idx = i * 2
-            end_idx = min(start_idx + 2, len(passengers))
-            passengers_in_room = passengers[start_idx:end_idx]
-            
-            room_allocations.append({
-                'room_number': f'Room {i+1}',
-                'passengers': passengers_in_room,
-                'check_in': item.start_date,
-                'check_out': item.end_date,
-                'notes': item.notes
-            })
-
-    # Generate PDF
-    context = {
-        'booking': booking,
-        'passengers': passengers,
-        'room_allocations': room_allocations,
-        'datetime': datetime
-    }
-    pdf_bytes = pdf_service.generate_voucher_pdf('booking/voucher/voucher.html', context)
+    The HTML is rendered here; the WeasyPrint layout runs in the job worker.
+    Responds 202 with the job (see the jobs blueprint for status/download).
+    """
+    context = _voucher_context(booking_id)
+    html = pdf_service.render_voucher_html(VOUCHER_TEMPLATE, context)
+    job = job_queue.enqueue('voucher_pdf', {'html': html, 'name': f'voucher_{booking_id}',
+                                            'cache_key': pdf_service.voucher_cache_key(VOUCHER_TEMPLATE, context)},
+                            owner_id=_owner_id())
+    return job_response(job, 202)
+
+
+@voucher_bp.route('/vouchers', methods=['GET'])
+@login_required
+def view_vouchers(booking_id):
+    """Display the vouchers of every supplier on a booking, one section per supplier."""
+    booking, sections = _voucher_sections(booking_id)
+    return render_template(VOUCHER_BATCH_TEMPLATE, booking=booking, sections=sections, datetime=datetime)
+
+
+@voucher_bp.route('/vouchers/pdf', methods=['POST'])
+@login_required
+def download_vouchers_pdf(booking_id):
+    """
+    Queue the vouchers of every supplier on a booking.
 
-    # Return the PDF as attachment
-    return send_file(
-        pdf_bytes,
-        mimetype='application/pdf',
-        as_attachment=True,
-        download_name=f'voucher_{booking_id}.pdf'
-    )
+    ?mode=combined (default) queues one PDF with a section per supplier;
+    ?mode=per_supplier queues a zip with one PDF per supplier, rendered
+    concurrently by the job worker. Responds 202 with the job.
+    """
+    mode = request.args.get('mode', 'combined')
+    if mode not in BATCH_MODES:
+        return jsonify({'error': f"mode must be one of: {', '.join(BATCH_MODES)}"}), 400
 
-# Register the blueprint in __init__.py
-from app.booking import voucher_bp as voucher_routes
+    booking, sections = _voucher_sections(booking_id)
+    if mode == 'combined':
+        context = {'booking': booking, 'sections': sections, 'datetime': datetime}
+        html = pdf_service.render_voucher_html(VOUCHER_BATCH_TEMPLATE, context)
+        job = job_queue.enqueue('voucher_pdf', {'html': html, 'name': f'vouchers_{booking_id}',
+                                                'cache_key': pdf_service.voucher_cache_key(VOUCHER_BATCH_TEMPLATE,
+                                                                                           context)},
+                                owner_id=_owner_id())
+        return job_response(job, 202)
 
-# Add to the register_blueprints section:
-app.register_blueprint(voucher_routes)
+    job = job_queue.enqueue(PACK_KIND, {'documents': voucher_documents(_supplier_vouchers(booking_id, sections)), 'name': f'vouchers_{booking_id}',
+                                        'filename': f'vouchers_{booking_id}.zip'},
+                            owner_id=_owner_id())
+    return job_response(job, 202)
@@ -0,0 +1,220 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300  # seconds
+DEFAULT_MAX_ENTRIES = 1024
+
+_MISSING = object()
+
+
+class MemoryCache:
+    """In-process LRU cache with a per-entry TTL. Each worker has its own copy."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    Cache stored in a SQLite file, shared by every worker process on a host.
+
+    Values are pickled; expired rows are skipped on read and purged when
+    new values are written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache '
+                         '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Any:
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM cache WHERE key = ? AND expires >= ?',
+                               (key, time.time())).fetchone()
+        return pickle.loads(row[0]) if row else _MISSING
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('DELETE FROM cache WHERE expires < ?', (now,))
+            conn.execute('INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                         (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + ttl))
+
+    def delete_prefix(self, prefix: str) -> None:
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + '%',))
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute('DELETE FROM cache')
+
+
+class Cache:
+    """
+    Namespaced read-through cache with invalidation on model changes.
+
+    Entries live under a namespace ('suppliers', 'dashboard', ...). Models are
+    mapped to the namespaces that depend on them with watch(); when a session
+    that inserted, updated or deleted one of those models commits, the
+    namespaces are cleared. Until init_app() is called a MemoryCache is used.
+
+    Config:
+        CACHE_BACKEND: 'memory' (default), 'sqlite' or 'null' (no caching)
+        CACHE_SQLITE_PATH: file used by the sqlite backend
+        CACHE_DEFAULT_TTL: seconds an entry is kept (default 300)
+        CACHE_MAX_ENTRIES: size of the memory LRU (default 1024)
+    """
+
+    def __init__(self):
+        self.backend = MemoryCache()
+        self.default_ttl = DEFAULT_TTL
+        self.enabled = True
+        self._watched: Dict[type, Tuple[str, ...]] = {}
+        self._listening = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        backend = app.config.get('CACHE_BACKEND', 'memory')
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', DEFAULT_TTL)
+        self.enabled = backend != 'null'
+        if backend == 'sqlite':
+            path = app.config.get('CACHE_SQLITE_PATH') or os.path.join(app.instance_path, 'cache.sqlite3')
+            self.backend = SQLiteCache(path)
+        else:
+            self.backend = MemoryCache(app.config.get('CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+        self._register_listeners()
+        app.extensions['cache'] = self
+
+    def cached(self, namespace: str, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value for namespace/key, calling loader() to fill it on a miss."""
+        if not self.enabled:
+            return loader()
+        full_key = f'{namespace}:{key}'
+        try:
+            value = self.backend.get(full_key)
+        except Exception as e:
+            logger.warning("Cache read failed for '%s': %s", full_key, e)
+            value = _MISSING
+        if value is not _MISSING:
+            return value
+
+        value = loader()
+        try:
+            self.backend.set(full_key, value, self.default_ttl if ttl is None else ttl)
+        except Exception as e:
+            logger.warning("Cache write failed for '%s': %s", full_key, e)
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Drop every entry in the given namespaces."""
+        for namespace in namespaces:
+            try:
+                self.backend.delete_prefix(f'{namespace}:')
+            except Exception as e:
+                logger.warning("Cache invalidation failed for '%s': %s", namespace, e)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def watch(self, model: type, *namespaces: str) -> None:
+        """Invalidate the namespaces whenever rows of model change."""
+        with self._lock:
+            self._watched[model] = tuple(dict.fromkeys(self._watched.get(model, ()) + namespaces))
+        self._register_listeners()
+
+    def _namespaces_for(self, objects: Iterable[Any]) -> set:
+        namespaces = set()
+        for obj in objects:
+            for cls in type(obj).__mro__:
+                namespaces.update(self._watched.get(cls, ()))
+        return namespaces
+
+    def _register_listeners(self) -> None:
+        with self._lock:
+            if self._listening:
+                return
+            self._listening = True
+
+        def collect(session, flush_context):
+            changed = self._namespaces_for(list(session.new) + list(session.dirty) + list(session.deleted))
+            if changed:
+                session.info.setdefault('cache_invalidate', set()).update(changed)
+
+        def committed(session):
+            # Invalidate only once the change is visible to other requests
+            namespaces = session.info.pop('cache_invalidate', None)
+            if namespaces:
+                self.invalidate(*namespaces)
+
+        def rolled_back(session, previous_transaction):
+            session.info.pop('cache_invalidate', None)
+
+        event.listen(Session, 'after_flush', collect)
+        event.listen(Session, 'after_commit', committed)
+        event.listen(Session, 'after_soft_rollback', rolled_back)
+
+
+def snapshot(obj: Any, attributes: Optional[Iterable[str]] = None) -> SimpleNamespace:
+    """
+    Copy a model's column values into a plain object that can be cached.
+
+    Cached values outlive the session that loaded them, so ORM instances
+    are never cached directly.
+    """
+    if attributes is None:
+        attributes = [attr.key for attr in inspect(type(obj)).column_attrs]
+    return SimpleNamespace(**{name: getattr(obj, name) for name in attributes})
+
+
+# Shared cache used by the blueprints
+cache = Cache()
@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import case, func, or_, select
+
+from quote_system.app.cache import cache, snapshot
+from quote_system.database.models import db, Quote, QuoteStatus, Supplier, quote_suppliers
+
+# Statuses counted as "active" on the dashboard
+ACTIVE_STATUSES = (QuoteStatus.DRAFT, QuoteStatus.PENDING)
+
+RECENT_QUOTES_DAYS = 30
+RECENT_QUOTES_LIMIT = 5
+RECENT_ACTIVITY_LIMIT = 10
+TOP_SUPPLIERS_LIMIT = 5
+
+# Dashboard figures are also dropped whenever a quote or supplier changes
+DASHBOARD_TTL = 60
+
+cache.watch(Quote, 'dashboard')
+cache.watch(Supplier, 'dashboard')
+
+
+@dataclass
+class DashboardMetrics:
+    """Figures and lists shown on the agent dashboard."""
+    total_quotes: int = 0
+    active_quotes: int = 0
+    converted_quotes: int = 0
+    conversion_rate: float = 0.0
+    total_revenue: float = 0.0
+    avg_quote_value: float = 0.0
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    recent_quotes: List[Quote] = field(default_factory=list)
+    recent_activity: List[Quote] = field(default_factory=list)
+    top_suppliers: List[Tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def status_data(self) -> Dict[str, list]:
+        """Status breakdown in the labels/data shape used by the chart."""
+        return {
+            'labels': list(self.status_counts),
+            'data': list(self.status_counts.values()),
+        }
+
+    def as_template_context(self) -> Dict:
+        """Shallow dictionary of the metrics for render_template."""
+        context = {f.name: getattr(self, f.name) for f in fields(self)}
+        context['status_data'] = self.status_data
+        return context
+
+
+def load_dashboard_metrics(now: datetime = None) -> DashboardMetrics:
+    """
+    Load the dashboard metrics in three queries, independent of table size.
+
+    One aggregate over quote uses conditional aggregation (SUM(CASE ...)) for
+    the per-status counts and confirmed revenue; one query fetches the quotes
+    for both recent lists; one aggregates the top suppliers.
+    """
+    now = now or datetime.utcnow()
+    metrics = DashboardMetrics()
+
+    status_columns = [
+        func.coalesce(func.sum(case((Quote.status == status, 1), else_=0)), 0)
+        for status in QuoteStatus
+    ]
+    row = db.session.query(
+        func.count(Quote.id),
+        func.coalesce(func.sum(case((Quote.status == QuoteStatus.CONFIRMED, Quote.final_price), else_=0)), 0),
+        func.avg(Quote.final_price),
+        *status_columns
+    ).one()
+    total, revenue, average = row[0], row[1], row[2]
+    by_status = {status: int(count) for status, count in zip(QuoteStatus, row[3:])}
+
+    metrics.total_quotes = total
+    metrics.active_quotes = sum(by_status[status] for status in ACTIVE_STATUSES)
+    metrics.converted_quotes = by_status[QuoteStatus.CONFIRMED]
+    if total:
+        metrics.conversion_rate = round(metrics.converted_quotes / total * 100, 1)
+    metrics.total_revenue = float(revenue or 0)
+    metrics.avg_quote_value = round(float(average or 0), 2)
+    metrics.status_counts = {status.value: count for status, count in by_status.items() if count}
+
+    metrics.recent_quotes, metrics.recent_activity = _load_recent_lists(now)
+
+    metrics.top_suppliers = db.session.query(
+        Supplier.name, func.count(quote_suppliers.c.quote_id).label('quote_count')
+    ).join(quote_suppliers, Supplier.id == quote_suppliers.c.supplier_id)\
+        .group_by(Supplier.name)\
+        .order_by(func.count(quote_suppliers.c.quote_id).desc())\
+        .limit(TOP_SUPPLIERS_LIMIT)\
+        .all()
+    return metrics
+
+
+def cached_dashboard_metrics() -> DashboardMetrics:
+    """load_dashboard_metrics() through the cache, with the quote lists as plain snapshots."""
+    def load():
+        metrics = load_dashboard_metrics()
+        metrics.recent_quotes = [snapshot(quote) for quote in metrics.recent_quotes]
+        metrics.recent_activity = [snapshot(quote) for quote in metrics.recent_activity]
+        metrics.top_suppliers = [tuple(row) for row in metrics.top_suppliers]
+        return metrics
+    return cache.cached('dashboard', 'metrics', load, ttl=DASHBOARD_TTL)
+
+
+def _load_recent_lists(now: datetime) -> Tuple[List[Quote], List[Quote]]:
+    """Fetch the recently created and recently updated quotes with one query."""
+    since = now - timedelta(days=RECENT_QUOTES_DAYS)
+    created = select(Quote.id).where(Quote.created_at >= since)\
+        .order_by(Quote.created_at.desc(), Quote.id.desc())\
+        .limit(RECENT_QUOTES_LIMIT).subquery()
+    updated = select(Quote.id)\
+        .order_by(Quote.updated_at.desc(), Quote.id.desc())\
+        .limit(RECENT_ACTIVITY_LIMIT).subquery()
+
+    # The LIMITed id lists are wrapped as derived tables (MySQL rejects LIMIT directly inside IN)
+    quotes = Quote.query.filter(or_(
+        Quote.id.in_(select(created.c.id)),
+        Quote.id.in_(select(updated.c.id)),
+    )).all()
+
+    recent_quotes = sorted(
+        (quote for quote in quotes if quote.created_at and quote.created_at >= since),
+        key=lambda quote: (quote.created_at, quote.id), reverse=True
+    )[:RECENT_QUOTES_LIMIT]
+    recent_activity = sorted(
+        quotes, key=lambda quote: (quote.updated_at or datetime.min, quote.id), reverse=True
+    )[:RECENT_ACTIVITY_LIMIT]
+    return recent_quotes, recent_activity
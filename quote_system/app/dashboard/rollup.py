@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from sqlalchemy import func
+
+from quote_system.database.models import db, Quote, QuoteMetricsDaily, quote_metrics_key
+
+# Quotes are read in chunks of this size when the rollup is rebuilt
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def backfill_quote_metrics() -> int:
+    """
+    Rebuild quote_metrics_daily from the quote table.
+
+    The aggregation is done in Python over a streamed (created_at, status,
+    final_price) query, so it works the same on SQLite, PostgreSQL and MySQL.
+
+    Returns:
+        Number of rollup rows written.
+    """
+    totals: Dict[tuple, List] = {}
+    rows = db.session.query(Quote.created_at, Quote.status, Quote.final_price)\
+        .execution_options(yield_per=BACKFILL_CHUNK_SIZE)
+    for created_at, status, final_price in rows:
+        key = quote_metrics_key(created_at, status)
+        entry = totals.setdefault(key, [0, 0.0])
+        entry[0] += 1
+        entry[1] += final_price or 0.0
+
+    db.session.query(QuoteMetricsDaily).delete(synchronize_session=False)
+    if totals:
+        db.session.execute(QuoteMetricsDaily.__table__.insert(), [
+            {'day': day, 'status': status, 'quote_count': count, 'total_value': value}
+            for (day, status), (count, value) in totals.items()
+        ])
+    db.session.commit()
+    return len(totals)
+
+
+def daily_totals(start: date, end: date) -> Dict[date, tuple]:
+    """(quote_count, total_value) per day between start and end inclusive, all statuses."""
+    rows = db.session.query(
+        QuoteMetricsDaily.day,
+        func.sum(QuoteMetricsDaily.quote_count),
+        func.sum(QuoteMetricsDaily.total_value),
+    ).filter(QuoteMetricsDaily.day.between(start, end))\
+        .group_by(QuoteMetricsDaily.day)\
+        .all()
+    return {day: (int(count or 0), float(value or 0)) for day, count, value in rows}
+
+
+def _bucketed_series(start: date, end: date, label_for: Callable[[date], str]) -> Dict[str, list]:
+    buckets: Dict[str, list] = OrderedDict()
+    day = start
+    while day <= end:
+        buckets.setdefault(label_for(day), [0, 0.0])
+        day += timedelta(days=1)
+    for day, (count, value) in daily_totals(start, end).items():
+        bucket = buckets[label_for(day)]
+        bucket[0] += count
+        bucket[1] += value
+    return {
+        'labels': list(buckets),
+        'quotes': [count for count, _ in buckets.values()],
+        'revenue': [round(value, 2) for _, value in buckets.values()],
+    }
+
+
+def monthly_series(end: date, months: int = 12) -> Dict[str, list]:
+    """Quote counts and value per calendar month for the last `months` months up to `end`."""
+    first = date(end.year, end.month, 1)
+    for _ in range(months - 1):
+        first = (first - timedelta(days=1)).replace(day=1)
+    return _bucketed_series(first, end, lambda day: day.strftime('%Y-%m'))
+
+
+def weekly_series(end: date, weeks: int = 12) -> Dict[str, list]:
+    """Quote counts and value per ISO week for the last `weeks` weeks up to `end`."""
+    start = end - timedelta(days=end.weekday()) - timedelta(weeks=weeks - 1)
+    return _bucketed_series(start, end, lambda day: '{0}-W{1:02d}'.format(*day.isocalendar()[:2]))
@@ -0,0 +1,218 @@
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class BookingPackError(RuntimeError):
+    """One or more documents of a booking pack failed to render."""
+
+    def __init__(self, failures: List[Tuple[str, str]]):
+        self.failures = failures
+        super().__init__('; '.join(f'{name}: {error}' for name, error in failures))
+
+
+@dataclass
+class PackDocument:
+    """One document of a pack: a job task (see jobs.tasks.TASKS), its payload and its name in the zip."""
+    kind: str
+    payload: Dict[str, Any]
+    filename: str
+
+
+@dataclass
+class Voucher:
+    """A supplier voucher whose HTML was already rendered by the web app."""
+    supplier_name: str
+    html: str
+    cache_key: Optional[str] = None
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^\w.\- ]+', '_', name).strip() or 'document'
+
+
+def booking_pack_documents(quote_data: Dict[str, Any], invoice_data: Optional[Dict[str, Any]] = None,
+                           vouchers: Iterable[Voucher] = ()) -> List[PackDocument]:
+    """
+    The standard documents sent when a booking is confirmed.
+
+    Args:
+        quote_data: Quote data as used by PDFGenerator/ExcelGenerator
+        invoice_data: Invoice data; the invoice is left out when None
+        vouchers: Supplier vouchers
+
+    Returns:
+        PackDocument list: quote, itinerary and invoice PDFs, the Excel
+        itinerary and one voucher PDF per supplier.
+    """
+    number = _safe_name(str(quote_data.get('quote_number') or 'quote'))
+    documents = [
+        PackDocument('quote_pdf', {'data': quote_data}, f'{number}_quote.pdf'),
+        PackDocument('itinerary_pdf', {'data': quote_data}, f'{number}_itinerary.pdf'),
+    ]
+    if invoice_data is not None:
+        documents.append(PackDocument('invoice_pdf', {'data': quote_data, 'invoice': invoice_data},
+                                      f'{number}_invoice.pdf'))
+    documents.append(PackDocument('itinerary_excel', {'data': quote_data}, f'{number}_itinerary.xlsx'))
+    documents.extend(voucher_documents(vouchers, 'vouchers/'))
+    return documents
+
+
+def voucher_documents(vouchers: Iterable[Voucher], folder: str = '') -> List[PackDocument]:
+    """One voucher PDF per supplier, named voucher_<supplier>.pdf under folder."""
+    documents = []
+    for voucher in vouchers:
+        name = f'voucher_{_safe_name(voucher.supplier_name)}'
+        documents.append(PackDocument('voucher_pdf', {'html': voucher.html, 'name': name,
+                                                      'cache_key': voucher.cache_key},
+                                      f'{folder}{name}.pdf'))
+    return documents
+
+
+def _unique_names(documents: List[PackDocument]) -> List[str]:
+    seen: Dict[str, int] = {}
+    names = []
+    for document in documents:
+        name = document.filename
+        if name in seen:
+            seen[name] += 1
+            stem, ext = os.path.splitext(name)
+            name = f'{stem}_{seen[document.filename]}{ext}'
+        else:
+            seen[name] = 1
+        names.append(name)
+    return names
+
+
+def render_pack(documents: List[PackDocument], output: Union[str, BinaryIO], executor: Executor) -> List[str]:
+    """
+    Render all documents concurrently on executor and zip them.
+
+    Each file is streamed into the archive as soon as it is finished, so
+    the pack takes about as long as its slowest document. PDFs and
+    workbooks are already compressed and are stored without recompression.
+
+    Args:
+        documents: Documents to render
+        output: Zip file path or binary file object
+        executor: Process pool running jobs.tasks.run_task
+
+    Returns:
+        Names of the files in the archive, in completion order.
+
+    Raises:
+        BookingPackError: if any document failed (nothing usable is written)
+    """
+    from quote_system.app.jobs.tasks import SUFFIXES, run_task
+
+    names = _unique_names(documents)
+    work_dir = tempfile.mkdtemp(prefix='booking_pack_')
+    try:
+        futures = {}
+        for index, (document, name) in enumerate(zip(documents, names)):
+            path = os.path.join(work_dir, f'{index}{SUFFIXES[document.kind]}')
+            futures[executor.submit(run_task, document.kind, document.payload, path)] = (name, path)
+
+        written, failures = [], []
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for future in as_completed(futures):
+                name, path = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failures.append((name, f'{type(e).__name__}: {e}'))
+                    continue
+                if failures:
+                    continue  # the pack is lost anyway; just wait for the rest
+                with open(path, 'rb') as source, archive.open(name, 'w') as target:
+                    shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+                written.append(name)
+        if failures:
+            raise BookingPackError(failures)
+        return written
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class BookingPackBuilder:
+    """
+    Builds booking packs on a process pool of its own.
+
+    The pool is started on first use and reused across packs (starting
+    rendering processes costs more than a small document); call close()
+    when done. Job workers use render_pack() with their existing pool instead.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, worker_settings: Optional[Dict[str, Any]] = None):
+        self.max_workers = max_workers
+        self.worker_settings = worker_settings
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            from quote_system.app.jobs.tasks import init_worker, worker_settings
+
+            settings = self.worker_settings
+            if settings is None:
+                settings = worker_settings()
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=init_worker, initargs=(settings,))
+        return self._pool
+
+    def build(self, documents: List[PackDocument], output: Union[str, BinaryIO]) -> List[str]:
+        """Render documents into a zip at output; see render_pack()."""
+        return render_pack(documents, output, self._executor())
+
+    def build_and_store(self, documents: List[PackDocument], agent_name: str, quote_number: str,
+                        year: Optional[int] = None) -> Path:
+        """
+        Build a pack and save it with the quote's documents (type 'booking_pack').
+
+        Returns:
+            Path of the stored zip
+        """
+        return store_pack(lambda path: self.build(documents, path), agent_name, quote_number, year)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def store_pack(build, agent_name: str, quote_number: str, year: Optional[int] = None) -> Path:
+    """
+    Build a pack straight into the document store.
+
+    The zip is written under a temporary name next to its final location and
+    renamed when complete, so a failed build never leaves a partial pack.
+
+    Args:
+        build: Callable writing the zip to the path it is given
+    """
+    from quote_system.app.services.file_storage_service import file_storage_service
+
+    year = year or date.today().year
+    directory = file_storage_service.get_storage_path(agent_name, year, quote_number, 'booking_pack')
+    directory.mkdir(parents=True, exist_ok=True)
+    filename = f'{_safe_name(quote_number)}_booking_pack.zip'
+    fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        build(tmp_path)
+        final_path = directory / filename
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return final_path
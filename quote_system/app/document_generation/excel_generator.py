@@ -1,22 +1,79 @@
+import numbers
 import os
-import tempfile
 from datetime import datetime
-from typing import Dict, Optional, List, Any
-import pandas as pd
-import numpy as np
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Optional, List, Any, BinaryIO, Iterable, Sequence, Tuple, Union
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from quote_system.app.document_generation.output import rewound, spooled_buffer, temp_output_path
+
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+# Rows inspected to size the columns before a sheet is streamed out
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 80
+
+COST_BREAKDOWN_COLUMNS = ['name', 'description', 'quantity', 'unit_price', 'total']
+ACCOMMODATION_COLUMNS = ['night', 'date', 'name', 'location', 'room_type']
+
+# (sheet name, header, rows)
+Sheet = Tuple[str, List[str], Iterable[Sequence[Any]]]
+
+
+def _record_columns(records: List[Dict[str, Any]], default: List[str]) -> List[str]:
+    """Union of the record keys in first-seen order (what pandas.DataFrame(records) would use)."""
+    if not records:
+        return list(default)
+    return list(dict.fromkeys(key for record in records for key in record))
+
+
+def _record_rows(records: List[Dict[str, Any]], columns: List[str]):
+    return ([record.get(column) for column in columns] for record in records)
+
+
+def _padded_pairs(inclusions: List[str], exclusions: List[str]):
+    max_len = max(len(inclusions), len(exclusions))
+    inclusions = inclusions + [''] * (max_len - len(inclusions))
+    exclusions = exclusions + [''] * (max_len - len(exclusions))
+    return zip(inclusions, exclusions)
+
+
+def _cell_value(value: Any) -> Any:
+    """Values openpyxl can write as-is; anything else (lists, dicts, enums) is written as text."""
+    if value is None or isinstance(value, (str, bool, datetime)) or hasattr(value, 'isoformat'):
+        return value
+    # Numbers, including Decimal amounts from the money pipeline, stay numeric cells
+    if isinstance(value, (numbers.Real, Decimal)):
+        return value
+    return str(value)
+
 
 class ExcelGenerator:
     """
-    Class for generating Excel documents from quote data using pandas
-    and openpyxl as the Excel engine.
+    Class for generating Excel documents from quote data using openpyxl.
+
+    By default sheets are streamed through write-only worksheets: rows are
+    written as they are produced and column widths come from the header and
+    the first WIDTH_SAMPLE_ROWS rows, so memory stays bounded for large
+    itineraries. streaming=False keeps the older pandas-based writer.
     """
     
-    def __init__(self, templates_dir: str = None):
+    def __init__(self, templates_dir: str = None, streaming: bool = True):
         """
         Initialize the Excel generator with template directory.
         
         Args:
             templates_dir: Directory containing Excel templates (optional)
+            streaming: Use write-only worksheets instead of pandas (default True)
         """
         if templates_dir is None:
             # Default to a templates directory relative to this file
@@ -27,6 +84,135 @@ class ExcelGenerator:
         os.makedirs(templates_dir, exist_ok=True)
             
         self.templates_dir = templates_dir
+        self.streaming = streaming or not HAS_PANDAS
+
+    def write_quote_excel(self, quote_data: Dict[str, Any], output: Union[str, BinaryIO]) -> Union[str, BinaryIO]:
+        """
+        Stream a quote workbook to a path or a writable binary file (e.g. a response stream).
+
+        Returns:
+            The output that was written to
+        """
+        return self._write_workbook(self._quote_sheets(quote_data), output)
+
+    def write_itinerary_excel(self, quote_data: Dict[str, Any], output: Union[str, BinaryIO]) -> Union[str, BinaryIO]:
+        """
+        Stream an itinerary workbook (one sheet per day) to a path or a writable binary file.
+
+        Returns:
+            The output that was written to
+        """
+        return self._write_workbook(self._itinerary_sheets(quote_data), output)
+
+    def quote_excel_buffer(self, quote_data: Dict[str, Any]) -> BinaryIO:
+        """
+        Generate a quote workbook in memory (spilling to disk only when large).
+
+        Returns:
+            Buffer positioned at the start, ready for send_file; close it when done
+        """
+        return rewound(self.write_quote_excel(quote_data, spooled_buffer()))
+
+    def itinerary_excel_buffer(self, quote_data: Dict[str, Any]) -> BinaryIO:
+        """
+        Generate an itinerary workbook in memory (spilling to disk only when large).
+
+        Returns:
+            Buffer positioned at the start, ready for send_file; close it when done
+        """
+        return rewound(self.write_itinerary_excel(quote_data, spooled_buffer()))
+
+    def _quote_sheets(self, quote_data: Dict[str, Any]) -> Iterable[Sheet]:
+        details = self._quote_details(quote_data)
+        yield 'Quote Details', list(details), [list(details.values())]
+
+        cost_breakdown = quote_data.get('cost_breakdown', [])
+        columns = _record_columns(cost_breakdown, COST_BREAKDOWN_COLUMNS)
+        yield 'Cost Breakdown', columns, _record_rows(cost_breakdown, columns)
+
+        yield 'Inclusions & Exclusions', ['Inclusions', 'Exclusions'], _padded_pairs(
+            quote_data.get('inclusions', []), quote_data.get('exclusions', []))
+
+    def _itinerary_sheets(self, quote_data: Dict[str, Any]) -> Iterable[Sheet]:
+        details = self._itinerary_details(quote_data)
+        yield 'Itinerary Overview', list(details), [list(details.values())]
+
+        accommodations = quote_data.get('accommodations', [])
+        columns = _record_columns(accommodations, ACCOMMODATION_COLUMNS)
+        yield 'Accommodations', columns, _record_rows(accommodations, columns)
+
+        for day in quote_data.get('itinerary_days', []):
+            activities = day.get('activities', [])
+            if activities:
+                columns = _record_columns(activities, [])
+                yield f"Day {day.get('day_number', 0)}", columns, _record_rows(activities, columns)
+
+        yield 'Inclusions & Exclusions', ['Inclusions', 'Exclusions'], _padded_pairs(
+            quote_data.get('inclusions', []), quote_data.get('exclusions', []))
+
+    @staticmethod
+    def _quote_details(quote_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'Reference Number': quote_data.get('reference_number', ''),
+            'Client Name': quote_data.get('client_name', ''),
+            'Client Email': quote_data.get('client_email', ''),
+            'Client Phone': quote_data.get('client_phone', ''),
+            'Created Date': quote_data.get('created_at', datetime.now().strftime('%Y-%m-%d')),
+            'Created By': quote_data.get('created_by_name', ''),
+            'Tour Name': quote_data.get('tour_name', ''),
+            'Start Date': quote_data.get('start_date', ''),
+            'End Date': quote_data.get('end_date', ''),
+            'Duration (days)': quote_data.get('duration', 0),
+            'Number of Guests': quote_data.get('pax', 0),
+            'Total Cost': quote_data.get('total_cost', 0),
+            'Cost Per Person': quote_data.get('per_person_cost', 0),
+            'Valid Until': quote_data.get('valid_until', ''),
+            'Version': quote_data.get('version', 1)
+        }
+
+    @staticmethod
+    def _itinerary_details(quote_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'Client Name': quote_data.get('client_name', ''),
+            'Start Date': quote_data.get('start_date', ''),
+            'End Date': quote_data.get('end_date', ''),
+            'Number of Guests': quote_data.get('pax', 0),
+            'Tour Type': quote_data.get('tour_type', 'Custom Safari')
+        }
+
+    def _write_workbook(self, sheets: Iterable[Sheet], output: Union[str, BinaryIO]) -> Union[str, BinaryIO]:
+        workbook = Workbook(write_only=True)
+        header_font = Font(bold=True)
+        for title, header, rows in sheets:
+            worksheet = workbook.create_sheet(title=title[:31])
+            rows = iter(rows)
+            sample = [[_cell_value(value) for value in row] for row in islice(rows, WIDTH_SAMPLE_ROWS)]
+
+            # Widths must be set before the first row: write-only sheets emit <cols> up front
+            widths = [len(str(name)) for name in header]
+            for row in sample:
+                for i, value in enumerate(row):
+                    if value:
+                        length = len(str(value))
+                        if i >= len(widths):
+                            widths.append(length)
+                        elif length > widths[i]:
+                            widths[i] = length
+            for i, width in enumerate(widths, start=1):
+                worksheet.column_dimensions[get_column_letter(i)].width = min(width + 2, MAX_COLUMN_WIDTH)
+
+            header_cells = []
+            for name in header:
+                cell = WriteOnlyCell(worksheet, value=name)
+                cell.font = header_font
+                header_cells.append(cell)
+            worksheet.append(header_cells)
+            for row in sample:
+                worksheet.append(row)
+            for row in rows:
+                worksheet.append([_cell_value(value) for value in row])
+        workbook.save(output)
+        return output
     
     def generate_quote_excel(self, quote_data: Dict[str, Any], 
                            template_name: Optional[str] = None,
@@ -42,34 +228,18 @@ class ExcelGenerator:
         Returns:
             Path to the generated Excel file
         """
-        # Create a Pandas Excel writer using openpyxl as the engine
         if not output_path:
-            # Create a temporary file with .xlsx extension
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-            temp_file.close()
-            output_path = temp_file.name
-        
-        # Create a writer
+            # Temporary .xlsx file, purged automatically if the caller leaves it behind
+            output_path = temp_output_path('.xlsx')
+
+        if self.streaming:
+            return self.write_quote_excel(quote_data, output_path)
+
+        # Create a Pandas Excel writer using openpyxl as the engine
         writer = pd.ExcelWriter(output_path, engine='openpyxl')
         
         # Extract quote details
-        quote_details = {
-            'Reference Number': [quote_data.get('reference_number', '')],
-            'Client Name': [quote_data.get('client_name', '')],
-            'Client Email': [quote_data.get('client_email', '')],
-            'Client Phone': [quote_data.get('client_phone', '')],
-            'Created Date': [quote_data.get('created_at', datetime.now().strftime('%Y-%m-%d'))],
-            'Created By': [quote_data.get('created_by_name', '')],
-            'Tour Name': [quote_data.get('tour_name', '')],
-            'Start Date': [quote_data.get('start_date', '')],
-            'End Date': [quote_data.get('end_date', '')],
-            'Duration (days)': [quote_data.get('duration', 0)],
-            'Number of Guests': [quote_data.get('pax', 0)],
-            'Total Cost': [quote_data.get('total_cost', 0)],
-            'Cost Per Person': [quote_data.get('per_person_cost', 0)],
-            'Valid Until': [quote_data.get('valid_until', '')],
-            'Version': [quote_data.get('version', 1)]
-        }
+        quote_details = {name: [value] for name, value in self._quote_details(quote_data).items()}
         
         # Create DataFrames
         df_details = pd.DataFrame(quote_details)
@@ -79,7 +249,7 @@ class ExcelGenerator:
         if cost_breakdown:
             df_costs = pd.DataFrame(cost_breakdown)
         else:
-            df_costs = pd.DataFrame(columns=['name', 'description', 'quantity', 'unit_price', 'total'])
+            df_costs = pd.DataFrame(columns=COST_BREAKDOWN_COLUMNS)
         
         # Create inclusions and exclusions DataFrames
         inclusions = quote_data.get('inclusions', [])
@@ -143,24 +313,18 @@ class ExcelGenerator:
         Returns:
             Path to the generated Excel file
         """
-        # Create a Pandas Excel writer
         if not output_path:
-            # Create a temporary file with .xlsx extension
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-            temp_file.close()
-            output_path = temp_file.name
-        
-        # Create a writer
+            # Temporary .xlsx file, purged automatically if the caller leaves it behind
+            output_path = temp_output_path('.xlsx')
+
+        if self.streaming:
+            return self.write_itinerary_excel(quote_data, output_path)
+
+        # Create a Pandas Excel writer
         writer = pd.ExcelWriter(output_path, engine='openpyxl')
         
         # Extract itinerary details
-        itinerary_details = {
-            'Client Name': [quote_data.get('client_name', '')],
-            'Start Date': [quote_data.get('start_date', '')],
-            'End Date': [quote_data.get('end_date', '')],
-            'Number of Guests': [quote_data.get('pax', 0)],
-            'Tour Type': [quote_data.get('tour_type', 'Custom Safari')]
-        }
+        itinerary_details = {name: [value] for name, value in self._itinerary_details(quote_data).items()}
         
         # Create DataFrames
         df_details = pd.DataFrame(itinerary_details)
@@ -170,7 +334,7 @@ class ExcelGenerator:
         if accommodations:
             df_accommodations = pd.DataFrame(accommodations)
         else:
-            df_accommodations = pd.DataFrame(columns=['night', 'date', 'name', 'location', 'room_type'])
+            df_accommodations = pd.DataFrame(columns=ACCOMMODATION_COLUMNS)
         
         # Create daily itinerary DataFrames
         itinerary_days = quote_data.get('itinerary_days', [])
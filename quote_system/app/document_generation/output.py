@@ -0,0 +1,78 @@
+import os
+import tempfile
+import threading
+import time
+from typing import BinaryIO
+
+# Generated documents stay in memory up to this size before spilling to an
+# anonymous temp file (which is removed when the buffer is closed)
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Path-based output without an explicit path goes to this directory, and
+# files older than TEMP_FILE_MAX_AGE are purged as new ones are created
+TEMP_DIR_NAME = 'quote_system_documents'
+TEMP_FILE_MAX_AGE = 3600  # seconds
+CLEANUP_INTERVAL = 300  # seconds between purges
+
+_cleanup_lock = threading.Lock()
+_last_cleanup = 0.0
+
+
+def spooled_buffer() -> BinaryIO:
+    """Binary buffer for one generated document, kept in memory while it is small."""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='w+b')
+
+
+def rewound(buffer: BinaryIO) -> BinaryIO:
+    """Seek a written buffer back to the start so it can be read or passed to send_file."""
+    buffer.seek(0)
+    return buffer
+
+
+def temp_output_dir() -> str:
+    path = os.path.join(tempfile.gettempdir(), TEMP_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def temp_output_path(suffix: str) -> str:
+    """
+    Path for a generated document when the caller did not supply one.
+
+    The caller owns the file and should delete it when done; anything left
+    behind is removed by cleanup_temp_outputs() once it is TEMP_FILE_MAX_AGE old.
+    """
+    _maybe_cleanup()
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=temp_output_dir())
+    os.close(fd)
+    return path
+
+
+def cleanup_temp_outputs(max_age: float = TEMP_FILE_MAX_AGE) -> int:
+    """
+    Delete generated documents older than max_age seconds.
+
+    Returns:
+        Number of files removed.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    with os.scandir(temp_output_dir()) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+    return removed
+
+
+def _maybe_cleanup() -> None:
+    global _last_cleanup
+    now = time.monotonic()
+    with _cleanup_lock:
+        if _last_cleanup and now - _last_cleanup < CLEANUP_INTERVAL:
+            return
+        _last_cleanup = now
+    cleanup_temp_outputs()
@@ -1,44 +1,43 @@
 import os
-import tempfile
-from datetime import datetime
-from typing import Dict, Optional, List, Any
-import jinja2
+from datetime import date, datetime
+from typing import Dict, Optional, List, Any, BinaryIO
 
-# Try to import WeasyPrint, but handle import errors gracefully
-try:
-    from weasyprint import HTML, CSS
-    HAS_WEASYPRINT = True
-except (ImportError, OSError):
-    HAS_WEASYPRINT = False
-    print("Warning: WeasyPrint dependencies not available. PDF generation will be limited.")
+from quote_system.app.document_generation.output import rewound, spooled_buffer, temp_output_path
+from quote_system.app.document_generation.pdf_runtime import HAS_WEASYPRINT, pdf_runtime
+from quote_system.app.document_generation.render_cache import RenderCache, render_cache as shared_render_cache
+from quote_system.app.document_generation.templating import DEFAULT_TEMPLATES_DIR, get_environment
 
 
 class PDFGenerator:
     """
     Class for generating PDF documents from quote data using WeasyPrint
     and Jinja2 templates.
+
+    Finished PDFs are kept in a content-addressed render cache, so repeat
+    downloads of an unchanged quote are a file copy rather than a layout.
+    A PDF served from the cache shows the generation date of its first
+    render, not of the download.
     """
     
-    def __init__(self, templates_dir: str = None):
+    def __init__(self, templates_dir: str = None, render_cache: Optional[RenderCache] = None):
         """
         Initialize the PDF generator with template directory.
         
         Args:
             templates_dir: Directory containing Jinja2 templates
+            render_cache: Cache of finished PDFs (defaults to the shared render cache)
         """
         if templates_dir is None:
             # Default to a templates directory relative to this file
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            templates_dir = os.path.join(base_dir, 'templates', 'pdf')
+            templates_dir = DEFAULT_TEMPLATES_DIR
             
         # Create templates directory if it doesn't exist
         os.makedirs(templates_dir, exist_ok=True)
             
         self.templates_dir = templates_dir
-        self.env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(templates_dir),
-            autoescape=True
-        )
+        # Shared with every generator using these templates (compiled once per process)
+        self.env = get_environment(templates_dir)
+        self.render_cache = render_cache if render_cache is not None else shared_render_cache
         
     def generate_quote_pdf(self, quote_data: Dict[str, Any], template_name: str = 'quote.html',
                          output_path: Optional[str] = None) -> str:
@@ -53,38 +52,31 @@ class PDFGenerator:
         Returns:
             Path to the generated PDF file
         """
-        # Render HTML from template
+        # Determine output path
+        if not output_path:
+            # Temporary .pdf file, purged automatically if the caller leaves it behind
+            output_path = temp_output_path('.pdf')
+        
+        return self._cached_pdf(self._cache_key(template_name, quote_data),
+                                lambda: self._render_quote_html(quote_data, template_name), output_path)
+
+    def quote_pdf_buffer(self, quote_data: Dict[str, Any], template_name: str = 'quote.html') -> BinaryIO:
+        """
+        Generate a quote PDF in memory (spilling to disk only when large).
+
+        Returns:
+            Buffer positioned at the start, ready for send_file; close it when done
+        """
+        return self._cached_pdf_buffer(self._cache_key(template_name, quote_data),
+                                       lambda: self._render_quote_html(quote_data, template_name))
+
+    def _render_quote_html(self, quote_data: Dict[str, Any], template_name: str) -> str:
         template = self.env.get_template(template_name)
-        html_content = template.render(
+        return template.render(
             quote=quote_data,
             generation_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             version=quote_data.get('version', 1)
         )
-        
-        # Determine output path
-        if not output_path:
-            # Create a temporary file with .pdf extension
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-            temp_file.close()
-            output_path = temp_file.name
-        
-        if HAS_WEASYPRINT:
-            # Create HTML object for WeasyPrint and generate PDF
-            html = HTML(string=html_content)
-            html.write_pdf(output_path)
-        else:
-            # Fallback: Save HTML content if WeasyPrint is not available
-            html_output_path = output_path.replace('.pdf', '.html')
-            with open(html_output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # Create a placeholder PDF file with a message
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(f"PDF generation not available. HTML content saved to {html_output_path}")
-            
-            print(f"WeasyPrint not available. HTML content saved to {html_output_path}")
-        
-        return output_path
     
     def generate_itinerary_pdf(self, quote_data: Dict[str, Any], template_name: str = 'itinerary.html',
                              output_path: Optional[str] = None) -> str:
@@ -99,6 +91,25 @@ class PDFGenerator:
         Returns:
             Path to the generated PDF file
         """
+        # Determine output path
+        if not output_path:
+            # Temporary .pdf file, purged automatically if the caller leaves it behind
+            output_path = temp_output_path('.pdf')
+        
+        return self._cached_pdf(self._cache_key(template_name, quote_data),
+                                lambda: self._render_itinerary_html(quote_data, template_name), output_path)
+
+    def itinerary_pdf_buffer(self, quote_data: Dict[str, Any], template_name: str = 'itinerary.html') -> BinaryIO:
+        """
+        Generate an itinerary PDF in memory (spilling to disk only when large).
+
+        Returns:
+            Buffer positioned at the start, ready for send_file; close it when done
+        """
+        return self._cached_pdf_buffer(self._cache_key(template_name, quote_data),
+                                       lambda: self._render_itinerary_html(quote_data, template_name))
+
+    def _render_itinerary_html(self, quote_data: Dict[str, Any], template_name: str) -> str:
         # Extract itinerary-specific data
         itinerary_data = {
             'client_name': quote_data.get('client_name', 'Client'),
@@ -114,38 +125,12 @@ class PDFGenerator:
             'exclusions': quote_data.get('exclusions', [])
         }
         
-        # Render HTML from template
         template = self.env.get_template(template_name)
-        html_content = template.render(
+        return template.render(
             itinerary=itinerary_data,
             generation_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             version=quote_data.get('version', 1)
         )
-        
-        # Determine output path
-        if not output_path:
-            # Create a temporary file with .pdf extension
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-            temp_file.close()
-            output_path = temp_file.name
-        
-        if HAS_WEASYPRINT:
-            # Create HTML object for WeasyPrint and generate PDF
-            html = HTML(string=html_content)
-            html.write_pdf(output_path)
-        else:
-            # Fallback: Save HTML content if WeasyPrint is not available
-            html_output_path = output_path.replace('.pdf', '.html')
-            with open(html_output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # Create a placeholder PDF file with a message
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(f"PDF generation not available. HTML content saved to {html_output_path}")
-            
-            print(f"WeasyPrint not available. HTML content saved to {html_output_path}")
-        
-        return output_path
     
     def generate_invoice_pdf(self, quote_data: Dict[str, Any], invoice_data: Dict[str, Any],
                            template_name: str = 'invoice.html',
@@ -162,6 +147,28 @@ class PDFGenerator:
         Returns:
             Path to the generated PDF file
         """
+        # Determine output path
+        if not output_path:
+            # Temporary .pdf file, purged automatically if the caller leaves it behind
+            output_path = temp_output_path('.pdf')
+        
+        return self._cached_pdf(self._invoice_cache_key(quote_data, invoice_data, template_name),
+                                lambda: self._render_invoice_html(quote_data, invoice_data, template_name),
+                                output_path)
+
+    def invoice_pdf_buffer(self, quote_data: Dict[str, Any], invoice_data: Dict[str, Any],
+                           template_name: str = 'invoice.html') -> BinaryIO:
+        """
+        Generate an invoice PDF in memory (spilling to disk only when large).
+
+        Returns:
+            Buffer positioned at the start, ready for send_file; close it when done
+        """
+        return self._cached_pdf_buffer(self._invoice_cache_key(quote_data, invoice_data, template_name),
+                                       lambda: self._render_invoice_html(quote_data, invoice_data, template_name))
+
+    def _render_invoice_html(self, quote_data: Dict[str, Any], invoice_data: Dict[str, Any],
+                             template_name: str) -> str:
         # Combine quote and invoice data
         combined_data = {
             **quote_data,
@@ -178,24 +185,69 @@ class PDFGenerator:
             'payment_instructions': invoice_data.get('payment_instructions', '')
         }
         
-        # Render HTML from template
         template = self.env.get_template(template_name)
-        html_content = template.render(
+        return template.render(
             data=combined_data,
             generation_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         )
-        
-        # Create HTML object for WeasyPrint
-        html = HTML(string=html_content)
-        
-        # Determine output path
-        if not output_path:
-            # Create a temporary file with .pdf extension
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-            temp_file.close()
-            output_path = temp_file.name
+
+    def _cache_key(self, template_name: str, context: Any) -> Optional[str]:
+        # Placeholder output without WeasyPrint is never cached
+        if not (HAS_WEASYPRINT and self.render_cache.enabled):
+            return None
+        return self.render_cache.template_key(self.env, template_name, context, base_dir=self.templates_dir)
+
+    def _invoice_cache_key(self, quote_data: Dict[str, Any], invoice_data: Dict[str, Any],
+                           template_name: str) -> Optional[str]:
+        # The invoice date defaults to today, so an undated invoice is cached per day
+        return self._cache_key(template_name, {'quote': quote_data, 'invoice': invoice_data,
+                                               'invoice_date': invoice_data.get('invoice_date', date.today())})
+
+    def _cached_pdf(self, key: Optional[str], render_html, output_path: str) -> str:
+        if key and self.render_cache.copy_to(key, output_path):
+            return output_path
+        self._write_pdf(render_html(), output_path)
+        if key:
+            self.render_cache.put_file(key, output_path)
+        return output_path
+
+    def _cached_pdf_buffer(self, key: Optional[str], render_html) -> BinaryIO:
+        if key:
+            cached = self.render_cache.open(key)
+            if cached is not None:
+                return cached
+        buffer = self._pdf_buffer(render_html())
+        if key:
+            self.render_cache.put_stream(key, buffer)
+            rewound(buffer)
+        return buffer
+
+    def _write_pdf(self, html_content: str, output_path: str) -> str:
+        if HAS_WEASYPRINT:
+            # Shared fonts, stylesheets and logos (see pdf_runtime)
+            pdf_runtime.write_pdf(html_content, output_path, base_url=self._base_url())
+        else:
+            # Fallback: Save HTML content if WeasyPrint is not available
+            html_output_path = output_path.replace('.pdf', '.html')
+            with open(html_output_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
             
-        # Generate PDF
-        html.write_pdf(output_path)
+            # Create a placeholder PDF file with a message
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(f"PDF generation not available. HTML content saved to {html_output_path}")
+            
+            print(f"WeasyPrint not available. HTML content saved to {html_output_path}")
         
         return output_path
+
+    def _pdf_buffer(self, html_content: str) -> BinaryIO:
+        if not HAS_WEASYPRINT:
+            # A placeholder is fine on disk for development, but not as a served PDF
+            raise RuntimeError('WeasyPrint is not available; cannot generate PDF')
+        buffer = spooled_buffer()
+        pdf_runtime.write_pdf(html_content, buffer, base_url=self._base_url())
+        return rewound(buffer)
+
+    def _base_url(self) -> str:
+        # Relative image/stylesheet links in templates resolve against the templates directory
+        return os.path.abspath(self.templates_dir) + os.sep
@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import time
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Union
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from quote_system.app.document_generation.templating import DEFAULT_TEMPLATES_DIR
+
+# Try to import WeasyPrint, but handle import errors gracefully
+try:
+    from weasyprint import CSS, HTML, default_url_fetcher
+    try:
+        from weasyprint.text.fonts import FontConfiguration
+    except ImportError:  # WeasyPrint < 53
+        from weasyprint.fonts import FontConfiguration
+    HAS_WEASYPRINT = True
+except (ImportError, OSError):
+    HAS_WEASYPRINT = False
+    print("Warning: WeasyPrint dependencies not available. PDF generation will be limited.")
+
+logger = logging.getLogger(__name__)
+
+# Stylesheet applied to every generated PDF when present in the asset directory
+BASE_STYLESHEET = 'pdf.css'
+# Images and fonts under the asset directory are kept in memory after first use
+ASSET_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.woff', '.woff2', '.ttf', '.otf')
+MAX_CACHED_ASSET_BYTES = 32 * 1024 * 1024
+
+# Files under the asset directory that change how a PDF looks
+FINGERPRINT_EXTENSIONS = ASSET_EXTENSIONS + ('.css',)
+
+WARM_UP_HTML = '<html><body><h1>Warm-up</h1><p>Quote <strong>1</strong></p></body></html>'
+
+
+class PDFRuntime:
+    """
+    WeasyPrint state shared by every PDF rendered in this process.
+
+    Font configuration, parsed stylesheets and asset files (logos, web
+    fonts) are loaded once and reused by the quote, itinerary, invoice and
+    voucher PDFs. warm_up() loads all of it up front, so the first document
+    after a deploy does not pay for it.
+    """
+
+    def __init__(self, asset_dir: str = DEFAULT_TEMPLATES_DIR):
+        self.asset_dir = os.path.abspath(asset_dir)
+        self._lock = threading.Lock()
+        self._font_config = None
+        self._css_sources: Dict[str, str] = {}
+        self._stylesheets: Dict[str, Any] = {}
+        self._assets: Dict[str, Dict[str, Any]] = {}
+        self._asset_bytes = 0
+
+    @property
+    def available(self) -> bool:
+        return HAS_WEASYPRINT
+
+    def configure(self, asset_dir: Optional[str] = None) -> None:
+        """Point the runtime at another asset directory (drops everything loaded)."""
+        with self._lock:
+            self.asset_dir = os.path.abspath(asset_dir or DEFAULT_TEMPLATES_DIR)
+            self._stylesheets.clear()
+            self._assets.clear()
+            self._asset_bytes = 0
+
+    def settings(self) -> dict:
+        """Arguments for configure() in another process."""
+        return {'asset_dir': self.asset_dir}
+
+    def init_app(self, app) -> None:
+        self.configure(app.config.get('PDF_ASSET_DIR'))
+        app.extensions['pdf_runtime'] = self
+
+    def register_stylesheet(self, name: str, css: str) -> None:
+        """Make an inline stylesheet available to write_pdf() under name."""
+        with self._lock:
+            if self._css_sources.get(name) != css:
+                self._css_sources[name] = css
+                self._stylesheets.pop(name, None)
+
+    def fingerprint(self, stylesheets: Sequence[str] = (), base_dir: Optional[str] = None) -> str:
+        """
+        Digest of everything outside the template that write_pdf() uses: the
+        registered stylesheets named in stylesheets, and the name, size and
+        mtime of every stylesheet, image and font file under the asset
+        directory (and base_dir, when relative links resolve elsewhere).
+        Editing pdf.css or replacing a logo changes the fingerprint.
+        """
+        digest = hashlib.sha256()
+        with self._lock:
+            css_sources = dict(self._css_sources)
+        for ref in (BASE_STYLESHEET, *stylesheets):
+            digest.update(f'{ref}\0{css_sources.get(ref, "")}\0'.encode())
+        directories = [self.asset_dir]
+        if base_dir and os.path.abspath(base_dir) != self.asset_dir:
+            directories.append(os.path.abspath(base_dir))
+        for directory in directories:
+            for root, dirs, files in os.walk(directory):
+                dirs.sort()
+                for filename in sorted(files):
+                    if not filename.lower().endswith(FINGERPRINT_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    digest.update(f'{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0'.encode())
+        return digest.hexdigest()
+
+    def font_config(self):
+        with self._lock:
+            if self._font_config is None:
+                self._font_config = FontConfiguration()
+            return self._font_config
+
+    def stylesheet(self, ref: str):
+        """
+        Parsed stylesheet for a registered name or a file in the asset
+        directory; None when there is no such file.
+        """
+        with self._lock:
+            if ref in self._stylesheets:
+                return self._stylesheets[ref]
+        if ref in self._css_sources:
+            sheet = CSS(string=self._css_sources[ref], font_config=self.font_config())
+        else:
+            path = os.path.join(self.asset_dir, ref)
+            if not os.path.isfile(path):
+                sheet = None
+            else:
+                sheet = CSS(filename=path, font_config=self.font_config(), url_fetcher=self.fetch)
+        with self._lock:
+            self._stylesheets[ref] = sheet
+        return sheet
+
+    def stylesheets(self, refs: Sequence[str] = ()) -> List[Any]:
+        """Base stylesheet plus refs, parsed (missing files are skipped)."""
+        sheets = [self.stylesheet(ref) for ref in (BASE_STYLESHEET, *refs)]
+        return [sheet for sheet in sheets if sheet is not None]
+
+    def fetch(self, url: str, *args, **kwargs) -> Dict[str, Any]:
+        """
+        WeasyPrint URL fetcher that serves files from the asset directory from
+        memory after the first read; other URLs go to the default fetcher.
+        """
+        path = self._asset_path(url)
+        if path is None:
+            return default_url_fetcher(url, *args, **kwargs)
+        with self._lock:
+            cached = self._assets.get(path)
+        if cached is None:
+            cached = self._load_asset(path, url)
+        return dict(cached)
+
+    def _asset_path(self, url: str) -> Optional[str]:
+        parsed = urlparse(url)
+        if parsed.scheme != 'file':
+            return None
+        path = os.path.abspath(url2pathname(parsed.path))
+        if not path.startswith(self.asset_dir + os.sep) or not path.lower().endswith(ASSET_EXTENSIONS):
+            return None
+        return path
+
+    def _load_asset(self, path: str, url: str) -> Dict[str, Any]:
+        with open(path, 'rb') as f:
+            content = f.read()
+        asset = {'string': content, 'mime_type': mimetypes.guess_type(path)[0], 'redirected_url': url}
+        with self._lock:
+            if self._asset_bytes + len(content) <= MAX_CACHED_ASSET_BYTES:
+                self._assets[path] = asset
+                self._asset_bytes += len(content)
+        return asset
+
+    def write_pdf(self, html_content: str, output: Union[str, BinaryIO], stylesheets: Sequence[str] = (),
+                  base_url: Optional[str] = None) -> Union[str, BinaryIO]:
+        """
+        Lay out HTML as a PDF with the shared fonts, stylesheets and assets.
+
+        Args:
+            html_content: Rendered HTML
+            output: File path or binary file object
+            stylesheets: Registered stylesheet names or asset-relative CSS files,
+                applied after the base stylesheet
+            base_url: Base for relative URLs in the HTML (defaults to the asset directory)
+
+        Returns:
+            output
+        """
+        if not HAS_WEASYPRINT:
+            raise RuntimeError('WeasyPrint is not available; cannot generate PDF')
+        document = HTML(string=html_content, base_url=base_url or self.asset_dir + os.sep, url_fetcher=self.fetch)
+        document.write_pdf(output, stylesheets=self.stylesheets(stylesheets), font_config=self.font_config())
+        return output
+
+    def warm_up(self, stylesheets: Sequence[str] = ()) -> float:
+        """
+        Load fonts, stylesheets and assets and lay out a small document, so
+        the first real PDF in this process is as fast as the rest.
+
+        Args:
+            stylesheets: Extra stylesheets to parse (registered ones always are)
+
+        Returns:
+            Seconds spent.
+        """
+        if not HAS_WEASYPRINT:
+            return 0.0
+        started = time.perf_counter()
+        for name in list(self._css_sources) + list(stylesheets):
+            self.stylesheet(name)
+        if os.path.isdir(self.asset_dir):
+            for root, _, files in os.walk(self.asset_dir):
+                for filename in files:
+                    path = os.path.join(root, filename)
+                    if filename.lower().endswith(ASSET_EXTENSIONS):
+                        try:
+                            self._load_asset(path, 'file://' + path)
+                        except OSError as e:
+                            logger.warning("Could not preload PDF asset %s: %s", path, e)
+        # The first layout initialises Pango/HarfBuzz and resolves the fonts
+        self.write_pdf(WARM_UP_HTML, _NullWriter())
+        elapsed = time.perf_counter() - started
+        logger.info("PDF runtime warmed up in %.2fs", elapsed)
+        return elapsed
+
+
+class _NullWriter:
+    """Write target that discards the warm-up PDF."""
+
+    def write(self, data) -> int:
+        return len(data)
+
+
+# Shared runtime for this process (web app or job worker)
+pdf_runtime = PDFRuntime()
@@ -0,0 +1,248 @@
+import enum
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import types
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, BinaryIO, Optional, Sequence, Set
+
+from jinja2 import Environment, meta
+
+from sqlalchemy import inspect as sa_inspect
+
+from quote_system.app.document_generation.pdf_runtime import pdf_runtime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_NAMESPACE = 'pdf'
+
+# Bump when something that affects the PDF changes but is covered neither by
+# the templates nor by pdf_runtime.fingerprint() (e.g. system fonts, WeasyPrint)
+TEMPLATE_VERSION = 1
+
+
+# Many-to-one relationships followed from each model in a context (templates
+# use e.g. booking.client.name, which is not a column of booking)
+RELATIONSHIP_DEPTH = 1
+
+
+def normalize(value: Any, relationship_depth: int = RELATIONSHIP_DEPTH) -> Any:
+    """
+    Reduce a template context to JSON-serializable data with a stable form.
+
+    Model instances become their column values plus the rows they reference
+    through many-to-one relationships (up to relationship_depth hops), so a
+    voucher is re-rendered when the booking or its client changes but not
+    when an unrelated object does. Collections are not followed; pass the
+    rows a template lists (passengers, items) in the context itself.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): normalize(item, relationship_depth) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item, relationship_depth) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((normalize(item, relationship_depth) for item in value), key=repr)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return normalize(value.value)
+    if isinstance(value, (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType)):
+        return f'<{getattr(value, "__name__", repr(value))}>'
+    if hasattr(value, '__mapper__'):
+        mapper = sa_inspect(value).mapper
+        data = {'__model__': type(value).__name__,
+                **{attr.key: normalize(getattr(value, attr.key)) for attr in mapper.column_attrs}}
+        if relationship_depth > 0:
+            for relationship in mapper.relationships:
+                if not relationship.uselist:
+                    data[relationship.key] = normalize(getattr(value, relationship.key), relationship_depth - 1)
+        return data
+    return repr(value)
+
+
+def template_source(env: Environment, template_name: str, seen: Optional[Set[str]] = None) -> str:
+    """Source of a template followed by every template it extends, includes or imports."""
+    seen = set() if seen is None else seen
+    seen.add(template_name)
+    source = env.loader.get_source(env, template_name)[0]
+    parts = [source]
+    for name in sorted(filter(None, meta.find_referenced_templates(env.parse(source)))):
+        if name not in seen:
+            parts.append(template_source(env, name, seen))
+    return '\n'.join(parts)
+
+
+class RenderCache:
+    """
+    Finished PDFs stored by content hash in a FileStorageService cache directory.
+
+    A key (see template_key) covers the template and every template it
+    references, the pdf_runtime stylesheets and asset files, TEMPLATE_VERSION
+    and the normalized context, so a hit is the same document a fresh render
+    would give, except that it keeps the generation date of its first render. Hits refresh the file's mtime;
+    when the directory grows past max_bytes the least recently used files
+    are removed. Any process pointing at the same directory shares the cache.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = None
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if directory:
+            self.configure(directory, max_bytes)
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def init_app(self, app) -> None:
+        if not app.config.get('PDF_RENDER_CACHE', True):
+            self.directory = None
+            return
+        from quote_system.app.services.file_storage_service import file_storage_service
+
+        self.configure(str(file_storage_service.get_cache_path(CACHE_NAMESPACE)),
+                       app.config.get('PDF_RENDER_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        app.extensions['render_cache'] = self
+
+    def configure(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Point the cache at a directory (used directly by job worker processes)."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def settings(self) -> Optional[dict]:
+        """Arguments for configure() in another process, or None when disabled."""
+        return {'directory': self.directory, 'max_bytes': self.max_bytes} if self.enabled else None
+
+    def key(self, template_source: str, context: Any, template_version: Any = TEMPLATE_VERSION) -> str:
+        digest = hashlib.sha256()
+        digest.update(str(template_version).encode())
+        digest.update(b'\0')
+        digest.update(template_source.encode())
+        digest.update(b'\0')
+        digest.update(json.dumps(normalize(context), sort_keys=True, separators=(',', ':')).encode())
+        return digest.hexdigest()
+
+    def template_key(self, env: Environment, template_name: str, context: Any,
+                     stylesheets: Sequence[str] = (), base_dir: Optional[str] = None) -> Optional[str]:
+        """
+        Key for a PDF rendered from template_name, or None when the cache is disabled.
+
+        Used by every PDF path (quotes, itineraries, invoices, vouchers), so
+        they all invalidate on the same changes.
+
+        Args:
+            env: Jinja environment the template is loaded from
+            template_name: Template rendered to HTML
+            context: Values the template is rendered with
+            stylesheets: Stylesheets passed to pdf_runtime.write_pdf()
+            base_dir: Directory relative links in the HTML resolve against
+        """
+        if not self.enabled:
+            return None
+        return self.key(template_source(env, template_name),
+                        {'template': template_name, 'context': context,
+                         'runtime': pdf_runtime.fingerprint(stylesheets, base_dir)})
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.pdf')
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached PDF for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return path
+
+    def copy_to(self, key: str, output_path: str) -> bool:
+        """Copy the cached PDF to output_path; False on a miss."""
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, output_path)
+        except FileNotFoundError:  # evicted by another process in between
+            return False
+        return True
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open the cached PDF for reading; None on a miss."""
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            return None
+
+    def put_file(self, key: str, source_path: str) -> None:
+        if not self.enabled:
+            return
+        with open(source_path, 'rb') as source:
+            self.put_stream(key, source)
+
+    def put_stream(self, key: str, stream: BinaryIO) -> None:
+        """Store the rest of stream under key (the caller rewinds it afterwards)."""
+        if not self.enabled:
+            return
+        try:
+            # Write under a temporary name and rename, so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            with os.fdopen(fd, 'wb') as tmp:
+                shutil.copyfileobj(stream, tmp)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning("Could not store rendered PDF %s: %s", key, e)
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove least recently used PDFs until the cache fits in max_bytes.
+
+        Returns:
+            Number of files removed.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if not entry.name.endswith('.pdf'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+            return removed
+
+
+# Shared cache used by the PDF generator, the voucher service and job workers
+render_cache = RenderCache()
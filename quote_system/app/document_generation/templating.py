@@ -0,0 +1,124 @@
+import logging
+import os
+import threading
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import jinja2
+
+logger = logging.getLogger(__name__)
+
+# PDF templates used by PDFGenerator (quote_system/templates/pdf)
+DEFAULT_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'templates', 'pdf')
+# Bytecode cache directory under the app's instance folder. Compiled bytecode
+# is executed when loaded, so the directory must only be writable by the app.
+INSTANCE_BYTECODE_CACHE_DIR = 'template_bytecode'
+
+_lock = threading.Lock()
+_environments: Dict[Tuple[Tuple[str, ...], bool], jinja2.Environment] = {}
+_settings = {'bytecode_cache_dir': None, 'auto_reload': True}
+_bytecode_cache: Optional[jinja2.FileSystemBytecodeCache] = None
+
+
+def configure(bytecode_cache_dir: Optional[str] = None, auto_reload: bool = True) -> None:
+    """
+    Set where compiled templates are cached and whether template files are
+    re-checked for changes. Call before the first get_environment().
+
+    Args:
+        bytecode_cache_dir: Directory shared by every process of a deploy.
+            Without one, Jinja's per-user cache directory (mode 0700) is used.
+        auto_reload: Check template mtimes on each load (development);
+            without it templates are compiled once per process
+    """
+    global _bytecode_cache
+    with _lock:
+        _settings['bytecode_cache_dir'] = bytecode_cache_dir
+        _settings['auto_reload'] = auto_reload
+        _bytecode_cache = None
+        _environments.clear()
+
+
+def settings() -> dict:
+    """Arguments for configure() in another process."""
+    return dict(_settings)
+
+
+def bytecode_cache() -> jinja2.FileSystemBytecodeCache:
+    global _bytecode_cache
+    if _bytecode_cache is None:
+        directory = _settings['bytecode_cache_dir']
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            _bytecode_cache = jinja2.FileSystemBytecodeCache(directory)
+        else:
+            # Jinja creates and checks a private per-user directory itself
+            _bytecode_cache = jinja2.FileSystemBytecodeCache()
+    return _bytecode_cache
+
+
+def get_environment(search_path: Union[str, Sequence[str]] = DEFAULT_TEMPLATES_DIR,
+                    autoescape: bool = True) -> jinja2.Environment:
+    """
+    Shared Jinja2 environment for document templates.
+
+    Generators loading the same templates get the same environment, so a
+    template is compiled once per process (and read from the bytecode
+    cache after the first process of a deploy).
+
+    Args:
+        search_path: Template directory or directories
+        autoescape: HTML-escape variables
+    """
+    paths = (search_path,) if isinstance(search_path, str) else tuple(search_path)
+    key = (tuple(os.path.abspath(path) for path in paths), autoescape)
+    with _lock:
+        env = _environments.get(key)
+        if env is None:
+            env = jinja2.Environment(
+                loader=jinja2.FileSystemLoader(list(key[0])),
+                autoescape=autoescape,
+                bytecode_cache=bytecode_cache(),
+                auto_reload=_settings['auto_reload'],
+                cache_size=-1,  # never drop compiled templates
+            )
+            _environments[key] = env
+    return env
+
+
+def precompile(env: jinja2.Environment) -> int:
+    """
+    Load every template of env so none is compiled during a request.
+
+    Templates that fail to compile are logged and skipped; they raise when used.
+
+    Returns:
+        Number of templates loaded.
+    """
+    loaded = 0
+    for name in env.list_templates(filter_func=lambda name: not os.path.basename(name).startswith('.')):
+        try:
+            env.get_template(name)
+            loaded += 1
+        except jinja2.TemplateError as e:
+            logger.warning("Template %s does not compile: %s", name, e)
+    return loaded
+
+
+def init_app(app) -> None:
+    """
+    Share the bytecode cache with the app's own Jinja environment (voucher
+    and page templates). Must run before the first template is rendered.
+
+    The cache lives in the app's instance folder unless
+    TEMPLATE_BYTECODE_CACHE_DIR names a directory (e.g. one shared by every
+    worker of a deploy), which must not be writable by other users.
+    """
+    directory = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR') or \
+        os.path.join(app.instance_path, INSTANCE_BYTECODE_CACHE_DIR)
+    configure(directory, app.config.get('TEMPLATE_AUTO_RELOAD', app.debug))
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': bytecode_cache(), 'cache_size': -1}
+
+
+def precompile_app_templates(app) -> int:
+    """Compile the app's templates and the shared PDF templates at startup."""
+    return precompile(app.jinja_env) + precompile(get_environment())
@@ -0,0 +1,203 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+
+from flask import Blueprint, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from quote_system.app.auth.decorators import admin_required
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Number of recent requests kept for the rolling statistics
+DEFAULT_WINDOW = 1000
+
+bp = Blueprint('instrumentation', __name__, url_prefix='/admin/instrumentation')
+
+
+class RequestMetrics:
+    """
+    Rolling window of per-request SQL and latency measurements.
+
+    Each record holds the endpoint, SQL statement count, total SQL time,
+    slowest statement and overall latency. Summaries are computed on demand
+    from the window, so the per-request cost is one deque append.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self._records = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, method, status, sql_count, sql_time, slowest_time, slowest_sql, latency):
+        """Add one finished request to the window (times in seconds)."""
+        with self._lock:
+            self._records.append({
+                'endpoint': endpoint,
+                'method': method,
+                'status': status,
+                'sql_count': sql_count,
+                'sql_time_ms': sql_time * 1000,
+                'slowest_sql_ms': slowest_time * 1000,
+                'slowest_sql': slowest_sql,
+                'latency_ms': latency * 1000,
+            })
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def summary(self):
+        """
+        Aggregate the window per endpoint.
+
+        Returns:
+            List of per-endpoint dictionaries (request count, SQL count
+            mean/max, SQL time, latency percentiles and histogram, slowest
+            statement), sorted by mean SQL count so N+1 hotspots come first.
+        """
+        with self._lock:
+            records = list(self._records)
+
+        grouped = defaultdict(list)
+        for record in records:
+            grouped[record['endpoint']].append(record)
+
+        endpoints = []
+        for endpoint, rows in grouped.items():
+            latencies = sorted(row['latency_ms'] for row in rows)
+            histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for latency in latencies:
+                histogram[bisect_left(LATENCY_BUCKETS_MS, latency)] += 1
+            slowest = max(rows, key=lambda row: row['slowest_sql_ms'])
+            endpoints.append({
+                'endpoint': endpoint,
+                'requests': len(rows),
+                'sql_count_mean': sum(row['sql_count'] for row in rows) / len(rows),
+                'sql_count_max': max(row['sql_count'] for row in rows),
+                'sql_time_ms_mean': sum(row['sql_time_ms'] for row in rows) / len(rows),
+                'latency_ms_p50': _percentile(latencies, 50),
+                'latency_ms_p95': _percentile(latencies, 95),
+                'latency_ms_max': latencies[-1],
+                'latency_histogram': {
+                    label: count for label, count in zip(_bucket_labels(), histogram)
+                },
+                'slowest_sql_ms': slowest['slowest_sql_ms'],
+                'slowest_sql': slowest['slowest_sql'],
+            })
+        endpoints.sort(key=lambda item: item['sql_count_mean'], reverse=True)
+        return endpoints
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, int(round(percent / 100 * len(sorted_values) + 0.5)) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def _bucket_labels():
+    return [f'<={bound}ms' for bound in LATENCY_BUCKETS_MS] + [f'>{LATENCY_BUCKETS_MS[-1]}ms']
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_stats' in g:
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not (has_request_context() and 'sql_stats' in g):
+        return
+    starts = conn.info.get('query_start_time')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = g.sql_stats
+    stats['count'] += 1
+    stats['time'] += elapsed
+    if elapsed > stats['slowest_time']:
+        stats['slowest_time'] = elapsed
+        stats['slowest_sql'] = statement
+
+
+def _start_request():
+    g.request_start_time = time.perf_counter()
+    g.sql_stats = {'count': 0, 'time': 0.0, 'slowest_time': 0.0, 'slowest_sql': None}
+
+
+def _finish_request(response):
+    stats = g.get('sql_stats')
+    if stats is None:
+        return response
+    latency = time.perf_counter() - g.request_start_time
+    current_app.extensions['request_metrics'].record(
+        endpoint=request.endpoint or request.path,
+        method=request.method,
+        status=response.status_code,
+        sql_count=stats['count'],
+        sql_time=stats['time'],
+        slowest_time=stats['slowest_time'],
+        slowest_sql=stats['slowest_sql'],
+        latency=latency,
+    )
+    if current_app.config.get('SQL_INSTRUMENTATION_HEADERS', False):
+        response.headers['X-SQL-Count'] = str(stats['count'])
+        response.headers['X-SQL-Time-ms'] = f"{stats['time'] * 1000:.2f}"
+        response.headers['X-SQL-Slowest-ms'] = f"{stats['slowest_time'] * 1000:.2f}"
+        response.headers['X-Response-Time-ms'] = f'{latency * 1000:.2f}'
+    return response
+
+
+def init_instrumentation(app):
+    """
+    Record SQL count/time and latency for every request of an app.
+
+    Config:
+        SQL_INSTRUMENTATION: enable the hooks (default True)
+        SQL_INSTRUMENTATION_HEADERS: add X-SQL-* and X-Response-Time-ms
+            response headers (default: on in development mode)
+        SQL_INSTRUMENTATION_WINDOW: number of requests kept for the
+            admin summary (default 1000)
+    """
+    if not app.config.get('SQL_INSTRUMENTATION', True):
+        return
+    app.config.setdefault('SQL_INSTRUMENTATION_HEADERS', app.config.get('DEVELOPMENT_MODE', False))
+    app.extensions['request_metrics'] = RequestMetrics(
+        app.config.get('SQL_INSTRUMENTATION_WINDOW', DEFAULT_WINDOW)
+    )
+
+    # Listen on the Engine class once, shared by every app and engine in the process
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.register_blueprint(bp)
+
+
+@bp.route('/requests')
+@admin_required
+def request_metrics():
+    """Rolling per-endpoint SQL and latency statistics as JSON."""
+    metrics = current_app.extensions.get('request_metrics')
+    if metrics is None:
+        return jsonify({'enabled': False, 'endpoints': []})
+    return jsonify({
+        'enabled': True,
+        'latency_buckets_ms': list(LATENCY_BUCKETS_MS),
+        'endpoints': metrics.summary(),
+    })
+
+
+@bp.route('/requests/reset', methods=['POST'])
+@admin_required
+def reset_request_metrics():
+    """Clear the rolling window."""
+    metrics = current_app.extensions.get('request_metrics')
+    if metrics is not None:
+        metrics.clear()
+    return jsonify({'success': True})
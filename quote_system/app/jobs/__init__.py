@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+bp = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+from quote_system.app.jobs import routes
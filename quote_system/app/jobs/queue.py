@@ -0,0 +1,416 @@
+import ipaddress
+import logging
+import multiprocessing
+import os
+import pickle
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from quote_system.app.document_generation.booking_pack import render_pack, store_pack
+from quote_system.app.jobs.tasks import SUFFIXES, TASKS, init_worker, run_task, worker_settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_TASKS_PER_CHILD = 50  # recycle workers so WeasyPrint memory stays bounded
+DEFAULT_POLL_INTERVAL = 0.5  # seconds
+DEFAULT_RESULT_TTL = 24 * 3600  # seconds a finished job and its file are kept
+DEFAULT_JOB_TIMEOUT = 600  # running jobs older than this are assumed lost and requeued
+PURGE_INTERVAL = 300  # seconds between purges of expired jobs
+CALLBACK_TIMEOUT = 5  # seconds
+
+# Booking packs are assembled by the worker itself: their documents are
+# rendered on the same pool as ordinary jobs and zipped as they finish
+PACK_KIND = 'booking_pack'
+PACK_THREADS = 2
+
+_JOB_COLUMNS = 'id, kind, status, owner_id, callback_url, result_path, filename, error, created_at, started_at, finished_at'
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str
+    owner_id: Optional[int]
+    callback_url: Optional[str]
+    result_path: Optional[str]
+    filename: Optional[str]
+    error: Optional[str]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view of the job (no server paths)."""
+        data = asdict(self)
+        del data['result_path']
+        del data['callback_url']
+        return data
+
+
+class JobStore:
+    """
+    Job table in a SQLite file shared by the web processes (which enqueue)
+    and the worker (which claims and completes jobs).
+
+    Payloads are pickled and only read back when a job is claimed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS job ('
+                'id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload BLOB NOT NULL, status TEXT NOT NULL, '
+                'owner_id INTEGER, callback_url TEXT, result_path TEXT, filename TEXT, error TEXT, '
+                'created_at REAL NOT NULL, started_at REAL, finished_at REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_job_status_created ON job (status, created_at)')
+
+    def _connect(self):
+        # Autocommit mode, so claim() can open its own BEGIN IMMEDIATE transaction
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], owner_id: Optional[int] = None,
+                callback_url: Optional[str] = None) -> Job:
+        job = Job(uuid.uuid4().hex, kind, QUEUED, owner_id, callback_url,
+                  None, None, None, time.time(), None, None)
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO job (id, kind, payload, status, owner_id, callback_url, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job.id, kind, pickle.dumps(payload, pickle.HIGHEST_PROTOCOL), QUEUED,
+                 owner_id, callback_url, job.created_at)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute(f'SELECT {_JOB_COLUMNS} FROM job WHERE id = ?', (job_id,)).fetchone()
+        return Job(*row) if row else None
+
+    def claim(self) -> Optional[Tuple[Job, Dict[str, Any]]]:
+        """Mark the oldest queued job as running and return it with its payload."""
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so two workers cannot claim the same job
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                f'SELECT {_JOB_COLUMNS}, payload FROM job WHERE status = ? ORDER BY created_at LIMIT 1',
+                (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            started = time.time()
+            conn.execute('UPDATE job SET status = ?, started_at = ? WHERE id = ?', (RUNNING, started, row[0]))
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        job = Job(*row[:-1])
+        job.status, job.started_at = RUNNING, started
+        return job, pickle.loads(row[-1])
+
+    def finish(self, job_id: str, result_path: str, filename: str) -> None:
+        with self._connect() as conn:
+            conn.execute('UPDATE job SET status = ?, result_path = ?, filename = ?, finished_at = ? WHERE id = ?',
+                         (DONE, result_path, filename, time.time(), job_id))
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._connect() as conn:
+            conn.execute('UPDATE job SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                         (FAILED, error, time.time(), job_id))
+
+    def requeue_stale(self, timeout: float) -> int:
+        """Put jobs back in the queue whose worker died while running them."""
+        with self._connect() as conn:
+            cursor = conn.execute('UPDATE job SET status = ?, started_at = NULL WHERE status = ? AND started_at < ?',
+                                  (QUEUED, RUNNING, time.time() - timeout))
+            return cursor.rowcount
+
+    def purge(self, max_age: float) -> List[str]:
+        """
+        Delete finished jobs older than max_age seconds.
+
+        Returns:
+            Result file paths of the deleted jobs (for the caller to remove).
+        """
+        cutoff = time.time() - max_age
+        with self._connect() as conn:
+            rows = conn.execute('SELECT result_path FROM job WHERE status IN (?, ?) AND finished_at < ?',
+                                (DONE, FAILED, cutoff)).fetchall()
+            conn.execute('DELETE FROM job WHERE status IN (?, ?) AND finished_at < ?', (DONE, FAILED, cutoff))
+        return [path for (path,) in rows if path]
+
+
+def callback_url_allowed(url: str, allowed_hosts: Iterable[str] = ()) -> bool:
+    """
+    Whether job updates may be POSTed to url.
+
+    Hosts in allowed_hosts are always accepted. Any other host must resolve
+    to public addresses only, so a callback cannot reach loopback, private
+    (RFC 1918), link-local (cloud metadata) or other internal addresses.
+    """
+    try:
+        parsed = urlparse(url)
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+    except ValueError:
+        return False
+    host = (parsed.hostname or '').lower()
+    if parsed.scheme not in ('http', 'https') or not host:
+        return False
+    if host in {allowed.lower() for allowed in allowed_hosts}:
+        return True
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError):
+        return False
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if getattr(ip, 'ipv4_mapped', None):
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            return False
+    return bool(addresses)
+
+
+def _notify(job: Job, allowed_hosts: Iterable[str] = ()) -> None:
+    # Checked again here: the host may resolve differently than at enqueue time
+    if not callback_url_allowed(job.callback_url, allowed_hosts):
+        logger.warning("Job callback to %s refused for job %s", job.callback_url, job.id)
+        return
+    try:
+        # Redirects are not followed, they could point anywhere
+        requests.post(job.callback_url, json=job.to_dict(), timeout=CALLBACK_TIMEOUT, allow_redirects=False)
+    except requests.RequestException as e:
+        logger.warning("Job callback to %s failed for job %s: %s", job.callback_url, job.id, e)
+
+
+class JobWorker:
+    """
+    Claims queued jobs and renders them in a process pool.
+
+    The dispatching loop only does SQLite bookkeeping; the rendering itself
+    (WeasyPrint layout, workbook writing) happens in the pool processes.
+    A booking pack renders its documents concurrently in the same pool, so
+    it takes one slot per document (up to max_workers) and waits until that
+    many slots are free.
+    """
+
+    def __init__(self, store: JobStore, output_dir: str, max_workers: int = DEFAULT_WORKERS,
+                 max_tasks_per_child: int = DEFAULT_MAX_TASKS_PER_CHILD,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, result_ttl: float = DEFAULT_RESULT_TTL,
+                 job_timeout: float = DEFAULT_JOB_TIMEOUT, worker_settings: Optional[Dict[str, Any]] = None,
+                 callback_hosts: Iterable[str] = ()):
+        self.store = store
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+        self.job_timeout = job_timeout
+        self.worker_settings = worker_settings or {}
+        self.callback_hosts = tuple(callback_hosts)
+        self._in_flight = 0
+        self._held: Optional[Tuple[Job, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Process jobs until stop is set (or forever)."""
+        stop = stop or threading.Event()
+        requeued = self.store.requeue_stale(self.job_timeout)
+        if requeued:
+            logger.warning("Requeued %d stale jobs", requeued)
+        # spawn: worker processes must not inherit the dispatcher's threads and SQLite handles
+        context = multiprocessing.get_context('spawn')
+        last_purge = 0.0
+        with ThreadPoolExecutor(2, thread_name_prefix='job-callback') as callbacks, \
+                ThreadPoolExecutor(PACK_THREADS, thread_name_prefix='job-pack') as packs:
+            while not stop.is_set():
+                try:
+                    with ProcessPoolExecutor(self.max_workers, mp_context=context,
+                                             initializer=init_worker, initargs=(self.worker_settings,),
+                                             max_tasks_per_child=self.max_tasks_per_child) as pool:
+                        while not stop.is_set():
+                            self._dispatch(pool, callbacks, packs)
+                            if time.monotonic() - last_purge > PURGE_INTERVAL:
+                                self.purge()
+                                last_purge = time.monotonic()
+                            self._wakeup.wait(self.poll_interval)
+                            self._wakeup.clear()
+                except BrokenProcessPool:
+                    # A worker process died (e.g. killed for memory); its jobs are
+                    # already marked failed, so start a fresh pool and carry on
+                    logger.error("Job worker pool broke; restarting it")
+
+    def _dispatch(self, pool: ProcessPoolExecutor, callbacks: ThreadPoolExecutor,
+                  packs: ThreadPoolExecutor) -> None:
+        while True:
+            with self._lock:
+                if self._in_flight >= self.max_workers:
+                    return
+                held, self._held = self._held, None
+            claimed = held or self.store.claim()
+            if claimed is None:
+                return
+            job, payload = claimed
+            slots = self._slots(job, payload)
+            with self._lock:
+                # Keep the claimed job (and the queue order) until its documents fit
+                if self._in_flight and self._in_flight + slots > self.max_workers:
+                    self._held = claimed
+                    return
+                self._in_flight += slots
+            suffix = '.zip' if job.kind == PACK_KIND else SUFFIXES[job.kind]
+            output_path = os.path.join(self.output_dir, job.id + suffix)
+            try:
+                if job.kind == PACK_KIND:
+                    future = packs.submit(self._build_pack, pool, payload, output_path)
+                else:
+                    future = pool.submit(run_task, job.kind, payload, output_path)
+            except BrokenProcessPool:
+                with self._lock:
+                    self._in_flight -= slots
+                self.store.fail(job.id, 'Worker pool failed before the job started')
+                raise
+            future.add_done_callback(
+                lambda f, job=job, output_path=output_path, slots=slots:
+                    self._completed(job, output_path, f, callbacks, slots))
+
+    def _slots(self, job: Job, payload: Dict[str, Any]) -> int:
+        """Pool processes a job keeps busy: one per pack document, capped at the pool size."""
+        if job.kind != PACK_KIND:
+            return 1
+        return max(1, min(len(payload.get('documents') or ()), self.max_workers))
+
+    def _completed(self, job: Job, output_path: str, future: Future, callbacks: ThreadPoolExecutor,
+                   slots: int = 1) -> None:
+        try:
+            filename = future.result()
+            self.store.finish(job.id, output_path, filename)
+        except Exception as e:
+            logger.error("Job %s (%s) failed: %s", job.id, job.kind, e)
+            self.store.fail(job.id, f'{type(e).__name__}: {e}')
+        finally:
+            with self._lock:
+                self._in_flight -= slots
+            # A slot is free: look for the next job without waiting for the poll interval
+            self._wakeup.set()
+        if job.callback_url:
+            callbacks.submit(_notify, self.store.get(job.id), self.callback_hosts)
+
+    def _build_pack(self, pool: ProcessPoolExecutor, payload: Dict[str, Any], output_path: str) -> str:
+        render_pack(payload['documents'], output_path, pool)
+        storage = payload.get('storage')
+        if storage:
+            store_pack(lambda path: shutil.copyfile(output_path, path), **storage)
+        return payload.get('filename') or f"{payload.get('name', 'booking')}_booking_pack.zip"
+
+    def purge(self) -> int:
+        paths = self.store.purge(self.result_ttl)
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(paths)
+
+
+class JobQueue:
+    """
+    Background rendering of documents (see quote_system.app.jobs.tasks).
+
+    Web processes enqueue jobs and poll their status; a separate
+    `flask run-job-worker` process renders them. With JOB_WORKER_AUTOSTART
+    the worker runs in a thread of the web process instead (single-process
+    deployments and development) - rendering still happens in the pool.
+    """
+
+    def __init__(self):
+        self.store: Optional[JobStore] = None
+        self.config: Dict[str, Any] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app) -> None:
+        self.store = JobStore(app.config.get('JOB_QUEUE_PATH') or os.path.join(app.instance_path, 'jobs.sqlite3'))
+        self.config = {
+            'output_dir': app.config.get('JOB_OUTPUT_DIR') or os.path.join(app.instance_path, 'job_results'),
+            'max_workers': app.config.get('JOB_WORKERS', DEFAULT_WORKERS),
+            'max_tasks_per_child': app.config.get('JOB_WORKER_MAX_TASKS', DEFAULT_MAX_TASKS_PER_CHILD),
+            'result_ttl': app.config.get('JOB_RESULT_TTL', DEFAULT_RESULT_TTL),
+            'job_timeout': app.config.get('JOB_TIMEOUT', DEFAULT_JOB_TIMEOUT),
+            'callback_hosts': tuple(app.config.get('JOB_CALLBACK_HOSTS') or ()),
+        }
+        app.extensions['job_queue'] = self
+        # Pool processes re-import the entry script (and so build the app again);
+        # only the parent process may start a worker
+        if app.config.get('JOB_WORKER_AUTOSTART') and multiprocessing.parent_process() is None:
+            self.start_worker()
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], owner_id: Optional[int] = None,
+                callback_url: Optional[str] = None) -> Job:
+        """
+        Queue a document for rendering.
+
+        Args:
+            kind: Task name from TASKS (e.g. 'quote_pdf', 'itinerary_excel') or PACK_KIND
+            payload: Task input; must be picklable. A pack takes 'documents'
+                (PackDocument list), 'name' and optionally 'storage'
+                (store_pack() arguments) and 'filename' (download name of
+                the zip)
+            owner_id: User allowed to see the job and download its result
+            callback_url: URL that receives a POST with the job status when it finishes
+
+        Returns:
+            The queued Job.
+        """
+        if kind not in TASKS and kind != PACK_KIND:
+            raise ValueError(f'Unknown job kind: {kind}')
+        return self.store.enqueue(kind, payload, owner_id, callback_url)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def callback_allowed(self, url: str) -> bool:
+        """Whether url may receive job updates (see callback_url_allowed, JOB_CALLBACK_HOSTS)."""
+        return callback_url_allowed(url, self.config.get('callback_hosts', ()))
+
+    def worker(self, **overrides) -> JobWorker:
+        # Pool processes have no app, so they get the settings they need explicitly
+        return JobWorker(self.store, **{**self.config, 'worker_settings': worker_settings(), **overrides})
+
+    def start_worker(self) -> threading.Thread:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.worker().run, name='job-worker', daemon=True)
+            self._thread.start()
+        return self._thread
+
+
+# Shared queue used by the jobs blueprint and the worker command
+job_queue = JobQueue()
@@ -0,0 +1,170 @@
+from datetime import date
+
+from flask import jsonify, request, send_file, url_for
+from flask_login import current_user
+
+from quote_system.app.auth.decorators import login_required
+from quote_system.app.document_generation.booking_pack import booking_pack_documents
+from quote_system.app.jobs import bp
+from quote_system.app.jobs.queue import DONE, PACK_KIND, job_queue
+
+# Kinds clients may enqueue directly; voucher jobs carry server-rendered HTML
+# and are only queued by the voucher routes
+PUBLIC_KINDS = ('quote_pdf', 'itinerary_pdf', 'invoice_pdf', 'quote_excel', 'itinerary_excel', PACK_KIND)
+# Templates a client may choose per PDF kind (names under quote_system/templates/pdf)
+PDF_TEMPLATES = {
+    'quote_pdf': ('quote.html',),
+    'itinerary_pdf': ('itinerary.html',),
+    'invoice_pdf': ('invoice.html',),
+}
+
+
+def _current_user_id():
+    return current_user.id if current_user.is_authenticated else None
+
+
+def _is_admin() -> bool:
+    return getattr(current_user, 'role', None) == 'admin'
+
+
+def _visible(job) -> bool:
+    if job is None:
+        return False
+    if job.owner_id is None or _is_admin():
+        return True
+    return job.owner_id == _current_user_id()
+
+
+def _stored_quote(quote_number):
+    """The quote a pack is for, if it exists and the current user may file documents for it."""
+    from quote_system.app.utils import quote_load_options
+    from quote_system.database.models import Quote
+
+    if not quote_number:
+        return None
+    quote = (Quote.query
+             .options(*quote_load_options('booking_pack'))
+             .filter_by(quote_number=str(quote_number))
+             .first())
+    if quote is None or not (_is_admin() or quote.creator_id == _current_user_id()):
+        return None
+    return quote
+
+
+def _parse_dates(value):
+    """Turn ISO strings under *_date keys back into dates (the generators do date arithmetic)."""
+    if isinstance(value, dict):
+        parsed = {}
+        for key, item in value.items():
+            if isinstance(item, str) and str(key).endswith('date'):
+                try:
+                    item = date.fromisoformat(item)
+                except ValueError:
+                    pass
+            parsed[key] = _parse_dates(item)
+        return parsed
+    if isinstance(value, list):
+        return [_parse_dates(item) for item in value]
+    return value
+
+
+def _booking_vouchers(booking_id, quote):
+    # Imported here: the voucher routes import this module for job_response
+    from quote_system.app.booking.voucher_routes import booking_vouchers
+
+    return booking_vouchers(booking_id, quote_id=quote.id)
+
+
+def _pack_payload(data, invoice, booking_id=None):
+    # Packs of the user's own stored quotes are also filed with the quote's
+    # documents; where they go comes from the quote, never from the request.
+    # Vouchers come from a booking of that same quote.
+    quote = _stored_quote(data.get('quote_number'))
+    if booking_id is not None and quote is None:
+        raise ValueError('booking_id needs the quote_number of one of your stored quotes')
+    vouchers = _booking_vouchers(booking_id, quote) if booking_id is not None else ()
+    payload = {
+        'documents': booking_pack_documents(data, _parse_dates(invoice) if isinstance(invoice, dict) else None,
+                                            vouchers),
+        'name': str(data.get('quote_number') or 'booking'),
+    }
+    if quote is not None and quote.agent is not None:
+        payload['storage'] = {'agent_name': quote.agent.name, 'quote_number': quote.quote_number,
+                              'year': quote.created_at.year if quote.created_at else None}
+    return payload
+
+
+def job_response(job, status_code=200):
+    """JSON body shared by the enqueue and status endpoints."""
+    body = job.to_dict()
+    body['status_url'] = url_for('jobs.job_status', job_id=job.id)
+    body['download_url'] = url_for('jobs.download_job', job_id=job.id) if job.status == DONE else None
+    return jsonify(body), status_code
+
+
+@bp.route('/', methods=['POST'])
+@login_required
+def enqueue_job():
+    """
+    Queue a document for rendering in the background.
+
+    JSON body: kind (one of PUBLIC_KINDS), data (quote data for the generator),
+    optional invoice, template (one of PDF_TEMPLATES for the kind) and
+    callback_url (on a public host or one of JOB_CALLBACK_HOSTS). A
+    booking_pack zips the quote, itinerary and (with invoice) invoice PDFs
+    and the Excel itinerary; packs of the user's own stored quotes are also
+    filed under the quote's agent, and with booking_id (a booking of that
+    quote) include one voucher PDF per supplier.
+    Responds 202 with the job; poll status_url, or wait for the POST to
+    callback_url, then download.
+    """
+    body = request.get_json(silent=True) or {}
+    kind = body.get('kind')
+    if kind not in PUBLIC_KINDS:
+        return jsonify({'error': f"kind must be one of: {', '.join(PUBLIC_KINDS)}"}), 400
+    if not isinstance(body.get('data'), dict):
+        return jsonify({'error': 'data must be an object'}), 400
+    callback_url = body.get('callback_url')
+    if callback_url and not (isinstance(callback_url, str) and job_queue.callback_allowed(callback_url)):
+        return jsonify({'error': 'callback_url must be an http(s) URL on a public or allowed host'}), 400
+    template = body.get('template')
+    if template and template not in PDF_TEMPLATES.get(kind, ()):
+        return jsonify({'error': f'template is not available for {kind}'}), 400
+
+    data = _parse_dates(body['data'])
+    if kind == PACK_KIND:
+        booking_id = body.get('booking_id')
+        if booking_id is not None and (isinstance(booking_id, bool) or not isinstance(booking_id, int)):
+            return jsonify({'error': 'booking_id must be an integer'}), 400
+        try:
+            payload = _pack_payload(data, body.get('invoice'), booking_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    else:
+        payload = {'data': data}
+        if kind == 'invoice_pdf':
+            payload['invoice'] = _parse_dates(body.get('invoice') or {})
+        if template:
+            payload['template'] = template
+    job = job_queue.enqueue(kind, payload, owner_id=_current_user_id(), callback_url=callback_url)
+    return job_response(job, 202)
+
+
+@bp.route('/<job_id>')
+@login_required
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if not _visible(job):
+        return jsonify({'error': 'Job not found'}), 404
+    return job_response(job)
+
+
+@bp.route('/<job_id>/download')
+@login_required
+def download_job(job_id):
+    job = job_queue.get(job_id)
+    if not _visible(job):
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status != DONE:
+        return jsonify({'error': f'Job is {job.status}', 'status': job.status}), 409
+    return send_file(job.result_path, as_attachment=True, download_name=job.filename)
@@ -0,0 +1,129 @@
+"""
+Document rendering tasks run in job worker processes.
+
+Each task takes the job payload and the path to write its result to, and
+returns the file name offered on download. Tasks run outside any Flask
+app context, so payloads carry plain data (dicts, dates, rendered HTML)
+rather than model instances.
+"""
+import logging
+from typing import Any, Callable, Dict
+
+from quote_system.app.document_generation import templating
+from quote_system.app.document_generation.excel_generator import ExcelGenerator
+from quote_system.app.document_generation.pdf_generator import PDFGenerator
+from quote_system.app.document_generation.pdf_runtime import pdf_runtime
+from quote_system.app.document_generation.render_cache import render_cache
+
+logger = logging.getLogger(__name__)
+
+# Generators are created once per worker process and reused across jobs
+_generators: Dict[str, Any] = {}
+
+
+def _pdf_generator() -> PDFGenerator:
+    if 'pdf' not in _generators:
+        _generators['pdf'] = PDFGenerator()
+    return _generators['pdf']
+
+
+def _excel_generator() -> ExcelGenerator:
+    if 'excel' not in _generators:
+        _generators['excel'] = ExcelGenerator()
+    return _generators['excel']
+
+
+def _base_name(payload: Dict[str, Any]) -> str:
+    data = payload.get('data') or {}
+    return str(data.get('quote_number') or payload.get('name') or 'quote').replace('/', '_')
+
+
+def quote_pdf(payload: Dict[str, Any], output_path: str) -> str:
+    _pdf_generator().generate_quote_pdf(payload['data'], payload.get('template', 'quote.html'), output_path)
+    return f"{_base_name(payload)}.pdf"
+
+
+def itinerary_pdf(payload: Dict[str, Any], output_path: str) -> str:
+    _pdf_generator().generate_itinerary_pdf(payload['data'], payload.get('template', 'itinerary.html'), output_path)
+    return f"{_base_name(payload)}_itinerary.pdf"
+
+
+def invoice_pdf(payload: Dict[str, Any], output_path: str) -> str:
+    _pdf_generator().generate_invoice_pdf(payload['data'], payload.get('invoice') or {},
+                                          payload.get('template', 'invoice.html'), output_path)
+    return f"{_base_name(payload)}_invoice.pdf"
+
+
+def quote_excel(payload: Dict[str, Any], output_path: str) -> str:
+    _excel_generator().write_quote_excel(payload['data'], output_path)
+    return f"{_base_name(payload)}.xlsx"
+
+
+def itinerary_excel(payload: Dict[str, Any], output_path: str) -> str:
+    _excel_generator().write_itinerary_excel(payload['data'], output_path)
+    return f"{_base_name(payload)}_itinerary.xlsx"
+
+
+def voucher_pdf(payload: Dict[str, Any], output_path: str) -> str:
+    # The HTML is rendered in the web process (it needs the app's templates);
+    # only the WeasyPrint layout happens here
+    from quote_system.app.services.pdf_service import PDFService
+
+    cache_key = payload.get('cache_key')
+    if not (cache_key and render_cache.copy_to(cache_key, output_path)):
+        PDFService.write_pdf(payload['html'], output_path)
+        if cache_key:
+            render_cache.put_file(cache_key, output_path)
+    return f"{payload.get('name', 'voucher')}.pdf"
+
+
+TASKS: Dict[str, Callable[[Dict[str, Any], str], str]] = {
+    'quote_pdf': quote_pdf,
+    'itinerary_pdf': itinerary_pdf,
+    'invoice_pdf': invoice_pdf,
+    'quote_excel': quote_excel,
+    'itinerary_excel': itinerary_excel,
+    'voucher_pdf': voucher_pdf,
+}
+
+# Result file suffix per task
+SUFFIXES = {kind: '.xlsx' if kind.endswith('_excel') else '.pdf' for kind in TASKS}
+
+
+def worker_settings() -> Dict[str, Any]:
+    """This process's configuration, for init_worker() in pool processes."""
+    return {'render_cache': render_cache.settings(), 'templates': templating.settings(),
+            'pdf_runtime': pdf_runtime.settings()}
+
+
+def init_worker(settings: Dict[str, Any]) -> None:
+    """Pool process initializer: apply the web app's settings (there is no app here)."""
+    if settings.get('render_cache'):
+        render_cache.configure(**settings['render_cache'])
+    if settings.get('templates'):
+        templating.configure(**settings['templates'])
+        # Compile the PDF templates before the first job rather than during it
+        templating.precompile(_pdf_generator().env)
+    if settings.get('pdf_runtime'):
+        pdf_runtime.configure(**settings['pdf_runtime'])
+    warm_up()
+
+
+def warm_up() -> None:
+    """
+    Worker start hook: load fonts, stylesheets (including the voucher
+    stylesheet) and logos, and lay out a first document, so the first job
+    after a deploy is not the slow one.
+    """
+    import quote_system.app.services.pdf_service  # noqa: F401 (registers the voucher stylesheet)
+
+    try:
+        pdf_runtime.warm_up()
+    except Exception as e:
+        # A failed warm-up only costs the first job its speed
+        logger.warning("PDF runtime warm-up failed: %s", e)
+
+
+def run_task(kind: str, payload: Dict[str, Any], output_path: str) -> str:
+    """Entry point executed in the worker pool; returns the download file name."""
+    return TASKS[kind](payload, output_path)
@@ -0,0 +1,95 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+
+@dataclass
+class KeysetPage:
+    """One page of a keyset-paginated query and the cursor for the page after it."""
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    per_page: int = DEFAULT_PER_PAGE
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque, URL-safe cursor for the sort key of the last row on a page."""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[list]:
+    """Decode a cursor from encode_cursor(); invalid cursors return None (first page)."""
+    if not cursor:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(payload)
+        return [_decode_value(value) for value in values]
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+def _after(columns, values):
+    """Rows after values in descending (columns) order: c1 < v1 OR (c1 = v1 AND (c2 < v2 ...))."""
+    column, value = columns[0], values[0]
+    if len(columns) == 1:
+        return column < value
+    return or_(column < value, and_(column == value, _after(columns[1:], values[1:])))
+
+
+def keyset_paginate(query, sort_columns: Sequence, cursor: Optional[str] = None,
+                    per_page: int = DEFAULT_PER_PAGE) -> KeysetPage:
+    """
+    Return one page of query ordered by sort_columns descending.
+
+    Instead of OFFSET, the page starts after the sort key stored in the
+    cursor, so every page costs an index seek plus per_page rows no matter
+    how deep it is. The last sort column must be unique (e.g. the primary key).
+
+    Args:
+        query: SQLAlchemy query with any filters already applied
+        sort_columns: Columns to order by, e.g. (Quote.updated_at, Quote.id)
+        cursor: next_cursor of the previous page, or None for the first page
+        per_page: Number of rows per page (capped at MAX_PER_PAGE)
+    """
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    values = decode_cursor(cursor)
+    if values is not None and len(values) == len(sort_columns):
+        query = query.filter(_after(list(sort_columns), values))
+
+    rows = query.order_by(*[column.desc() for column in sort_columns]).limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in sort_columns])
+    return KeysetPage(items=items, next_cursor=next_cursor, per_page=per_page)
@@ -1,23 +1,30 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import current_user
 from quote_system.app.auth.decorators import login_required
-from quote_system.database.models import db, Quote, Activity
+from quote_system.database.models import db, Quote, Activity, Agent
+from quote_system.app.pagination import DEFAULT_PER_PAGE
+from quote_system.app.services.quote_number_service import quote_number_service
+from quote_system.app.services.quote_service import QuoteListFilters, QuoteService
 
 bp = Blueprint('quote_management', __name__)
 
 @bp.route('/')
 @login_required
 def list_quotes():
-    quotes = Quote.query.filter_by(creator_id=current_user.id).all()
-    return render_template('quote_management/list_quotes.html', quotes=quotes)
+    filters = QuoteListFilters.from_args(request.args)
+    page = QuoteService.list_quotes(current_user.id, filters, request.args.get('cursor'),
+                                    request.args.get('per_page', DEFAULT_PER_PAGE, type=int))
+    return render_template('quote_management/list_quotes.html', quotes=page.items, page=page, filters=filters)
 
 @bp.route('/new', methods=['GET', 'POST'])
 @login_required
 def new_quote():
     if request.method == 'POST':
         try:
+            agent = QuoteService.quote_agent(request.form.get('agent_id', type=int), current_user.id)
             quote = Quote(
-                quote_number=f'QUOTE-{len(Quote.query.all()) + 1:04}',
+                quote_number=quote_number_service.next_number(agent_code=agent.code if agent else None),
+                agent_id=agent.id if agent else None,
                 client_name=request.form['client_name'],
                 start_date=request.form['start_date'],
                 end_date=request.form['end_date'],
@@ -58,7 +65,8 @@ def new_quote():
             flash(f'Error creating quote: {str(e)}', 'error')
             return redirect(url_for('quote_management.new_quote'))
 
-    return render_template('quote_management/new_quote.html')
+    agents = Agent.query.filter_by(is_active=True).order_by(Agent.name).all()
+    return render_template('quote_management/new_quote.html', agents=agents)
 
 @bp.route('/quotes/<int:quote_id>')
 @login_required
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required
 from quote_system.database.models import db, Quote, Room, Passenger, Supplier
+from quote_system.app.reference_data import supplier_options
 
 bp = Blueprint('rooming', __name__)
 
@@ -10,7 +11,7 @@ def view_rooms(quote_id):
     quote = Quote.query.get_or_404(quote_id)
     rooms = Room.query.filter_by(quote_id=quote_id).all()
     passengers = Passenger.query.filter_by(quote_id=quote_id).all()
-    suppliers = Supplier.query.all()
+    suppliers = supplier_options()
     return render_template('quote_wizard/rooming.html', quote=quote, rooms=rooms, passengers=passengers, suppliers=suppliers)
 
 @bp.route('/<int:quote_id>/rooms/add', methods=['POST'])
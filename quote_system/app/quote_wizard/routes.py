@@ -12,6 +12,7 @@ from quote_system.app.quote_wizard.rooming import bp as rooming_bp
 from quote_system.database.models import db, Quote, Client, Agent, QuoteStatus, \
     FormStepStatus, Passenger, ItineraryDay, ItineraryItem, Supplier
 from quote_system.app.utils import get_quote_or_404
+from quote_system.app.reference_data import supplier_options
 import logging
 
 # Removed local get_quote_or_404; now using centralized version
@@ -38,14 +39,14 @@ def start_quote():
 @login_required
 def booking_detail(quote_id):
     """Tabbed booking management view for a quote/booking."""
-    quote = get_quote_or_404(quote_id)
+    # Loads passengers, bookings, notes and the itinerary up front (replaces session.refresh)
+    quote = get_quote_or_404(quote_id, profile='booking_detail')
     if not check_quote_access(quote):
         return redirect(url_for('quoting.list_quotes'))
     
     # Get all suppliers for the supplier bookings form
-    suppliers = Supplier.query.order_by(Supplier.name).all()
+    suppliers = supplier_options()
     
-    db.session.refresh(quote)
     return render_template('quote_wizard/booking_detail.html', quote=quote, suppliers=suppliers)
 
 # --- SUPPLIER BOOKINGS CRUD ---
@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, request, jsonify, flash, redirect,
 from flask_login import login_required, current_user
 from quote_system.database.models import db, ItineraryItem, ItineraryItemType, Service, Supplier, Location
 from datetime import datetime
+from quote_system.app.reference_data import supplier_options
 
 itinerary_bp = Blueprint('itinerary', __name__, url_prefix='/quotes/<int:quote_id>/itinerary')
 
@@ -15,7 +16,7 @@ def view_itinerary(quote_id):
     services = Service.query.all()
     
     # Get all suppliers for the dropdown
-    suppliers = Supplier.query.all()
+    suppliers = supplier_options()
     
     # Get all locations for the dropdown
     locations = Location.query.all()
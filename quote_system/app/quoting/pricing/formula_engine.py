@@ -0,0 +1,336 @@
+import ast
+import logging
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache, reduce
+from typing import Any, Dict, List, Optional, Tuple
+
+# NumPy is only needed for batch evaluation; fall back to a row loop without it
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of distinct formula strings kept in compiled form
+FORMULA_CACHE_SIZE = 512
+
+CELL_RANGE_PATTERN = re.compile(r'(?<![A-Za-z_])([A-Z]+)(\d+):([A-Z]+)(\d+)(?![A-Za-z_\d])')
+CELL_PATTERN = re.compile(r'(?<![A-Za-z_])([A-Z]+)(\d+)(?![A-Za-z_\d])')
+
+
+def _flatten(args) -> list:
+    """Flatten list arguments so that SUM(A1:B2) and SUM(a, b) behave alike."""
+    values = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            values.extend(_flatten(arg))
+        else:
+            values.append(arg)
+    return values
+
+
+def _average(*args):
+    values = _flatten(args)
+    return sum(values) / len(values) if values else 0
+
+
+# Functions available to formulas. Excel-style names accept ranges as well as
+# plain arguments; the lowercase names keep their Python semantics.
+FORMULA_FUNCTIONS = {
+    'SUM': lambda *args: sum(_flatten(args)),
+    'AVERAGE': _average,
+    'MAX': lambda *args: max(_flatten(args)),
+    'MIN': lambda *args: min(_flatten(args)),
+    'ROUND': lambda value, digits=0: round(value, int(digits)),
+    'ABS': abs,
+    'POW': pow,
+    'IF': lambda cond, true_val, false_val: true_val if cond else false_val,
+    'AND': lambda *args: all(_flatten(args)),
+    'OR': lambda *args: any(_flatten(args)),
+    'sum': sum,
+    'min': min,
+    'max': max,
+    'round': round,
+    'abs': abs,
+    'pow': pow,
+}
+
+_EVAL_GLOBALS = {'__builtins__': {}, **FORMULA_FUNCTIONS}
+
+if HAS_NUMPY:
+    # Element-wise equivalents used when a formula is evaluated over columns
+    BATCH_FUNCTIONS = {
+        'SUM': lambda *args: reduce(np.add, _flatten(args), 0.0),
+        'AVERAGE': lambda *args: reduce(np.add, _flatten(args), 0.0) / max(len(_flatten(args)), 1),
+        'MAX': lambda *args: reduce(np.maximum, _flatten(args)),
+        'MIN': lambda *args: reduce(np.minimum, _flatten(args)),
+        'ROUND': lambda value, digits=0: np.round(value, int(digits)),
+        'ABS': np.abs,
+        'POW': np.power,
+        'IF': lambda cond, true_val, false_val: np.where(cond, true_val, false_val),
+        'AND': lambda *args: reduce(np.logical_and, _flatten(args)),
+        'OR': lambda *args: reduce(np.logical_or, _flatten(args)),
+        'sum': lambda values, start=0: reduce(np.add, _flatten([values]), start),
+        'min': lambda *args: reduce(np.minimum, _flatten(args)),
+        'max': lambda *args: reduce(np.maximum, _flatten(args)),
+        'round': lambda value, digits=0: np.round(value, int(digits)),
+        'abs': np.abs,
+        'pow': np.power,
+    }
+    _BATCH_GLOBALS = {'__builtins__': {}, **BATCH_FUNCTIONS}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Constant, ast.List, ast.Tuple, ast.Load,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+
+class FormulaError(ValueError):
+    """Raised when a formula cannot be compiled."""
+
+
+def column_number(column: str) -> int:
+    """Convert a column letter to its number (A=1, B=2, ..., AA=27)."""
+    return sum((ord(c) - ord('A') + 1) * (26 ** i) for i, c in enumerate(reversed(column)))
+
+
+def cell_name(column: str, row: int) -> str:
+    """Context key used for an Excel-style cell reference, e.g. 'A1' -> 'cell_1_1'."""
+    return f'cell_{row}_{column_number(column)}'
+
+
+def _expand_range(match) -> str:
+    first_col, first_row = column_number(match.group(1)), int(match.group(2))
+    last_col, last_row = column_number(match.group(3)), int(match.group(4))
+    cells = [
+        f'cell_{row}_{col}'
+        for row in range(min(first_row, last_row), max(first_row, last_row) + 1)
+        for col in range(min(first_col, last_col), max(first_col, last_col) + 1)
+    ]
+    return '[' + ', '.join(cells) + ']'
+
+
+def _translate(expr: str) -> str:
+    """Rewrite Excel syntax (ranges, cell references, ^) into a Python expression."""
+    expr = CELL_RANGE_PATTERN.sub(_expand_range, expr)
+    expr = CELL_PATTERN.sub(lambda m: cell_name(m.group(1), int(m.group(2))), expr)
+    return expr.replace('^', '**')
+
+
+def _is_vectorizable(tree: ast.AST) -> bool:
+    """
+    Whether a formula can be evaluated directly on arrays.
+
+    Python's and/or/not, conditional expressions, chained comparisons and
+    membership/identity tests need a single truth value, so formulas using
+    them are evaluated row by row.
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.BoolOp, ast.IfExp)):
+            return False
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return False
+        if isinstance(node, ast.Compare) and (
+                len(node.ops) > 1 or isinstance(node.ops[0], (ast.In, ast.NotIn, ast.Is, ast.IsNot))):
+            return False
+    return True
+
+
+def _batch_size(columns: Dict[str, Any]) -> int:
+    """Number of rows described by a set of columns; scalars broadcast."""
+    sizes = [len(value) for value in columns.values() if np.ndim(value) > 0]
+    if not sizes:
+        return 1
+    if len(set(sizes)) > 1:
+        raise ValueError(f'Context columns have different lengths: {sorted(set(sizes))}')
+    return sizes[0]
+
+
+def _batch_rows(columns: Dict[str, Any], size: int) -> List[Dict[str, Any]]:
+    """Split columns into one context dictionary per row."""
+    return [
+        {key: value[i] if np.ndim(value) > 0 else value for key, value in columns.items()}
+        for i in range(size)
+    ]
+
+
+def _validate(tree: ast.AST) -> Tuple[str, ...]:
+    """Check the tree only uses whitelisted nodes and return the variable names it reads."""
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise FormulaError(f'Unsupported syntax: {type(node).__name__}')
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FORMULA_FUNCTIONS:
+                raise FormulaError('Unsupported function call')
+            if node.keywords:
+                raise FormulaError('Keyword arguments are not supported')
+        elif isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, bool)):
+            raise FormulaError(f'Unsupported constant: {node.value!r}')
+        elif isinstance(node, ast.Name) and node.id not in FORMULA_FUNCTIONS:
+            if node.id.startswith('__'):
+                raise FormulaError(f'Invalid name: {node.id}')
+            if node.id not in names:
+                names.append(node.id)
+    return tuple(names)
+
+
+@dataclass(frozen=True)
+class CompiledFormula:
+    """
+    A formula parsed and compiled once, ready to be evaluated against many contexts.
+
+    Only the variables the formula actually references are converted from the
+    context on each evaluation. Formulas without variables are folded to a
+    constant at compile time.
+    """
+    source: Any
+    code: Optional[Any] = None
+    names: Tuple[str, ...] = ()
+    constant: Optional[float] = None
+    vectorizable: bool = True
+    error: Optional[str] = field(default=None, compare=False)
+
+    def namespace(self, context: Dict[str, Any]) -> Dict[str, float]:
+        """Build the float namespace for this formula from a context dictionary."""
+        values = {}
+        for name in self.names:
+            if name in context:
+                try:
+                    values[name] = float(context[name])
+                except (ValueError, TypeError):
+                    values[name] = 0.0
+            elif name.startswith('cell_'):
+                # Empty cells evaluate to 0, as in Excel
+                values[name] = 0.0
+            else:
+                raise NameError(f"name '{name}' is not defined")
+        return values
+
+    def evaluate(self, context: Dict[str, Any]) -> float:
+        """Evaluate the compiled formula, returning 0.0 if it cannot be computed."""
+        if self.constant is not None:
+            return self.constant
+        if self.code is None:
+            return 0.0
+        try:
+            return float(eval(self.code, _EVAL_GLOBALS, self.namespace(context)))
+        except Exception as e:
+            logger.warning("Error evaluating formula '%s': %s", self.source, e)
+            return 0.0
+
+    def evaluate_batch(self, columns: Dict[str, Any]):
+        """
+        Evaluate the formula once over columnar contexts.
+
+        Args:
+            columns: Mapping of variable name to a sequence/array of values
+                (one per row) or a scalar shared by every row.
+
+        Returns:
+            numpy.ndarray of results (a list if NumPy is unavailable). Each row
+            gives the same result as evaluate(): rows that cannot be computed,
+            e.g. division by zero, evaluate to 0.0. If the array evaluation
+            itself fails, the rows are evaluated one by one instead.
+        """
+        if not HAS_NUMPY:
+            size = max((len(v) for v in columns.values() if isinstance(v, (list, tuple))), default=1)
+            rows = [
+                {k: v[i] if isinstance(v, (list, tuple)) else v for k, v in columns.items()}
+                for i in range(size)
+            ]
+            return [self.evaluate(row) for row in rows]
+
+        size = _batch_size(columns)
+        if self.constant is not None:
+            return np.full(size, self.constant, dtype=float)
+        if self.code is None:
+            return np.zeros(size, dtype=float)
+        if not self.vectorizable:
+            return self._evaluate_rows(columns, size)
+
+        try:
+            values = {}
+            for name in self.names:
+                if name in columns:
+                    values[name] = np.asarray(columns[name], dtype=float)
+                elif name.startswith('cell_'):
+                    values[name] = 0.0
+                else:
+                    raise NameError(f"name '{name}' is not defined")
+            with np.errstate(all='ignore'):
+                result = eval(self.code, _BATCH_GLOBALS, values)
+            result = np.array(np.broadcast_to(np.asarray(result, dtype=float), (size,)))
+        except Exception as e:
+            logger.debug("Formula '%s' cannot be evaluated on arrays, evaluating rows: %s", self.source, e)
+            return self._evaluate_rows(columns, size)
+
+        result[~np.isfinite(result)] = 0.0
+        return result
+
+    def _evaluate_rows(self, columns: Dict[str, Any], size: int):
+        return np.array([self.evaluate(row) for row in _batch_rows(columns, size)], dtype=float)
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _compile_expression(formula: str) -> CompiledFormula:
+    if not formula.startswith('='):
+        try:
+            return CompiledFormula(source=formula, constant=float(formula))
+        except ValueError:
+            return CompiledFormula(source=formula, constant=0.0)
+
+    try:
+        tree = ast.parse(_translate(formula[1:]).strip(), mode='eval')
+        names = _validate(tree)
+        code = compile(tree, f'<formula {formula}>', 'eval')
+    except (SyntaxError, FormulaError) as e:
+        logger.warning("Error compiling formula '%s': %s", formula, e)
+        return CompiledFormula(source=formula, error=str(e))
+
+    compiled = CompiledFormula(source=formula, code=code, names=names,
+                               vectorizable=_is_vectorizable(tree))
+    if not names:
+        # Constant expression: evaluate once and keep the result
+        return CompiledFormula(source=formula, constant=compiled.evaluate({}))
+    return compiled
+
+
+def compile_formula(formula: Any) -> CompiledFormula:
+    """
+    Compile an Excel-like formula (e.g. '=base*days', '=SUM(A1:B2)').
+
+    Formula strings are compiled once and kept in a bounded LRU cache, so
+    repeated calls with the same formula return the same compiled object.
+    Non-string values are treated as literal numbers.
+    """
+    if isinstance(formula, str):
+        return _compile_expression(formula)
+    try:
+        return CompiledFormula(source=formula, constant=float(formula))
+    except (ValueError, TypeError):
+        return CompiledFormula(source=formula, constant=0.0)
+
+
+def evaluate_formula(formula: Any, context: Dict[str, Any]) -> float:
+    """Compile (or fetch from cache) and evaluate a formula against a context."""
+    return compile_formula(formula).evaluate(context)
+
+
+def evaluate_formula_batch(formula: Any, columns: Dict[str, Any]):
+    """Compile (or fetch from cache) and evaluate a formula over columnar contexts."""
+    return compile_formula(formula).evaluate_batch(columns)
+
+
+def clear_formula_cache() -> None:
+    """Drop all compiled formulas."""
+    _compile_expression.cache_clear()
+
+
+def formula_cache_info():
+    """Return the LRU cache statistics for compiled formulas."""
+    return _compile_expression.cache_info()
@@ -0,0 +1,69 @@
+from decimal import Context, Decimal, ROUND_HALF_UP, localcontext
+from functools import wraps
+from typing import Any, Callable, Iterable, TypeVar
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+# Fixed context for all money arithmetic: 28 significant digits, half-up rounding
+MONEY_CONTEXT = Context(prec=28, rounding=ROUND_HALF_UP)
+CENT = Decimal('0.01')
+ZERO = Decimal('0')
+
+
+def money_context():
+    """Context manager that runs Decimal arithmetic under MONEY_CONTEXT."""
+    return localcontext(MONEY_CONTEXT)
+
+
+def in_money_context(func: F) -> F:
+    """Decorator: run the whole function under MONEY_CONTEXT."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with money_context():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def to_money(value: Any) -> Decimal:
+    """
+    Convert an input amount to Decimal once, at the edge of the pipeline.
+
+    Floats go through their shortest repr so 0.1 becomes Decimal('0.1'),
+    not the binary approximation. None and empty strings are zero.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if value is None:
+        return ZERO
+    if isinstance(value, bool):
+        return Decimal(int(value))
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    value = str(value).strip()
+    return Decimal(value) if value else ZERO
+
+
+def quantize_money(value: Any) -> Decimal:
+    """Round an amount to cents (half up). Call once, when the value leaves the pipeline."""
+    return to_money(value).quantize(CENT, context=MONEY_CONTEXT)
+
+
+def money_to_float(value: Any) -> float:
+    """Quantize to cents and return a float for float-based callers and templates."""
+    return float(quantize_money(value))
+
+
+def to_cents(value: Any) -> int:
+    """Amount as whole cents (half up)."""
+    return int(quantize_money(value) * 100)
+
+
+def money_sum(values: Iterable[Any]) -> Decimal:
+    """Sum amounts as Decimals without intermediate rounding."""
+    total = ZERO
+    with money_context():
+        for value in values:
+            total += to_money(value)
+    return total
@@ -1,18 +1,15 @@
 from typing import Dict, List, Optional, Tuple, Any, TypeVar, Generic
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 from .tdd_models import CostComponent, Quote
-from functools import lru_cache
-from dataclasses import dataclass
+from .money import ZERO, in_money_context, money_sum, money_to_float, to_money
+from .formula_engine import compile_formula, HAS_NUMPY
+from .seasons import SeasonIndex
 
-T = TypeVar('T')
-
-@dataclass
-class FormulaCacheKey:
-    """Key for caching formula results."""
-    formula: str
-    context_hash: int
+if HAS_NUMPY:
+    import numpy as np
 
+T = TypeVar('T')
 
 class PricingService:
     def __init__(self):
@@ -28,17 +25,16 @@ class PricingService:
             '20+': 0.15
         }
         self.subcontracting_margin = 0.15  # 15%
-        self.formula_cache = lru_cache(maxsize=128)(self._formula_parser)
 
     def _formula_parser(self, formula: str, context: Dict[str, Any]) -> float:
         """
         Parse and evaluate an Excel-like formula.
         
-        Enhanced features:
-        1. Supports Excel-style cell references (e.g., 'A1', 'B2')
-        2. Supports Excel-style functions (e.g., 'SUM(A1:A3)')
-        3. Supports multiple operations and parentheses
-        4. Caches results for performance
+        Supported features:
+        1. Excel-style cell references (e.g., 'A1', 'B2') and ranges ('A1:B2')
+        2. Excel-style functions (e.g., 'SUM(A1:A3)', 'IF', 'AND', 'OR')
+        3. Multiple operations, comparisons and parentheses
+        4. Compiles each distinct formula once and reuses the compiled form
         
         Args:
             formula (str): Excel-like formula (e.g., '=A1+B2*C3')
@@ -47,200 +43,229 @@ class PricingService:
         Returns:
             float: The result of evaluating the formula.
         """
-        # Return as is if it's not a formula
-        if not isinstance(formula, str) or not formula.startswith('='):
-            try:
-                return float(formula)
-            except (ValueError, TypeError):
-                return 0.0
-        
-        # Remove the '=' at the beginning
-        expr = formula[1:]
-        
-        # Convert all context values to float for safe calculation
-        safe_dict = {}
-        for k, v in context.items():
-            try:
-                safe_dict[k] = float(v)
-            except (ValueError, TypeError):
-                safe_dict[k] = 0.0
-        
-        # Add Excel-style functions
-        excel_functions = {
-            'SUM': lambda *args: sum(args),
-            'AVERAGE': lambda *args: sum(args) / len(args) if args else 0,
-            'MAX': max,
-            'MIN': min,
-            'ROUND': round,
-            'ABS': abs,
-            'POW': pow,
-            'IF': lambda cond, true_val, false_val: true_val if cond else false_val,
-            'AND': lambda *args: all(args),
-            'OR': lambda *args: any(args)
-        }
-        
-        # Add Excel-style cell references
-        cell_pattern = re.compile(r'([A-Z]+)(\d+)')
-        
-        def get_cell_value(match):
-            col = match.group(1)
-            row = int(match.group(2))
-            # Convert column letter to number (A=1, B=2, etc.)
-            col_num = sum((ord(c) - ord('A') + 1) * (26 ** i) 
-                         for i, c in enumerate(reversed(col)))
-            # Create cell reference like 'A1' -> 'cell_1_1'
-            cell_ref = f'cell_{row}_{col_num}'
-            return safe_dict.get(cell_ref, 0)
-        
-        # Replace cell references with actual values
-        expr = cell_pattern.sub(lambda m: str(get_cell_value(m)), expr)
-        
-        # Add math functions for advanced calculations
-        safe_math = {
-            'sum': sum,
-            'min': min,
-            'max': max,
-            'round': round,
-            'abs': abs,
-            'pow': pow
-        }
-        
-        # Combine all functions
-        safe_dict.update(excel_functions)
-        safe_dict.update(safe_math)
-        
-        # Handle Excel-style exponentiation (^)
-        if '^' in expr:
-            expr = expr.replace('^', '**')
-        
-        # Handle Excel-style function calls
-        def handle_function_call(match):
-            func_name = match.group(1).upper()
-            args_str = match.group(2)
-            
-            # Split arguments by comma
-            args = []
-            depth = 0
-            last_pos = 0
-            
-            for i, char in enumerate(args_str):
-                if char == ',':
-                    if depth == 0:
-                        arg = args_str[last_pos:i].strip()
-                        if arg:
-                            args.append(arg)
-                        last_pos = i + 1
-                elif char == '(':
-                    depth += 1
-                elif char == ')':
-                    depth -= 1
-            
-            # Add last argument
-            arg = args_str[last_pos:].strip()
-            if arg:
-                args.append(arg)
-            
-            # Evaluate arguments
-            evaluated_args = []
-            for arg in args:
-                try:
-                    # Try to evaluate as a number
-                    evaluated_args.append(float(arg))
-                except ValueError:
-                    # Try to evaluate as a variable from context
-                    try:
-                        evaluated_args.append(float(safe_dict[arg]))
-                    except (KeyError, ValueError):
-                        evaluated_args.append(0)
-            
-            # Call function with evaluated arguments
-            if func_name in excel_functions:
-                return str(excel_functions[func_name](*evaluated_args))
-            return arg
-        
-        # Replace function calls with their results
-        func_pattern = re.compile(r'([A-Z]+)\(([^()]*)\)')
-        expr = func_pattern.sub(handle_function_call, expr)
-        
-        # Evaluate the expression in a safe environment
-        try:
-            result = eval(expr, {"__builtins__": {}}, safe_dict)
-            return float(result)
-        except Exception as e:
-            print(f"Warning: Error evaluating formula '{formula}': {str(e)}")
-            return 0.0  # Fail gracefully in production
+        return compile_formula(formula).evaluate(context)
 
     def formula_parser(self, formula: str, context: Dict[str, Any]) -> float:
-        """Wrapper for formula parsing with caching."""
-        # Create a hashable key for caching
-        context_hash = hash(tuple(sorted(context.items())))
-        cache_key = FormulaCacheKey(formula=formula, context_hash=context_hash)
+        """Evaluate a formula using the shared compiled-formula cache."""
+        return self._formula_parser(formula, context)
+
+    def formula_parser_batch(self, formula: str, columns: Dict[str, Any]):
+        """
+        Evaluate one formula over many contexts in a single pass.
         
-        # Try to get result from cache
-        try:
-            return self.formula_cache(cache_key)
-        except TypeError:
-            # If formula is not cacheable, evaluate directly
-            return self._formula_parser(formula, context)
+        Args:
+            formula (str): Excel-like formula (e.g., '=base*days*group')
+            columns (Dict[str, Any]): Column per variable, e.g.
+                {'base': np.array([...]), 'group': np.arange(1, 41), 'days': 7}.
+                Scalars are shared by every row.
+                
+        Returns:
+            numpy.ndarray: One result per row.
+        """
+        return compile_formula(formula).evaluate_batch(columns)
 
     def calculate_base_cost(self, activities: List[Dict]) -> float:
         """Calculate base cost of all activities."""
         return sum(activity['cost'] for activity in activities)
 
-    def apply_seasonal_rates(self, base_cost: float, start_date: date) -> float:
-        """Apply seasonal rate based on travel dates."""
-        current_month = start_date.month
-        if current_month in [6, 7, 8]:  # Summer high season
-            return base_cost * self.seasonal_rates['high']
-        elif current_month in [12, 1, 2]:  # Winter high season
-            return base_cost * self.seasonal_rates['high']
-        elif current_month in [3, 4, 9, 10]:  # Shoulder season
-            return base_cost * self.seasonal_rates['shoulder']
+    @in_money_context
+    def apply_seasonal_rates(self, base_cost: float, start_date: date,
+                             season_index: Optional[SeasonIndex] = None) -> float:
+        """Apply seasonal rate based on travel dates.
+        
+        When a SeasonIndex (e.g. seasonal_rate_index.for_supplier(id)) is given,
+        the multiplier comes from the supplier's SeasonalRate rows; dates outside
+        every season fall back to the month-based rates below.
+        """
+        return float(to_money(base_cost) * self.seasonal_multiplier(start_date, season_index))
+
+    def seasonal_multiplier(self, start_date: date, season_index: Optional[SeasonIndex] = None) -> Decimal:
+        """Seasonal multiplier for a travel date, as a Decimal (see apply_seasonal_rates)."""
+        if season_index is not None:
+            season = season_index.lookup(start_date)
+            if season is not None:
+                return to_money(season.multiplier)
+        
+        return to_money(self.seasonal_rates[self._month_season(start_date.month)])
+
+    def _month_season(self, month: int) -> str:
+        """Default season for a calendar month when no SeasonalRate covers it."""
+        if month in [6, 7, 8]:  # Summer high season
+            return 'high'
+        elif month in [12, 1, 2]:  # Winter high season
+            return 'high'
+        elif month in [3, 4, 9, 10]:  # Shoulder season
+            return 'shoulder'
         else:  # Low season
-            return base_cost * self.seasonal_rates['low']
+            return 'low'
+
+    def seasonal_segments(self, start_date: date, end_date: date,
+                          season_index: Optional[SeasonIndex] = None) -> List[Dict]:
+        """
+        Split the nights from start_date to end_date into season segments.
+        
+        Nights covered by the season index use its multipliers; uncovered
+        nights are split at month boundaries and use the month-based rates.
+        Segment lengths are computed from the boundaries, not by walking
+        each night.
+        
+        Returns:
+            List of dicts with start_date, end_date (last night), nights,
+            season and multiplier.
+        """
+        runs = season_index.split(start_date, end_date) if season_index is not None \
+            else [(start_date, end_date - timedelta(days=1), None)]
+        
+        segments = []
+        for first_night, last_night, season in runs:
+            if season is not None:
+                segments.append(self._segment(first_night, last_night, season.season_name, season.multiplier))
+                continue
+            # Not covered by a SeasonalRate: fall back to the month-based seasons
+            cursor = first_night
+            while cursor <= last_night:
+                next_month = date(cursor.year + cursor.month // 12, cursor.month % 12 + 1, 1)
+                run_end = min(next_month - timedelta(days=1), last_night)
+                name = self._month_season(cursor.month)
+                multiplier = self.seasonal_rates[name]
+                previous = segments[-1] if segments else None
+                if previous and (previous['season'], previous['multiplier']) == (name, multiplier) \
+                        and previous['end_date'] + timedelta(days=1) == cursor:
+                    segments[-1] = self._segment(previous['start_date'], run_end, name, multiplier)
+                else:
+                    segments.append(self._segment(cursor, run_end, name, multiplier))
+                cursor = run_end + timedelta(days=1)
+        return segments
+
+    @staticmethod
+    def _segment(first_night: date, last_night: date, season: str, multiplier: float) -> Dict:
+        return {
+            'start_date': first_night,
+            'end_date': last_night,
+            'nights': (last_night - first_night).days + 1,
+            'season': season,
+            'multiplier': multiplier,
+        }
 
+    def apply_seasonal_rates_per_night(self, nightly_cost: float, start_date: date, end_date: date,
+                                       season_index: Optional[SeasonIndex] = None) -> Dict:
+        """
+        Price every night of a stay at the rate of its own season.
+        
+        A stay that straddles low and high season is charged the low rate for
+        its low-season nights and the high rate for the rest.
+        """
+        segments, total_cost = self._price_nights(nightly_cost, start_date, end_date, season_index)
+        return {
+            'nights': sum(segment['nights'] for segment in segments),
+            'segments': segments,
+            'total_cost': money_to_float(total_cost),
+        }
+
+    @in_money_context
+    def _price_nights(self, nightly_cost: float, start_date: date, end_date: date,
+                      season_index: Optional[SeasonIndex]) -> Tuple[List[Dict], Decimal]:
+        """Season segments with their cost, and the unrounded Decimal total of the stay."""
+        segments = self.seasonal_segments(start_date, end_date, season_index)
+        nightly = to_money(nightly_cost)
+        total = ZERO
+        for segment in segments:
+            cost = nightly * segment['nights'] * to_money(segment['multiplier'])
+            segment['cost'] = money_to_float(cost)
+            total += cost
+        return segments, total
+
+    @in_money_context
+    def price_itinerary_nights(self, lines: List[Dict],
+                               season_indexes: Optional[Dict[Any, SeasonIndex]] = None) -> Dict:
+        """
+        Per-night seasonal pricing for many supplier lines at once.
+        
+        Args:
+            lines: Dicts with supplier_id, nightly_cost, start_date and end_date.
+            season_indexes: SeasonIndex per supplier_id. When omitted, the
+                indexes for all suppliers are loaded from the database in one
+                query via seasonal_rate_index.
+                
+        Returns:
+            Dict with the priced lines and the overall total_cost.
+        """
+        if season_indexes is None:
+            from .seasons import seasonal_rate_index
+            season_indexes = seasonal_rate_index.load({line.get('supplier_id') for line in lines})
+        
+        priced = []
+        total_cost = ZERO
+        for line in lines:
+            segments, line_cost = self._price_nights(
+                line['nightly_cost'], line['start_date'], line['end_date'],
+                season_indexes.get(line.get('supplier_id'))
+            )
+            priced.append({**line, 'nights': sum(segment['nights'] for segment in segments),
+                           'segments': segments, 'total_cost': money_to_float(line_cost)})
+            total_cost += line_cost
+        
+        return {
+            'lines': priced,
+            'total_cost': money_to_float(total_cost),
+        }
+
+    @in_money_context
     def apply_group_discount(self, total_cost: float, group_size: int) -> float:
         """Apply group discount based on number of travelers."""
+        return float(to_money(total_cost) * self.group_discount_factor(group_size))
+
+    @in_money_context
+    def group_discount_factor(self, group_size: int) -> Decimal:
+        """Multiplier left after the group discount, as a Decimal."""
         if group_size <= 0:
             raise ValueError("Group size must be greater than 0")
         
         if group_size < 5:
-            return total_cost * (1 - self.group_discounts['1-4'])
+            band = '1-4'
         elif group_size < 10:
-            return total_cost * (1 - self.group_discounts['5-9'])
+            band = '5-9'
         elif group_size < 20:
-            return total_cost * (1 - self.group_discounts['10-19'])
+            band = '10-19'
         else:
-            return total_cost * (1 - self.group_discounts['20+'])
+            band = '20+'
+        return 1 - to_money(self.group_discounts[band])
 
+    @in_money_context
     def add_subcontracting_margin(self, total_cost: float) -> float:
         """Add subcontracting margin to the total cost."""
-        return total_cost * (1 + self.subcontracting_margin)
+        return float(to_money(total_cost) * self.subcontracting_factor())
+
+    @in_money_context
+    def subcontracting_factor(self) -> Decimal:
+        return 1 + to_money(self.subcontracting_margin)
 
+    @in_money_context
     def create_quote(self, activities: List[Dict], start_date: date, end_date: date, 
                     group_size: int, margin_percentage: float = 0.0) -> Dict:
         """Create a complete quote with all calculations."""
-        # Calculate base cost
-        base_cost = self.calculate_base_cost(activities)
+        # Amounts are Decimal from here on; each factor is converted once
+        # and results are only rounded to cents on the way out.
+        base_cost = money_sum(activity['cost'] for activity in activities)
         
         # Apply seasonal rates
-        seasonal_cost = self.apply_seasonal_rates(base_cost, start_date)
+        seasonal_cost = base_cost * self.seasonal_multiplier(start_date)
         
         # Apply group discount
-        discounted_cost = self.apply_group_discount(seasonal_cost, group_size)
+        discounted_cost = seasonal_cost * self.group_discount_factor(group_size)
         
         # Add subcontracting margin
-        total_cost = self.add_subcontracting_margin(discounted_cost)
+        total_cost = discounted_cost * self.subcontracting_factor()
         
         # Calculate final price with margin
-        final_price = total_cost * (1 + (margin_percentage / 100))
+        final_price = total_cost * (1 + to_money(margin_percentage) / 100)
         
         return {
-            'base_cost': base_cost,
-            'seasonal_cost': seasonal_cost,
-            'discounted_cost': discounted_cost,
-            'total_cost': total_cost,
-            'final_price': final_price,
+            'base_cost': money_to_float(base_cost),
+            'seasonal_cost': money_to_float(seasonal_cost),
+            'discounted_cost': money_to_float(discounted_cost),
+            'total_cost': money_to_float(total_cost),
+            'final_price': money_to_float(final_price),
             'margin_percentage': margin_percentage,
             'start_date': start_date,
             'end_date': end_date,
@@ -248,6 +273,7 @@ class PricingService:
             'activities': activities
         }
 
+    @in_money_context
     def calculate_complex_cost(self, base_cost: float, 
                               seasonal_factor: float,
                               group_size: int,
@@ -261,7 +287,7 @@ class PricingService:
         3. Returns the final amount with proper rounding
         
         Enhanced features:
-        1. Caches formula results for performance
+        1. Compiles each formula once and reuses it for every charge
         2. Supports Excel-style cell references
         3. Supports Excel-style functions (SUM, AVERAGE, etc.)
         4. Handles complex expressions with multiple operations
@@ -273,8 +299,9 @@ class PricingService:
         if seasonal_factor <= 0:
             raise ValueError("Seasonal factor must be greater than 0")
         
-        # Start with 0 - we'll add all charges explicitly
-        total = 0
+        # Start with 0 - we'll add all charges explicitly. The running total
+        # is a Decimal; formula results are converted as they are added.
+        total = ZERO
         
         # STEP 1: Create a base context for all formulas
         base_context = {
@@ -303,76 +330,80 @@ class PricingService:
                     
                 if charge.get('type') == 'percentage':
                     # Apply as percentage adjustment
-                    total += total * formula_value  # Directly apply the percentage
+                    total += total * to_money(formula_value)  # Directly apply the percentage
                 else:
                     # Add formula result as fixed amount
-                    total += formula_value
+                    total += to_money(formula_value)
             else:
                 # Use provided value if no formula
                 if charge.get('type') == 'percentage':
-                    total += total * charge['value']
+                    total += total * to_money(charge['value'])
                 else:
-                    total += charge['value']
+                    total += to_money(charge['value'])
         
         # STEP 3: Apply group discount AFTER all charges
         # This is equivalent to a percentage rebate in Excel
         if group_size > 10:
-            total *= 0.9  # 10% bulk discount
+            total *= Decimal('0.9')  # 10% bulk discount
                     
-        return round(total, 2)
+        return money_to_float(total)
 
-    def _formula_parser(self, formula: str, context: Dict[str, Any]) -> float:
+    @in_money_context
+    def calculate_complex_cost_batch(self, base_cost: float,
+                                     seasonal_factor: float,
+                                     group_sizes,
+                                     additional_charges: List[Dict]):
         """
-        Parse and evaluate an Excel-like formula.
+        Vectorized calculate_complex_cost for a range of group sizes.
+        
+        Each charge formula is evaluated once over all group sizes instead of
+        once per group size, e.g. for GROUP quotes priced from
+        quoted_passenger_min to quoted_passenger_max. The running totals are
+        then accumulated per row in Decimal exactly as calculate_complex_cost
+        does, so both paths round half up to the same cent.
         
-        Args:
-            formula (str): Excel-like formula (e.g., '=A1+B2*C3')
-            context (Dict[str, Any]): Dictionary of values to use in the formula.
-            
         Returns:
-            float: The result of evaluating the formula.
+            numpy.ndarray: The cost for each entry of group_sizes, rounded to 2 decimals.
         """
-        # Return as is if it's not a formula
-        if not isinstance(formula, str) or not formula.startswith('='):
-            try:
-                return float(formula)
-            except (ValueError, TypeError):
-                return 0.0
-        
-        # Remove the '=' at the beginning
-        expr = formula[1:]
+        if not HAS_NUMPY:
+            return [self.calculate_complex_cost(base_cost, seasonal_factor, group, additional_charges)
+                    for group in group_sizes]
         
-        # Convert all context values to float for safe calculation
-        safe_dict = {}
-        for k, v in context.items():
-            try:
-                safe_dict[k] = float(v)
-            except (ValueError, TypeError):
-                safe_dict[k] = 0.0
+        groups = np.asarray(group_sizes, dtype=float)
+        if groups.size and groups.min() <= 0:
+            raise ValueError("Group size must be greater than 0")
+            
+        if seasonal_factor <= 0:
+            raise ValueError("Seasonal factor must be greater than 0")
         
-        # Add math functions for advanced calculations
-        safe_math = {
-            'sum': sum,
-            'min': min,
-            'max': max,
-            'round': round,
-            'abs': abs,
-            'pow': pow  # Add power function for exponentiation
+        totals = [ZERO] * groups.size
+        base_columns = {
+            'base': base_cost,
+            'seasonal': seasonal_factor,
+            'group': groups,
+            'total': 0,
         }
-        safe_dict.update(safe_math)
         
-        # Handle Excel-style exponentiation (^)
-        if '^' in expr:
-            expr = expr.replace('^', '**')
+        for i, charge in enumerate(additional_charges):
+            if 'formula' in charge:
+                columns = dict(base_columns)
+                columns.update({
+                    'days': charge.get('days', 1),
+                    'quantity': charge.get('quantity', 1),
+                    'charge_index': i + 1,
+                })
+                values = np.broadcast_to(self.formula_parser_batch(charge['formula'], columns), groups.shape)
+                # Same float -> Decimal conversion as the scalar path
+                amounts = [to_money(float(value)) for value in values]
+            else:
+                amounts = [to_money(charge['value'])] * groups.size
+                
+            if charge.get('type') == 'percentage':
+                totals = [total + total * amount for total, amount in zip(totals, amounts)]
+            else:
+                totals = [total + amount for total, amount in zip(totals, amounts)]
         
-        # Evaluate the expression in a safe environment
-        try:
-            result = eval(expr, {"__builtins__": {}}, safe_dict)
-            return float(result)
-        except Exception as e:
-            print(f"Warning: Error evaluating formula '{formula}': {str(e)}")
-            return 0.0  # Fail gracefully in production
-
-    def formula_parser(self, formula: str, context: Dict[str, Any]) -> float:
-        """Wrapper for formula parsing."""
-        return self._formula_parser(formula, context)
+        # Same 10% bulk discount as calculate_complex_cost
+        discount = Decimal('0.9')
+        return np.array([money_to_float(total * discount if group > 10 else total)
+                         for total, group in zip(totals, groups)], dtype=float)
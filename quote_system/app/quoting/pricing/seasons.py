@@ -0,0 +1,240 @@
+import heapq
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ONE_DAY = timedelta(days=1)
+
+# Seconds a supplier's season index is trusted before it is reloaded. Commits
+# only invalidate this process's copy, so other workers catch up within this.
+SEASON_INDEX_TTL = 300
+
+# Marker in session.info['season_invalidate'] for "drop every supplier"
+_ALL_SUPPLIERS = object()
+
+
+@dataclass(frozen=True)
+class SeasonInterval:
+    """A season (inclusive date range) and the rate multiplier that applies during it."""
+    start: date
+    end: date
+    multiplier: float
+    season_name: str = ''
+    priority: int = 0
+
+
+class SeasonIndex:
+    """
+    Sorted, non-overlapping season segments searchable with bisect.
+
+    Overlapping seasons are flattened when the index is built: where two
+    seasons overlap, the one starting later wins (so a short peak period
+    defined inside a broad high season takes precedence), with ties broken
+    by priority. Lookups are then O(log n).
+    """
+
+    def __init__(self, intervals: Iterable[SeasonInterval] = ()):
+        self._starts: List[date] = []
+        self._ends: List[date] = []
+        self._seasons: List[SeasonInterval] = []
+        self._build([iv for iv in intervals if iv.start and iv.end and iv.start <= iv.end])
+
+    def _build(self, intervals: List[SeasonInterval]) -> None:
+        if not intervals:
+            return
+        boundaries = sorted({iv.start for iv in intervals} | {iv.end + ONE_DAY for iv in intervals})
+        ordered = sorted(intervals, key=lambda iv: iv.start)
+        active: List[Tuple] = []
+        next_interval = 0
+
+        for i in range(len(boundaries) - 1):
+            segment_start, segment_end = boundaries[i], boundaries[i + 1] - ONE_DAY
+            while next_interval < len(ordered) and ordered[next_interval].start <= segment_start:
+                iv = ordered[next_interval]
+                heapq.heappush(active, (-iv.start.toordinal(), -iv.priority, next_interval, iv))
+                next_interval += 1
+            while active and active[0][3].end < segment_start:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            season = active[0][3]
+            if self._seasons and self._seasons[-1] is season and self._ends[-1] + ONE_DAY == segment_start:
+                self._ends[-1] = segment_end
+            else:
+                self._starts.append(segment_start)
+                self._ends.append(segment_end)
+                self._seasons.append(season)
+
+    def __len__(self) -> int:
+        return len(self._seasons)
+
+    @property
+    def segments(self) -> List[Tuple[date, date, SeasonInterval]]:
+        """The flattened (start, end, season) segments in date order."""
+        return list(zip(self._starts, self._ends, self._seasons))
+
+    def lookup(self, day: date) -> Optional[SeasonInterval]:
+        """Return the season covering a date, or None if no season applies."""
+        if isinstance(day, datetime):
+            day = day.date()
+        i = bisect_right(self._starts, day) - 1
+        if i >= 0 and day <= self._ends[i]:
+            return self._seasons[i]
+        return None
+
+    def multiplier_for(self, day: date, default: float = 1.0) -> float:
+        """Return the rate multiplier for a date, or the default outside all seasons."""
+        season = self.lookup(day)
+        return season.multiplier if season else default
+
+    def split(self, start: date, end: date) -> List[Tuple[date, date, Optional[SeasonInterval]]]:
+        """
+        Split the days start..end-1 into contiguous runs that share one season.
+
+        Returns (first_day, last_day, season) tuples covering the whole span;
+        season is None for runs no season covers. Only the segments touching
+        the span are visited, so the cost depends on the number of season
+        changes, not on the number of days.
+        """
+        runs = []
+        last_day = end - ONE_DAY
+        if last_day < start:
+            return runs
+
+        i = bisect_right(self._starts, start) - 1
+        if i < 0 or self._ends[i] < start:
+            i += 1
+        cursor = start
+        while cursor <= last_day:
+            if i < len(self._starts) and self._starts[i] <= cursor:
+                run_end = min(self._ends[i], last_day)
+                runs.append((cursor, run_end, self._seasons[i]))
+                i += 1
+            else:
+                next_start = self._starts[i] if i < len(self._starts) else end
+                run_end = min(next_start - ONE_DAY, last_day)
+                runs.append((cursor, run_end, None))
+            cursor = run_end + ONE_DAY
+        return runs
+
+
+class SeasonalRateIndex:
+    """
+    Per-supplier SeasonIndex cache built from Rate/SeasonalRate rows.
+
+    Indexes are loaded lazily (one query for any number of suppliers) so
+    pricing a multi-day itinerary never queries per night. Suppliers whose
+    Rate or SeasonalRate rows change are collected during flush and dropped
+    once the transaction commits (a rollback discards them). Each index also
+    expires after ``ttl`` seconds, so changes committed by other processes
+    are picked up too.
+    """
+
+    def __init__(self, ttl: float = SEASON_INDEX_TTL):
+        self.ttl = ttl
+        self._indexes: Dict[Optional[int], Tuple[float, SeasonIndex]] = {}
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def for_supplier(self, supplier_id: Optional[int]) -> SeasonIndex:
+        """Return the season index for a supplier, loading it if missing or expired."""
+        entry = self._indexes.get(supplier_id)
+        if entry is None or entry[0] < time.monotonic():
+            return self.load([supplier_id])[supplier_id]
+        return entry[1]
+
+    def multiplier_for(self, supplier_id: Optional[int], day: date, default: float = 1.0) -> float:
+        """Resolve the seasonal multiplier for a supplier on a date."""
+        return self.for_supplier(supplier_id).multiplier_for(day, default)
+
+    def load(self, supplier_ids: Iterable[Optional[int]]) -> Dict[Optional[int], SeasonIndex]:
+        """Build and cache the indexes for several suppliers with a single query."""
+        from quote_system.database.rate_models import db, Rate, SeasonalRate
+
+        self._register_listeners()
+        supplier_ids = list(dict.fromkeys(supplier_ids))
+        intervals: Dict[Optional[int], List[SeasonInterval]] = {sid: [] for sid in supplier_ids}
+
+        query = db.session.query(SeasonalRate, Rate).join(Rate, SeasonalRate.rate_id == Rate.id)
+        known_ids = [sid for sid in supplier_ids if sid is not None]
+        if None in intervals:
+            query = query.filter((Rate.supplier_id.in_(known_ids)) | (Rate.supplier_id.is_(None)))
+        else:
+            query = query.filter(Rate.supplier_id.in_(known_ids))
+
+        for seasonal_rate, rate in query.all():
+            intervals[rate.supplier_id].append(SeasonInterval(
+                start=seasonal_rate.start_date or rate.start_date,
+                end=seasonal_rate.end_date or rate.end_date,
+                multiplier=seasonal_rate.multiplier,
+                season_name=seasonal_rate.season_name,
+                priority=seasonal_rate.id,
+            ))
+
+        indexes = {sid: SeasonIndex(ivs) for sid, ivs in intervals.items()}
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._indexes.update((sid, (expires, index)) for sid, index in indexes.items())
+        return indexes
+
+    def invalidate(self, supplier_id: Optional[int] = None, all_suppliers: bool = False) -> None:
+        """Drop the cached index for a supplier (or every supplier)."""
+        with self._lock:
+            if all_suppliers:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(supplier_id, None)
+
+    def _register_listeners(self) -> None:
+        with self._lock:
+            if self._listening:
+                return
+            self._listening = True
+        from sqlalchemy import event, inspect
+        from sqlalchemy.orm import Session
+        from quote_system.database.rate_models import Rate, SeasonalRate
+
+        def changed_suppliers(session, obj) -> set:
+            if isinstance(obj, Rate):
+                # A rate moved to another supplier also changes the old supplier's seasons
+                return {obj.supplier_id, *inspect(obj).attrs.supplier_id.history.deleted}
+            if isinstance(obj, SeasonalRate):
+                rate_ids = {obj.rate_id, *inspect(obj).attrs.rate_id.history.deleted}
+                rates = [session.get(Rate, rate_id) for rate_id in rate_ids if rate_id is not None]
+                if None in rates:
+                    return {_ALL_SUPPLIERS}
+                return {rate.supplier_id for rate in rates}
+            return set()
+
+        def collect(session, flush_context):
+            changed = set()
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                changed |= changed_suppliers(session, obj)
+            if changed:
+                session.info.setdefault('season_invalidate', set()).update(changed)
+
+        def committed(session):
+            # Invalidate only once the change is visible to other requests
+            supplier_ids = session.info.pop('season_invalidate', None)
+            if not supplier_ids:
+                return
+            if _ALL_SUPPLIERS in supplier_ids:
+                self.invalidate(all_suppliers=True)
+                return
+            for supplier_id in supplier_ids:
+                self.invalidate(supplier_id)
+
+        def rolled_back(session, previous_transaction):
+            session.info.pop('season_invalidate', None)
+
+        event.listen(Session, 'after_flush', collect)
+        event.listen(Session, 'after_commit', committed)
+        event.listen(Session, 'after_soft_rollback', rolled_back)
+
+
+# Shared index used by the pricing services
+seasonal_rate_index = SeasonalRateIndex()
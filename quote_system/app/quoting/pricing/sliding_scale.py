@@ -0,0 +1,108 @@
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .money import in_money_context, money_sum, money_to_float, quantize_money, to_money
+from .pricing_service import PricingService
+from .tdd_models import Quote
+
+# Columns of a scale row that are rates rather than amounts (not rounded to cents)
+RATE_COLUMNS = ('discount',)
+
+
+def discount_tiers(group_discounts: Dict[str, float]) -> Tuple[List[int], List[Decimal]]:
+    """
+    Turn PricingService-style discount bands ('1-4', '5-9', '20+') into sorted
+    lower bounds and Decimal rates, so a discount can be found with a binary search.
+    """
+    tiers = []
+    for band, rate in group_discounts.items():
+        lower = band.rstrip('+').split('-')[0]
+        tiers.append((int(lower), to_money(rate)))
+    tiers.sort()
+    return [lower for lower, _ in tiers], [rate for _, rate in tiers]
+
+
+class SlidingScaleEngine:
+    """
+    Builds per-passenger price tables for a quote over a range of group sizes.
+
+    Everything that does not depend on the number of passengers (fixed cost
+    total, variable cost per pax, crew meals, discount tiers) is computed once;
+    the per-pax allocation, group discount and totals are then computed for
+    each pax count in Decimal and only converted to float in the returned rows.
+
+    The per-pax step is a Python loop rather than one NumPy pass over every
+    pax count: float arrays round differently from Decimal (a penny off on
+    half-cent amounts), and exact integer arrays overflow int64 once amount,
+    season, discount and margin scales are multiplied together. A scale is a
+    few dozen rows of a handful of Decimal operations each, so the loop costs
+    microseconds next to loading the quote.
+    """
+
+    def __init__(self, pricing_service: Optional[PricingService] = None):
+        self.pricing_service = pricing_service or PricingService()
+        self.tier_bounds, self.tier_rates = discount_tiers(self.pricing_service.group_discounts)
+
+    @in_money_context
+    def generate(self, quote: Quote, pax_range: Iterable[int],
+                 seasonal_multiplier: float = 1.0,
+                 margin_percentage: float = 0.0) -> Dict[int, Dict[str, float]]:
+        """
+        Generate the sliding scale for a quote.
+
+        Args:
+            quote: Quote whose fixed, variable and crew costs are priced
+            pax_range: Passenger counts to price (e.g. range(1, 41))
+            seasonal_multiplier: Multiplier for the travel season (1.0 = base rate)
+            margin_percentage: Margin added on top of the discounted cost
+
+        Returns:
+            Mapping of pax count to its cost breakdown per passenger and total.
+        """
+        pax_counts = [int(pax) for pax in pax_range]
+        if any(pax <= 0 for pax in pax_counts):
+            raise ValueError("Group size must be greater than 0")
+        if seasonal_multiplier <= 0:
+            raise ValueError("Seasonal factor must be greater than 0")
+        if not pax_counts:
+            return {}
+
+        # Pax-independent intermediates, computed once per quote
+        fixed_total = quote.total_fixed_cost
+        crew_meal_total = to_money(quote.crew_meal_cost)
+        variable_per_pax = money_sum(c.money for c in quote.variable_costs)
+        seasonal = to_money(seasonal_multiplier)
+        margin_factor = 1 + to_money(margin_percentage) / 100
+
+        scale = {}
+        for pax in pax_counts:
+            row = self._price_row(pax, fixed_total, crew_meal_total, variable_per_pax, seasonal, margin_factor)
+            scale[pax] = {key: pax if key == 'pax' else float(value) if key in RATE_COLUMNS
+                          else money_to_float(value) for key, value in row.items()}
+        return scale
+
+    def generate_for_range(self, quote: Quote, pax_min: int, pax_max: Optional[int] = None,
+                           **kwargs) -> Dict[int, Dict[str, float]]:
+        """Generate the sliding scale for pax_min..pax_max inclusive."""
+        return self.generate(quote, range(pax_min, (pax_max or pax_min) + 1), **kwargs)
+
+    def _price_row(self, pax: int, fixed_total: Decimal, crew_meal_total: Decimal, variable_per_pax: Decimal,
+                   seasonal: Decimal, margin_factor: Decimal) -> Dict[str, Decimal]:
+        # Fixed costs are shared to the cent like Quote.cost_per_pax
+        fixed_per_pax = quantize_money(fixed_total / pax)
+        crew_per_pax = crew_meal_total / pax
+        cost_per_pax = (fixed_per_pax + crew_per_pax + variable_per_pax) * seasonal
+        tier_index = bisect_right(self.tier_bounds, pax) - 1
+        discount = self.tier_rates[tier_index] if tier_index >= 0 else Decimal(0)
+        price_per_pax = cost_per_pax * (1 - discount) * margin_factor
+        return {
+            'pax': pax,
+            'fixed_per_pax': fixed_per_pax,
+            'crew_per_pax': crew_per_pax,
+            'variable_per_pax': variable_per_pax,
+            'seasonal_cost_per_pax': cost_per_pax,
+            'discount': discount,
+            'price_per_pax': price_per_pax,
+            'total': price_per_pax * pax,
+        }
@@ -1,4 +1,5 @@
 from typing import List, Dict, Optional
+from .money import in_money_context, money_sum, money_to_float, to_money
 
 class CostComponent:
     def __init__(self, name: str, amount: float, unit: Optional[str] = None):
@@ -6,6 +7,16 @@ class CostComponent:
         self.amount = amount
         self.unit = unit
 
+    @property
+    def amount(self):
+        return self._amount
+
+    @amount.setter
+    def amount(self, value):
+        # Convert to Decimal once on input rather than on every calculation
+        self._amount = value
+        self.money = to_money(value)
+
 class Quote:
     def __init__(self, pax: int, fixed_costs: Optional[List[CostComponent]] = None, variable_costs: Optional[List[CostComponent]] = None, crew: int = 0, meal_plan: Optional[str] = None, days: int = 1):
         self.pax = pax
@@ -16,14 +27,16 @@ class Quote:
         self.days = days
 
     @property
+    def total_fixed_cost(self):
+        return money_sum(c.money for c in self.fixed_costs)
+
+    @property
+    @in_money_context
     def cost_per_pax(self) -> float:
-        from decimal import Decimal, ROUND_HALF_UP
-        total_fixed = sum(c.amount for c in self.fixed_costs)
         if not self.pax:
             return 0
-        # Use Decimal for financial rounding
-        value = Decimal(str(total_fixed)) / Decimal(str(self.pax))
-        return float(value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+        # Decimal division, rounded half up to the cent only on output
+        return money_to_float(self.total_fixed_cost / self.pax)
 
     @property
     def total_variable_cost(self) -> float:
@@ -41,6 +54,12 @@ class PricingEngine:
             return base_cost * 1.15
         return base_cost
 
-    def generate_sliding_scale(self, pax_range: List[int]) -> Dict[int, float]:
-        base = 1000
-        return {pax: base * (0.95 if pax > 10 else 1) for pax in pax_range}
+    def generate_sliding_scale(self, pax_range: List[int], quote: Optional[Quote] = None,
+                               season: Optional[str] = None) -> Dict[int, float]:
+        if quote is None:
+            base = 1000
+            return {pax: base * (0.95 if pax > 10 else 1) for pax in pax_range}
+        from .sliding_scale import SlidingScaleEngine
+        multiplier = self.apply_markup(1.0, season)
+        scale = SlidingScaleEngine().generate(quote, pax_range, seasonal_multiplier=multiplier)
+        return {pax: row['price_per_pax'] for pax, row in scale.items()}
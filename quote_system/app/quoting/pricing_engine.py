@@ -1,5 +1,28 @@
 from datetime import date
-from typing import Dict, List
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pricing.formula_engine import compile_formula
+from .pricing.money import in_money_context, money_sum, money_to_float, to_money
+from .pricing.seasons import SeasonIndex
+
+
+class FormulaParser:
+    """Evaluates Excel-like formulas using the shared compiled-formula cache."""
+
+    def parse(self, formula: str, context: Dict[str, Any]) -> float:
+        """Evaluate a formula against a context, returning 0.0 on error."""
+        return compile_formula(formula).evaluate(context)
+
+    def debug_parse(self, formula: str, context: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
+        """Evaluate a formula and also return the float values it was evaluated with."""
+        compiled = compile_formula(formula)
+        try:
+            values = compiled.namespace(context)
+        except NameError:
+            values = {}
+        return compiled.evaluate(context), values
+
 
 class QuoteEngine:
     def __init__(self):
@@ -15,63 +38,87 @@ class QuoteEngine:
             '20+': 0.15
         }
         self.subcontracting_margin = 0.15  # 15%
+        self.formula_parser = FormulaParser()
 
     def _calculate_base_cost(self, activities: List[Dict]) -> float:
         """Calculate base cost of all activities."""
         return sum(activity['cost'] for activity in activities)
 
-    def _apply_seasonal_rates(self, base_cost: float, start_date: date) -> float:
-        """Apply seasonal rate based on travel dates."""
+    def _apply_seasonal_rates(self, base_cost: float, start_date: date,
+                              season_index: Optional[SeasonIndex] = None) -> float:
+        """Apply seasonal rate based on travel dates, using season_index when it covers the date."""
+        return base_cost * float(self.seasonal_multiplier(start_date, season_index))
+
+    def seasonal_multiplier(self, start_date: date, season_index: Optional[SeasonIndex] = None) -> Decimal:
+        """Seasonal multiplier for a travel date, as a Decimal."""
+        if season_index is not None:
+            season = season_index.lookup(start_date)
+            if season is not None:
+                return to_money(season.multiplier)
+
         # Simple seasonal rate logic - implement more complex logic as needed
         current_month = start_date.month
         if current_month in [6, 7, 8]:  # Summer high season
-            return base_cost * self.seasonal_rates['high']
+            return to_money(self.seasonal_rates['high'])
         elif current_month in [12, 1, 2]:  # Winter high season
-            return base_cost * self.seasonal_rates['high']
+            return to_money(self.seasonal_rates['high'])
         elif current_month in [3, 4, 9, 10]:  # Shoulder season
-            return base_cost * self.seasonal_rates['shoulder']
+            return to_money(self.seasonal_rates['shoulder'])
         else:  # Low season
-            return base_cost * self.seasonal_rates['low']
+            return to_money(self.seasonal_rates['low'])
 
     def _apply_group_discount(self, total_cost: float, group_size: int) -> float:
         """Apply group discount based on number of travelers."""
+        return total_cost * float(self.group_discount_factor(group_size))
+
+    @in_money_context
+    def group_discount_factor(self, group_size: int) -> Decimal:
+        """Multiplier left after the group discount, as a Decimal."""
         if group_size < 5:
-            return total_cost * (1 - self.group_discounts['1-4'])
+            band = '1-4'
         elif group_size < 10:
-            return total_cost * (1 - self.group_discounts['5-9'])
+            band = '5-9'
         elif group_size < 20:
-            return total_cost * (1 - self.group_discounts['10-19'])
+            band = '10-19'
         else:
-            return total_cost * (1 - self.group_discounts['20+'])
+            band = '20+'
+        return 1 - to_money(self.group_discounts[band])
 
     def _add_subcontracting_margin(self, total_cost: float) -> float:
         """Add subcontracting margin to the total cost."""
-        return total_cost * (1 + self.subcontracting_margin)
+        return total_cost * float(self.subcontracting_factor())
+
+    @in_money_context
+    def subcontracting_factor(self) -> Decimal:
+        """Multiplier that adds the subcontracting margin, as a Decimal."""
+        return 1 + to_money(self.subcontracting_margin)
 
+    @in_money_context
     def create_quote(self, activities: List[Dict], start_date: date, end_date: date, 
                     group_size: int, margin_percentage: float = 0.0) -> Dict:
         """Create a complete quote with all calculations."""
-        # Calculate base cost
-        base_cost = self._calculate_base_cost(activities)
+        # Amounts are Decimal from here on; each factor is converted once
+        # and results are only rounded to cents on the way out.
+        base_cost = money_sum(activity['cost'] for activity in activities)
         
         # Apply seasonal rates
-        seasonal_cost = self._apply_seasonal_rates(base_cost, start_date)
+        seasonal_cost = base_cost * self.seasonal_multiplier(start_date)
         
         # Apply group discount
-        discounted_cost = self._apply_group_discount(seasonal_cost, group_size)
+        discounted_cost = seasonal_cost * self.group_discount_factor(group_size)
         
         # Add subcontracting margin
-        total_cost = self._add_subcontracting_margin(discounted_cost)
+        total_cost = discounted_cost * self.subcontracting_factor()
         
         # Calculate final price with margin
-        final_price = total_cost * (1 + (margin_percentage / 100))
+        final_price = total_cost * (1 + to_money(margin_percentage) / 100)
         
         return {
-            'base_cost': base_cost,
-            'seasonal_cost': seasonal_cost,
-            'discounted_cost': discounted_cost,
-            'total_cost': total_cost,
-            'final_price': final_price,
+            'base_cost': money_to_float(base_cost),
+            'seasonal_cost': money_to_float(seasonal_cost),
+            'discounted_cost': money_to_float(discounted_cost),
+            'total_cost': money_to_float(total_cost),
+            'final_price': money_to_float(final_price),
             'margin_percentage': margin_percentage,
             'start_date': start_date,
             'end_date': end_date,
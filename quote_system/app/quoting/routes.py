@@ -1,17 +1,23 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import current_user
 from quote_system.app.auth.decorators import login_required
-from quote_system.database.models import db, Quote, Activity, Supplier
+from quote_system.database.models import db, Quote, Activity, Agent, Supplier
 from .pricing_engine import QuoteEngine
 from .wetu_integration import WetuManager
+from quote_system.app.utils import get_quote_or_404
+from quote_system.app.pagination import DEFAULT_PER_PAGE
+from quote_system.app.services.quote_number_service import quote_number_service
+from quote_system.app.services.quote_service import QuoteListFilters, QuoteService
 
 quoting_bp = Blueprint('quoting', __name__)
 
 @quoting_bp.route('/quotes')
 @login_required
 def list_quotes():
-    quotes = Quote.query.filter_by(creator_id=current_user.id).all()
-    return render_template('quoting/list_quotes.html', quotes=quotes)
+    filters = QuoteListFilters.from_args(request.args)
+    page = QuoteService.list_quotes(current_user.id, filters, request.args.get('cursor'),
+                                    request.args.get('per_page', DEFAULT_PER_PAGE, type=int))
+    return render_template('quoting/list_quotes.html', quotes=page.items, page=page, filters=filters)
 
 @quoting_bp.route('/quotes/new', methods=['GET', 'POST'])
 @login_required
@@ -26,8 +32,10 @@ def new_quote():
                     return redirect(url_for('quoting.new_quote'))
 
             # Create quote
+            agent = QuoteService.quote_agent(request.form.get('agent_id', type=int), current_user.id)
             quote = Quote(
-                quote_number=f'QUOTE-{len(Quote.query.all()) + 1:04}',
+                quote_number=quote_number_service.next_number(agent_code=agent.code if agent else None),
+                agent_id=agent.id if agent else None,
                 client_name=request.form['client_name'],
                 start_date=request.form['start_date'],
                 end_date=request.form['end_date'],
@@ -68,12 +76,13 @@ def new_quote():
             db.session.rollback()
             flash(f'Error creating quote: {str(e)}', 'error')
             return redirect(url_for('quoting.new_quote'))
-    return render_template('quoting/new_quote.html')
+    agents = Agent.query.filter_by(is_active=True).order_by(Agent.name).all()
+    return render_template('quoting/new_quote.html', agents=agents)
 
 @quoting_bp.route('/quotes/<int:quote_id>')
 @login_required
 def view_quote(quote_id):
-    quote = Quote.query.get_or_404(quote_id)
+    quote = get_quote_or_404(quote_id, check_owner=False, profile='quote_view')
     if quote.status == 'confirmed':
         # Redirect to booking detail view for confirmed quotes
         return redirect(url_for('quote_wizard.booking_detail', quote_id=quote_id))
@@ -1,11 +1,13 @@
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
 import os
 from typing import Dict, Any
 
+from quote_system.app.document_generation.pdf_runtime import pdf_runtime
+from quote_system.app.document_generation.templating import get_environment
+
 class QuoteTemplateEngine:
     def __init__(self, template_dir: str = 'templates/quotes'):
-        self.env = Environment(loader=FileSystemLoader(template_dir))
+        # Shared environment: templates are compiled once per process, not per engine
+        self.env = get_environment(template_dir, autoescape=False)
         self.template_dir = template_dir
 
     def render_quote(self, quote_data: Dict, template_name: str = 'quote_template.html') -> str:
@@ -16,7 +18,8 @@ class QuoteTemplateEngine:
     def generate_pdf(self, quote_data: Dict, output_path: str) -> None:
         """Generate PDF from quote template."""
         html_content = self.render_quote(quote_data)
-        HTML(string=html_content).write_pdf(output_path)
+        # Shared fonts, stylesheets and logos; relative links resolve against the template dir
+        pdf_runtime.write_pdf(html_content, output_path, base_url=os.path.abspath(self.template_dir) + os.sep)
 
     def generate_excel(self, quote_data: Dict, output_path: str) -> None:
         """Generate Excel from quote template."""
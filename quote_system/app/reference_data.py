@@ -0,0 +1,23 @@
+from quote_system.app.cache import cache, snapshot
+from quote_system.database.models import Supplier, TourPackage
+
+# Reference lists change a few times a day; changes invalidate them immediately
+REFERENCE_TTL = 3600
+
+cache.watch(Supplier, 'suppliers')
+cache.watch(TourPackage, 'tour_packages')
+
+
+def supplier_options():
+    """Suppliers (id, name) ordered by name, for dropdowns."""
+    return cache.cached('suppliers', 'options', lambda: [
+        snapshot(supplier, ('id', 'name'))
+        for supplier in Supplier.query.order_by(Supplier.name).all()
+    ], ttl=REFERENCE_TTL)
+
+
+def tour_package_list():
+    """All tour packages ordered by name, with their column values only."""
+    return cache.cached('tour_packages', 'list', lambda: [
+        snapshot(tour) for tour in TourPackage.query.order_by(TourPackage.name).all()
+    ], ttl=REFERENCE_TTL)
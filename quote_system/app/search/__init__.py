@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+bp = Blueprint('search', __name__, url_prefix='/search')
+
+from quote_system.app.search import routes
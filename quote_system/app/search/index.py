@@ -0,0 +1,324 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, text
+
+from quote_system.database.models import db, Quote, Client, Supplier, TourPackage
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+REBUILD_CHUNK_SIZE = 1000
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+MAX_TERMS = 10
+
+# FTS rowid = record_id * KIND_SLOTS + kind code
+KIND_SLOTS = 8
+
+
+@dataclass(frozen=True)
+class IndexedModel:
+    """
+    How rows of one model are turned into search documents.
+
+    title, body and owner receive either a model instance or a row of the
+    id + fields columns, so they may only use attributes listed in fields.
+    """
+    kind: str
+    code: int  # Small integer (< KIND_SLOTS) used to derive unique FTS rowids per kind
+    model: type
+    fields: tuple  # Attributes that affect the document; other changes skip reindexing
+    title: Callable
+    body: Callable
+    owner: Callable = lambda obj: None
+
+
+def _join(*values) -> str:
+    return ' '.join(str(value) for value in values if value)
+
+
+INDEXED_MODELS = (
+    IndexedModel('quote', 1, Quote, ('quote_number', 'title', 'description', 'creator_id'),
+                 title=lambda q: _join(q.quote_number, q.title),
+                 body=lambda q: q.description,
+                 owner=lambda q: q.creator_id),
+    IndexedModel('client', 2, Client, ('first_name', 'last_name', 'email'),
+                 title=lambda c: _join(c.first_name, c.last_name),
+                 body=lambda c: c.email),
+    IndexedModel('supplier', 3, Supplier, ('name', 'services'),
+                 title=lambda s: s.name,
+                 body=lambda s: s.services),
+    IndexedModel('tour_package', 4, TourPackage, ('code', 'name'),
+                 title=lambda t: _join(t.code, t.name),
+                 body=lambda t: None),
+)
+_BY_KIND = {entry.kind: entry for entry in INDEXED_MODELS}
+
+
+@dataclass
+class SearchResult:
+    kind: str
+    record_id: int
+    title: str
+    rank: float
+
+
+def search_terms(query: str) -> List[str]:
+    """Split user input into lowercase word tokens (punctuation is ignored)."""
+    return [token.lower() for token in TOKEN_PATTERN.findall(query or '')][:MAX_TERMS]
+
+
+class SQLiteFTSBackend:
+    """
+    SQLite FTS5 index. Rowids are derived from (kind, record_id), so updates
+    and deletes are rowid lookups rather than scans of the index.
+    """
+
+    def create_schema(self, conn) -> None:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "kind UNINDEXED, record_id UNINDEXED, owner_id UNINDEXED, title, body, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+
+    def drop_schema(self, conn) -> None:
+        conn.execute(text('DROP TABLE IF EXISTS search_index'))
+
+    def upsert(self, conn, entry: IndexedModel, record_id, owner_id, title, body) -> None:
+        rowid = record_id * KIND_SLOTS + entry.code
+        conn.execute(text('DELETE FROM search_index WHERE rowid = :rowid'), {'rowid': rowid})
+        conn.execute(text(
+            'INSERT INTO search_index (rowid, kind, record_id, owner_id, title, body) '
+            'VALUES (:rowid, :kind, :record_id, :owner_id, :title, :body)'
+        ), {'rowid': rowid, 'kind': entry.kind, 'record_id': record_id, 'owner_id': owner_id,
+            'title': title or '', 'body': body or ''})
+
+    def delete(self, conn, entry: IndexedModel, record_id) -> None:
+        conn.execute(text('DELETE FROM search_index WHERE rowid = :rowid'),
+                     {'rowid': record_id * KIND_SLOTS + entry.code})
+
+    def search(self, conn, terms, kinds, owner_id, limit) -> List[SearchResult]:
+        # Every term must match, each as a prefix: "cape"* "tow"*
+        match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        sql = ('SELECT kind, record_id, title, bm25(search_index, 0, 0, 0, 10.0, 1.0) AS rank '
+               'FROM search_index WHERE search_index MATCH :match')
+        params = {'match': match, 'limit': limit}
+        sql += _filters_sql(kinds, owner_id, params)
+        sql += ' ORDER BY rank LIMIT :limit'
+        return [SearchResult(kind, int(record_id), title, -rank)
+                for kind, record_id, title, rank in conn.execute(text(sql), params)]
+
+
+class PostgresSearchBackend:
+    """PostgreSQL tsvector index: weighted title/body vector with a GIN index."""
+
+    def create_schema(self, conn) -> None:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_document ("
+            "kind VARCHAR(20) NOT NULL, record_id INTEGER NOT NULL, owner_id INTEGER, "
+            "title TEXT NOT NULL DEFAULT '', body TEXT NOT NULL DEFAULT '', "
+            "document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', title), 'A') || "
+            "setweight(to_tsvector('simple', body), 'B')) STORED, "
+            "PRIMARY KEY (kind, record_id))"
+        ))
+        conn.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_search_document_document ON search_document USING GIN (document)'
+        ))
+
+    def drop_schema(self, conn) -> None:
+        conn.execute(text('DROP TABLE IF EXISTS search_document'))
+
+    def upsert(self, conn, entry, record_id, owner_id, title, body) -> None:
+        conn.execute(text(
+            'INSERT INTO search_document (kind, record_id, owner_id, title, body) '
+            'VALUES (:kind, :record_id, :owner_id, :title, :body) '
+            'ON CONFLICT (kind, record_id) DO UPDATE SET '
+            'owner_id = EXCLUDED.owner_id, title = EXCLUDED.title, body = EXCLUDED.body'
+        ), {'kind': entry.kind, 'record_id': record_id, 'owner_id': owner_id,
+            'title': title or '', 'body': body or ''})
+
+    def delete(self, conn, entry, record_id) -> None:
+        conn.execute(text('DELETE FROM search_document WHERE kind = :kind AND record_id = :record_id'),
+                     {'kind': entry.kind, 'record_id': record_id})
+
+    def search(self, conn, terms, kinds, owner_id, limit) -> List[SearchResult]:
+        # Terms are already plain \w+ tokens, so they are safe inside to_tsquery
+        query = ' & '.join(f'{term}:*' for term in terms)
+        sql = ("SELECT kind, record_id, title, ts_rank(document, to_tsquery('simple', :query)) AS rank "
+               "FROM search_document WHERE document @@ to_tsquery('simple', :query)")
+        params = {'query': query, 'limit': limit}
+        sql += _filters_sql(kinds, owner_id, params)
+        sql += ' ORDER BY rank DESC LIMIT :limit'
+        return [SearchResult(kind, record_id, title, float(rank))
+                for kind, record_id, title, rank in conn.execute(text(sql), params)]
+
+
+class LikeSearchBackend(PostgresSearchBackend):
+    """
+    Portable fallback for databases without a supported full-text engine:
+    the same search_document table, matched with LIKE (no ranking beyond
+    title matches first).
+    """
+
+    def create_schema(self, conn) -> None:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_document ("
+            "kind VARCHAR(20) NOT NULL, record_id INTEGER NOT NULL, owner_id INTEGER, "
+            "title TEXT NOT NULL, body TEXT NOT NULL, PRIMARY KEY (kind, record_id))"
+        ))
+
+    def upsert(self, conn, entry, record_id, owner_id, title, body) -> None:
+        self.delete(conn, entry, record_id)
+        conn.execute(text(
+            'INSERT INTO search_document (kind, record_id, owner_id, title, body) '
+            'VALUES (:kind, :record_id, :owner_id, :title, :body)'
+        ), {'kind': entry.kind, 'record_id': record_id, 'owner_id': owner_id,
+            'title': title or '', 'body': body or ''})
+
+    def search(self, conn, terms, kinds, owner_id, limit) -> List[SearchResult]:
+        params = {'limit': limit}
+        conditions, title_hits = [], []
+        for i, term in enumerate(terms):
+            params[f'term{i}'] = f'%{term}%'
+            conditions.append(f'(LOWER(title) LIKE :term{i} OR LOWER(body) LIKE :term{i})')
+            title_hits.append(f'CASE WHEN LOWER(title) LIKE :term{i} THEN 1 ELSE 0 END')
+        sql = (f"SELECT kind, record_id, title, {' + '.join(title_hits)} AS rank "
+               f"FROM search_document WHERE {' AND '.join(conditions)}")
+        sql += _filters_sql(kinds, owner_id, params)
+        sql += ' ORDER BY rank DESC LIMIT :limit'
+        return [SearchResult(kind, record_id, title, float(rank))
+                for kind, record_id, title, rank in conn.execute(text(sql), params)]
+
+
+def _filters_sql(kinds, owner_id, params) -> str:
+    sql = ''
+    if kinds:
+        names = []
+        for i, kind in enumerate(kinds):
+            params[f'kind{i}'] = kind
+            names.append(f':kind{i}')
+        sql += f" AND kind IN ({', '.join(names)})"
+    if owner_id is not None:
+        # Quotes are private to their creator; reference records are shared
+        params['owner_id'] = owner_id
+        sql += " AND (kind != 'quote' OR owner_id = :owner_id)"
+    return sql
+
+
+def backend_for(dialect_name: str):
+    if dialect_name == 'sqlite':
+        return SQLiteFTSBackend()
+    if dialect_name == 'postgresql':
+        return PostgresSearchBackend()
+    return LikeSearchBackend()
+
+
+def _index_row(conn, entry: IndexedModel, obj) -> None:
+    backend_for(conn.dialect.name).upsert(conn, entry, obj.id, entry.owner(obj), entry.title(obj), entry.body(obj))
+
+
+_listeners_lock = threading.Lock()
+_listening = False
+
+
+def _indexing() -> bool:
+    """Whether writes in the current app context go to the search index (see init_app)."""
+    return has_app_context() and bool(current_app.extensions.get('search_index'))
+
+
+def _register_listeners() -> None:
+    global _listening
+    with _listeners_lock:
+        if _listening:
+            return
+        _listening = True
+
+    for entry in INDEXED_MODELS:
+        def inserted(mapper, connection, target, entry=entry):
+            if _indexing():
+                _index_row(connection, entry, target)
+
+        def updated(mapper, connection, target, entry=entry):
+            if not _indexing():
+                return
+            state = inspect(target)
+            if any(state.attrs[name].history.has_changes() for name in entry.fields):
+                _index_row(connection, entry, target)
+
+        def deleted(mapper, connection, target, entry=entry):
+            if _indexing():
+                backend_for(connection.dialect.name).delete(connection, entry, target.id)
+
+        event.listen(entry.model, 'after_insert', inserted)
+        event.listen(entry.model, 'after_update', updated)
+        event.listen(entry.model, 'after_delete', deleted)
+
+
+def init_app(app) -> None:
+    """
+    Keep the search index of app in sync with the indexed tables.
+
+    The index is written in the same transaction as the row it describes,
+    but only while one of app's contexts is active: other apps sharing the
+    models (scripts, tests) write without a search index table. Call
+    create_search_schema() in an app context before the first write.
+    """
+    app.extensions['search_index'] = True
+    _register_listeners()
+
+
+def create_search_schema() -> None:
+    """Create the search index table for the current database if it is missing."""
+    with db.engine.begin() as conn:
+        backend_for(conn.dialect.name).create_schema(conn)
+
+
+def rebuild_search_index() -> int:
+    """
+    Drop and rebuild the search index from the indexed tables.
+
+    Only the indexed columns are read, streamed in REBUILD_CHUNK_SIZE rows.
+
+    Returns:
+        Number of documents indexed.
+    """
+    count = 0
+    conn = db.session.connection()
+    backend = backend_for(conn.dialect.name)
+    backend.drop_schema(conn)
+    backend.create_schema(conn)
+    for entry in INDEXED_MODELS:
+        columns = [getattr(entry.model, name) for name in ('id',) + entry.fields]
+        rows = db.session.query(*columns).execution_options(yield_per=REBUILD_CHUNK_SIZE)
+        for row in rows:
+            backend.upsert(conn, entry, row.id, entry.owner(row), entry.title(row), entry.body(row))
+            count += 1
+    db.session.commit()
+    return count
+
+
+def search(query: str, kinds: Optional[List[str]] = None, owner_id: Optional[int] = None,
+           limit: int = DEFAULT_LIMIT) -> List[SearchResult]:
+    """
+    Ranked, prefix-matching search across quotes, clients, suppliers and tour packages.
+
+    Args:
+        query: Free text; every word must match the start of a word in the document
+        kinds: Restrict to some of 'quote', 'client', 'supplier', 'tour_package'
+        owner_id: Only return quotes created by this user (other kinds are shared)
+        limit: Maximum number of results
+
+    Returns:
+        SearchResult list, best match first.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    kinds = [kind for kind in (kinds or []) if kind in _BY_KIND]
+    limit = max(1, min(limit, MAX_LIMIT))
+    conn = db.session.connection()
+    return backend_for(conn.dialect.name).search(conn, terms, kinds, owner_id, limit)
@@ -0,0 +1,49 @@
+from flask import jsonify, request, url_for
+from flask_login import current_user
+from werkzeug.routing import BuildError
+
+from quote_system.app.auth.decorators import login_required
+from quote_system.app.search import bp
+from quote_system.app.search.index import DEFAULT_LIMIT, search
+
+# Detail page for each result kind (kinds without a page get url None)
+DETAIL_ENDPOINTS = {
+    'quote': ('quote_management.view_quote', 'quote_id'),
+    'supplier': ('supplier_management.view_supplier', 'supplier_id'),
+    'tour_package': ('tour_packages.view_tour', 'tour_id'),
+}
+
+
+def _detail_url(kind, record_id):
+    endpoint = DETAIL_ENDPOINTS.get(kind)
+    if endpoint is None:
+        return None
+    try:
+        return url_for(endpoint[0], **{endpoint[1]: record_id})
+    except BuildError:
+        return None
+
+
+@bp.route('/')
+@login_required
+def search_records():
+    """
+    Ranked prefix search over quotes, clients, suppliers and tour packages.
+
+    Query args: q (search text), kind (repeatable filter), limit.
+    Agents only see their own quotes; admins see all of them.
+    """
+    owner_id = None
+    if current_user.is_authenticated and getattr(current_user, 'role', None) != 'admin':
+        owner_id = current_user.id
+    results = search(request.args.get('q', ''),
+                     kinds=request.args.getlist('kind'),
+                     owner_id=owner_id,
+                     limit=request.args.get('limit', DEFAULT_LIMIT, type=int))
+    return jsonify({'results': [{
+        'kind': result.kind,
+        'id': result.record_id,
+        'title': result.title,
+        'rank': round(result.rank, 4),
+        'url': _detail_url(result.kind, result.record_id),
+    } for result in results]})
@@ -1,7 +1,23 @@
-from datetime import datetime, timedelta
-from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, List, Tuple
-from quote_system.database.models import db, ItineraryItem, Rate, Service
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import contains_eager
+from quote_system.database.models import db, ItineraryDay, ItineraryItem
+from quote_system.database.rate_models import Rate
+from quote_system.app.quoting.pricing.money import quantize_money, to_money, ZERO
+
+
+def _rate_order(rate: Rate):
+    # Most specific first when rates overlap: latest start date, open-ended
+    # rates last, newest row on ties
+    return (rate.start_date is not None, rate.start_date or date.min, rate.id)
+
+
+def _covers(rate: Rate, on_date: date) -> bool:
+    return ((rate.start_date is None or rate.start_date <= on_date) and
+            (rate.end_date is None or rate.end_date >= on_date))
+
 
 class CostingService:
     def __init__(self):
@@ -10,34 +26,77 @@ class CostingService:
         self.salary_percentage = Decimal('0.10')  # 10% for salaries
         self.profit_margin = Decimal('0.20')  # 20% profit margin
 
-    def get_applicable_rate(self, service_id: int, date: datetime) -> Rate:
-        """Get the most recent rate for a service that's valid on the given date."""
+    def get_applicable_rate(self, supplier_id: int, on_date: date) -> Optional[Rate]:
+        """Get the supplier's most recent rate that's valid on the given date."""
         return Rate.query.filter(
-            Rate.service_id == service_id,
-            Rate.valid_from <= date,
-            (Rate.valid_to == None) | (Rate.valid_to >= date)
-        ).order_by(Rate.valid_from.desc()).first()
-
-    def calculate_item_cost(self, item: ItineraryItem) -> Dict:
-        """Calculate the cost for a single itinerary item."""
+            Rate.supplier_id == supplier_id,
+            (Rate.start_date == None) | (Rate.start_date <= on_date),
+            (Rate.end_date == None) | (Rate.end_date >= on_date)
+        ).order_by(Rate.start_date.is_(None), Rate.start_date.desc(), Rate.id.desc()).first()
+
+    def get_quote_items(self, quote_id: int) -> List[ItineraryItem]:
+        """A quote's itinerary items with their days, in itinerary order, from one query."""
+        return ItineraryItem.query.join(ItineraryItem.day)\
+            .filter(ItineraryDay.quote_id == quote_id)\
+            .options(contains_eager(ItineraryItem.day))\
+            .order_by(ItineraryDay.day_number, ItineraryItem.start_time, ItineraryItem.id).all()
+
+    def get_applicable_rates(self, items: Iterable[ItineraryItem]) -> Dict[int, Optional[Rate]]:
+        """
+        Resolve the applicable rate for many items with a single query.
+
+        Loads every candidate rate of the items' suppliers that overlaps the
+        items' date span, then picks each item's rate in memory using the same
+        rule as get_applicable_rate (most recent rate valid on the item's day).
+        Items need their day loaded (see get_quote_items).
+
+        Returns:
+            Mapping of item id to its Rate (None if no rate applies).
+        """
+        items = list(items)
+        dated_items = [item for item in items if item.supplier_id is not None and item.day.date is not None]
+        if not dated_items:
+            return {item.id: None for item in items}
+
+        supplier_ids = {item.supplier_id for item in dated_items}
+        first_date = min(item.day.date for item in dated_items)
+        last_date = max(item.day.date for item in dated_items)
+
+        candidates = Rate.query.filter(
+            Rate.supplier_id.in_(supplier_ids),
+            (Rate.start_date == None) | (Rate.start_date <= last_date),
+            (Rate.end_date == None) | (Rate.end_date >= first_date)
+        ).all()
+
+        rates_by_supplier = defaultdict(list)
+        for rate in sorted(candidates, key=_rate_order, reverse=True):
+            rates_by_supplier[rate.supplier_id].append(rate)
+
+        resolved = {item.id: None for item in items}
+        for item in dated_items:
+            resolved[item.id] = next(
+                (rate for rate in rates_by_supplier[item.supplier_id] if _covers(rate, item.day.date)), None)
+        return resolved
+
+    def calculate_item_cost(self, item: ItineraryItem, rate: Optional[Rate] = None) -> Dict:
+        """Calculate the cost for a single itinerary item.
+
+        Pass a pre-resolved rate (see get_applicable_rates) to avoid a query
+        per item.
+        """
         # Get applicable rate
-        rate = self.get_applicable_rate(item.service_id, item.start_date)
+        if rate is None and item.supplier_id is not None and item.day.date is not None:
+            rate = self.get_applicable_rate(item.supplier_id, item.day.date)
         if not rate:
-            raise ValueError(f"No valid rate found for service {item.service_id}")
-
-        # Calculate base cost
-        base_cost = rate.price * item.quantity
+            raise ValueError(f"No valid rate found for supplier {item.supplier_id}")
 
-        # Calculate per-person cost if applicable
-        per_person_cost = 0
-        if item.service.per_person:
-            per_person_cost = base_cost * item.quantity
+        # Calculate base cost (the float rate is converted to Decimal once here)
+        base_cost = to_money(rate.base_rate)
 
-        # Calculate duration-based costs
-        duration_cost = 0
-        if item.end_date:
-            duration = (item.end_date - item.start_date).days + 1
-            duration_cost = base_cost * duration
+        # Rates are per item and day: items carry no quantity, per-person
+        # flag or end date, so these components stay zero
+        per_person_cost = ZERO
+        duration_cost = ZERO
 
         # Calculate total cost components
         costs = {
@@ -72,8 +131,11 @@ class CostingService:
 
     def calculate_quote_cost(self, quote_id: int) -> Dict:
         """Calculate the complete cost breakdown for a quote."""
-        # Get all items for the quote
-        items = ItineraryItem.query.filter_by(quote_id=quote_id).all()
+        # Get all items for the quote together with their days
+        items = self.get_quote_items(quote_id)
+
+        # Resolve every item's rate from one set-based query
+        rates = self.get_applicable_rates(items)
 
         # Calculate costs for each item
         item_costs = []
@@ -82,10 +144,13 @@ class CostingService:
         total_duration_cost = Decimal('0')
 
         for item in items:
-            costs = self.calculate_item_cost(item)
+            rate = rates.get(item.id)
+            if not rate:
+                raise ValueError(f"No valid rate found for supplier {item.supplier_id}")
+            costs = self.calculate_item_cost(item, rate)
             item_costs.append({
                 'item': item,
-                'costs': costs
+                'costs': {name: quantize_money(value) for name, value in costs.items()}
             })
             
             total_base_cost += costs['base_cost']
@@ -105,20 +170,14 @@ class CostingService:
                 additional_charges['markup'] +
                 additional_charges['profit'])
 
-        # Round all monetary values to 2 decimal places
-        def round_decimal(value):
-            return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
+        # Totals are accumulated unrounded; round to cents only on output
         return {
             'items': item_costs,
-            'subtotal': round_decimal(subtotal),
+            'subtotal': quantize_money(subtotal),
             'additional_charges': {
-                'fuel_charge': round_decimal(additional_charges['fuel_charge']),
-                'salary_cost': round_decimal(additional_charges['salary_cost']),
-                'markup': round_decimal(additional_charges['markup']),
-                'profit': round_decimal(additional_charges['profit'])
+                name: quantize_money(value) for name, value in additional_charges.items()
             },
-            'total': round_decimal(total)
+            'total': quantize_money(total)
         }
 
 # Initialize the service for use in routes
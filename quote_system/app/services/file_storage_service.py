@@ -4,9 +4,16 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple
 
+# Default storage root when STORAGE_DIR is not configured
+DEFAULT_STORAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'storage')
+
 class FileStorageService:
-    def __init__(self, base_dir: str):
+    def __init__(self, base_dir: str = DEFAULT_STORAGE_DIR):
         self.base_dir = Path(base_dir)
+
+    def init_app(self, app):
+        self.base_dir = Path(app.config.get('STORAGE_DIR') or DEFAULT_STORAGE_DIR)
+        app.extensions['file_storage'] = self
         
     def get_storage_path(self, agent_name: str, year: int, quote_number: str, document_type: str) -> Path:
         """
@@ -20,11 +27,18 @@ class FileStorageService:
             
         Returns:
             Path object for the document storage location
+
+        Raises:
+            ValueError: if a name is empty, '.' or '..' once sanitized
         """
         # Clean and sanitize inputs
         agent_name = self._sanitize_filename(agent_name)
         quote_number = self._sanitize_filename(quote_number)
         document_type = self._sanitize_filename(document_type)
+        for part in (agent_name, quote_number, document_type):
+            # Dots survive sanitizing, so '..' would leave the storage root
+            if part in ('', '.', '..'):
+                raise ValueError(f"Invalid storage path component: '{part}'")
         
         # Create the directory structure
         return self.base_dir / agent_name / str(year) / quote_number / document_type
@@ -149,6 +163,23 @@ class FileStorageService:
             print(f"Error deleting document: {e}")
             return False
 
+    def get_cache_path(self, namespace: str) -> Path:
+        """
+        Get the directory for a cache of generated files (e.g. rendered PDFs).
+
+        Cache directories live beside the agent folders, under _cache, and
+        are managed by their owner; they are not documents of any quote.
+
+        Args:
+            namespace: Name of the cache
+
+        Returns:
+            Path object for the cache directory (created if missing)
+        """
+        path = self.base_dir / '_cache' / self._sanitize_filename(namespace)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
     def _sanitize_filename(self, filename: str) -> str:
         """
         Sanitize a filename to ensure it's safe for the filesystem.
@@ -161,16 +192,5 @@ class FileStorageService:
         filename = ' '.join(filename.split())
         return filename
 
-# Initialize the service in __init__.py
-from app.services.file_storage_service import FileStorageService
-
-# Create the storage directory if it doesn't exist
-storage_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'storage')
-if not os.path.exists(storage_dir):
-    os.makedirs(storage_dir)
-
-# Initialize file storage service
-file_storage_service = FileStorageService(storage_dir)
-
-# Add to app configuration:
-app.config['STORAGE_DIR'] = storage_dir
+# Initialize the service for use in routes
+file_storage_service = FileStorageService()
@@ -1,103 +1,130 @@
-from weasyprint import HTML, CSS
-from weasyprint.fonts import FontConfiguration
-from flask import render_template_string, current_app
+from flask import render_template, current_app
 from datetime import datetime
 from io import BytesIO
 import os
 import logging
-from functools import lru_cache
+
+from quote_system.app.document_generation.pdf_runtime import HAS_WEASYPRINT, pdf_runtime
+from quote_system.app.document_generation.render_cache import render_cache
 
 logger = logging.getLogger(__name__)
 
-class PDFService:
-    # Class-level variables for caching
-    _font_config = None
-    _css = None
+# Voucher page layout, registered with the shared PDF runtime as 'voucher'
+VOUCHER_CSS = '''
+    @page {
+        size: A4;
+        margin: 2cm;
+        @top-center {
+            content: "VIV200425 Voucher";
+        }
+        @bottom-center {
+            content: counter(page) " of " counter(pages);
+        }
+    }
+    
+    body {
+        font-family: "Helvetica", sans-serif;
+    }
+    
+    .table {
+        width: 100%;
+        border-collapse: collapse;
+    }
+    
+    .table th, .table td {
+        border: 1px solid #000;
+        padding: 8px;
+        text-align: left;
+    }
+    
+    .table th {
+        background-color: #f0f0f0;
+    }
+    
+    .card {
+        margin-bottom: 20px;
+        padding: 15px;
+        border: 1px solid #ddd;
+    }
+    
+    .card-header {
+        background-color: #f8f9fa;
+        border-bottom: 1px solid #ddd;
+        padding: 10px 15px;
+    }
     
-    def __init__(self, app):
+    .card-title {
+        margin: 0;
+        font-size: 1.25rem;
+    }
+    
+    .text-muted {
+        color: #6c757d;
+    }
+'''
+pdf_runtime.register_stylesheet('voucher', VOUCHER_CSS)
+
+class PDFService:
+    def __init__(self, app=None):
         self.app = app
-        
-        # Initialize the font configuration and CSS only once
-        if PDFService._font_config is None:
-            PDFService._font_config = FontConfiguration()
-            
-            # Define custom CSS for PDF
-            PDFService._css = CSS(string='''
-                @page {
-                    size: A4;
-                    margin: 2cm;
-                    @top-center {
-                        content: "VIV200425 Voucher";
-                    }
-                    @bottom-center {
-                        content: counter(page) " of " counter(pages);
-                    }
-                }
-                
-                body {
-                    font-family: "Helvetica", sans-serif;
-                }
-                
-                .table {
-                    width: 100%;
-                    border-collapse: collapse;
-                }
-                
-                .table th, .table td {
-                    border: 1px solid #000;
-                    padding: 8px;
-                    text-align: left;
-                }
-                
-                .table th {
-                    background-color: #f0f0f0;
-                }
-                
-                .card {
-                    margin-bottom: 20px;
-                    padding: 15px;
-                    border: 1px solid #ddd;
-                }
-                
-                .card-header {
-                    background-color: #f8f9fa;
-                    border-bottom: 1px solid #ddd;
-                    padding: 10px 15px;
-                }
-                
-                .card-title {
-                    margin: 0;
-                    font-size: 1.25rem;
-                }
-                
-                .text-muted {
-                    color: #6c757d;
-                }
-            ''', font_config=PDFService._font_config)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['pdf_service'] = self
+
+    def render_voucher_html(self, template_name, context):
+        """
+        Render the voucher HTML; cheap enough to do inside a request.
+
+        A single render with the app's environment, which keeps compiled
+        templates (precompiled at startup) and runs the context processors.
+        """
+        with self.app.app_context():
+            return render_template(template_name, **context)
+
+    @classmethod
+    def write_pdf(cls, html_content, output):
+        """
+        Lay out HTML as a PDF with the voucher stylesheet.
+
+        This is the slow part (seconds for a long voucher), so web requests
+        should hand it to the job queue ('voucher_pdf' jobs) rather than call it.
+
+        Args:
+            html_content: Rendered HTML
+            output: File path or binary file object to write the PDF to
+        """
+        return pdf_runtime.write_pdf(html_content, output, stylesheets=['voucher'])
+
+    def voucher_cache_key(self, template_name, context):
+        """Render cache key for a voucher, or None when PDFs are not cached."""
+        if not HAS_WEASYPRINT:
+            return None
+        return render_cache.template_key(self.app.jinja_env, template_name, context, stylesheets=['voucher'])
 
-    @lru_cache(maxsize=10)
-    def get_template(self, template_name):
-        """Cache template retrieval to avoid repeated lookups"""
-        return self.app.jinja_env.get_template(template_name)
-    
     def generate_voucher_pdf(self, template_name, context):
         """Generate PDF from HTML template with better memory management"""
         try:
-            # Render the HTML template
-            with self.app.app_context():
-                template = self.get_template(template_name)
-                html_content = render_template_string(template.render(context))
+            # An unchanged booking is served from the render cache
+            cache_key = self.voucher_cache_key(template_name, context)
+            if cache_key:
+                cached = render_cache.open(cache_key)
+                if cached is not None:
+                    with cached:
+                        return BytesIO(cached.read())
+
+            html_content = self.render_voucher_html(template_name, context)
     
             # Generate PDF using context manager for better resource handling
             with BytesIO() as pdf_bytes:
-                HTML(string=html_content).write_pdf(
-                    pdf_bytes,
-                    stylesheets=[PDFService._css],
-                    font_config=PDFService._font_config
-                )
+                self.write_pdf(html_content, pdf_bytes)
                 
                 # Reset buffer position
                 pdf_bytes.seek(0)
+                if cache_key:
+                    render_cache.put_stream(cache_key, pdf_bytes)
                 
                 # Return a copy of the bytes
                 return BytesIO(pdf_bytes.getvalue())
@@ -131,11 +158,5 @@ class PDFService:
             logger.error(f"Unexpected error when saving PDF: {e}")
             raise
 
-# Initialize the service in __init__.py
-from app.services.pdf_service import PDFService
-
-# Initialize PDF service
-pdf_service = PDFService(app)
-
-# Add to app configuration:
-app.config['PDF_DIR'] = os.path.join(app.root_path, 'pdfs')
+# Initialize the service for use in routes and job workers
+pdf_service = PDFService()
@@ -0,0 +1,114 @@
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from quote_system.database.models import db, Quote, QuoteNumberSequence
+
+# Length of Quote.quote_number
+MAX_QUOTE_NUMBER_LENGTH = 20
+
+
+class QuoteNumberService:
+    """
+    Allocates quote numbers from a counter table.
+
+    Each allocation is a single-row UPDATE ... SET last_value = last_value + n
+    in its own short transaction, so concurrent requests never receive the
+    same number and the quote table is never scanned. With block_size > 1 a
+    worker reserves several numbers at once and hands them out from memory;
+    numbers then stay unique but are not strictly in creation order across
+    workers, and a restart leaves gaps.
+    """
+
+    def __init__(self, prefix: str = 'QUOTE', per_year: bool = False, per_agent: bool = False,
+                 block_size: int = 1, width: int = 4):
+        self.prefix = prefix
+        self.per_year = per_year
+        self.per_agent = per_agent
+        self.block_size = block_size
+        self.width = width
+        self._blocks: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Read QUOTE_NUMBER_* settings from the app config."""
+        self.prefix = app.config.get('QUOTE_NUMBER_PREFIX', self.prefix)
+        self.per_year = app.config.get('QUOTE_NUMBER_PER_YEAR', self.per_year)
+        self.per_agent = app.config.get('QUOTE_NUMBER_PER_AGENT', self.per_agent)
+        self.block_size = max(1, int(app.config.get('QUOTE_NUMBER_BLOCK_SIZE', self.block_size)))
+        with self._lock:
+            self._blocks.clear()
+
+    def sequence_name(self, agent_code: Optional[str] = None, year: Optional[int] = None) -> str:
+        """Counter name (and number prefix) for the given agent/year, e.g. 'QUOTE-2026-AB'."""
+        parts = [self.prefix]
+        if self.per_year:
+            parts.append(str(year or datetime.utcnow().year))
+        if self.per_agent and agent_code:
+            parts.append(re.sub(r'[^A-Za-z0-9]', '', agent_code).upper())
+        return '-'.join(parts)
+
+    def next_number(self, agent_code: Optional[str] = None, year: Optional[int] = None) -> str:
+        """
+        Allocate the next quote number.
+
+        Args:
+            agent_code: Agent code, used in the number when per_agent is enabled
+            year: Year for per-year numbering (defaults to the current year)
+
+        Returns:
+            Quote number such as 'QUOTE-0042' or 'QUOTE-2026-AB-0042'
+        """
+        name = self.sequence_name(agent_code, year)
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None or block[0] > block[1]:
+                last = self._reserve(name, self.block_size)
+                block = self._blocks[name] = [last - self.block_size + 1, last]
+            value = block[0]
+            block[0] += 1
+
+        number = f'{name}-{value:0{self.width}d}'
+        if len(number) > MAX_QUOTE_NUMBER_LENGTH:
+            raise ValueError(f"Quote number '{number}' exceeds {MAX_QUOTE_NUMBER_LENGTH} characters")
+        return number
+
+    def _reserve(self, name: str, count: int) -> int:
+        """Atomically add count to a counter and return its new value."""
+        table = QuoteNumberSequence.__table__
+        for _ in range(3):
+            # A separate short transaction: the counter row is locked only for this UPDATE
+            with db.engine.begin() as conn:
+                result = conn.execute(
+                    table.update().where(table.c.name == name)
+                    .values(last_value=table.c.last_value + count)
+                )
+                if result.rowcount:
+                    return conn.execute(select(table.c.last_value).where(table.c.name == name)).scalar_one()
+            try:
+                with db.engine.begin() as conn:
+                    start = self._highest_existing(conn, name)
+                    conn.execute(table.insert().values(name=name, last_value=start + count))
+                    return start + count
+            except IntegrityError:
+                # Another worker created the counter first; increment it instead
+                continue
+        raise RuntimeError(f"Could not allocate a quote number for '{name}'")
+
+    @staticmethod
+    def _highest_existing(conn, name: str) -> int:
+        """
+        Highest number already used with this prefix, read once when a counter
+        is created so numbers issued before the counter existed are not reused.
+        """
+        pattern = re.compile(re.escape(name) + r'-(\d+)$')
+        rows = conn.execute(select(Quote.quote_number).where(Quote.quote_number.like(f'{name}-%')))
+        return max((int(m.group(1)) for (number,) in rows if (m := pattern.match(number))), default=0)
+
+
+# Initialize the service for use in routes
+quote_number_service = QuoteNumberService()
@@ -1,12 +1,89 @@
-from quote_system.database.models import db, Quote, Activity
-from datetime import datetime
+from quote_system.database.models import db, Quote, Activity, Agent, QuoteStatus
+from quote_system.app.pagination import DEFAULT_PER_PAGE, keyset_paginate
+from quote_system.app.services.quote_number_service import quote_number_service
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+@dataclass
+class QuoteListFilters:
+    """Filters for the quote list; unset fields are not applied."""
+    status: Optional[QuoteStatus] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    client_id: Optional[int] = None
+    agent_id: Optional[int] = None
+
+    @classmethod
+    def from_args(cls, args):
+        """Build filters from request arguments, ignoring values that don't parse."""
+        def parse_date(value):
+            try:
+                return date.fromisoformat(value) if value else None
+            except ValueError:
+                return None
+
+        try:
+            status = QuoteStatus(args.get('status')) if args.get('status') else None
+        except ValueError:
+            status = None
+        return cls(
+            status=status,
+            date_from=parse_date(args.get('date_from')),
+            date_to=parse_date(args.get('date_to')),
+            client_id=args.get('client_id', type=int),
+            agent_id=args.get('agent_id', type=int),
+        )
+
+    def apply(self, query):
+        if self.status is not None:
+            query = query.filter(Quote.status == self.status)
+        if self.date_from is not None:
+            query = query.filter(Quote.start_date >= self.date_from)
+        if self.date_to is not None:
+            query = query.filter(Quote.start_date <= self.date_to)
+        if self.client_id is not None:
+            query = query.filter(Quote.client_id == self.client_id)
+        if self.agent_id is not None:
+            query = query.filter(Quote.agent_id == self.agent_id)
+        return query
+
 
 class QuoteService:
+    @staticmethod
+    def list_quotes(creator_id, filters=None, cursor=None, per_page=DEFAULT_PER_PAGE):
+        """
+        One page of a user's quotes, most recently updated first.
+
+        Uses keyset pagination on (updated_at, id), backed by the composite
+        quote indexes, so the cost of a page does not grow with the number
+        of quotes the user owns.
+
+        Returns:
+            KeysetPage with the quotes and the cursor of the next page.
+        """
+        query = Quote.query.filter(Quote.creator_id == creator_id)
+        if filters is not None:
+            query = filters.apply(query)
+        return keyset_paginate(query, (Quote.updated_at, Quote.id), cursor, per_page)
+
+    @staticmethod
+    def quote_agent(agent_id=None, user_id=None):
+        """The agent a new quote is for: agent_id if given, else the user's own active agent."""
+        if agent_id:
+            return db.session.get(Agent, agent_id)
+        if user_id:
+            return Agent.query.filter_by(user_id=user_id, is_active=True).order_by(Agent.id).first()
+        return None
+
     @staticmethod
     def create_quote(data):
-        """Create a new quote with associated activities."""
+        """Create a new quote with associated activities (numbered per agent when QUOTE_NUMBER_PER_AGENT is set)."""
+        agent = QuoteService.quote_agent(data.get('agent_id'), data.get('creator_id'))
+        agent_code = data.get('agent_code') or (agent.code if agent else None)
         quote = Quote(
-            quote_number=f'QUOTE-{len(Quote.query.all()) + 1:04}',
+            quote_number=quote_number_service.next_number(agent_code=agent_code),
+            agent_id=agent.id if agent else None,
             client_name=data['client_name'],
             start_date=data['start_date'],
             end_date=data['end_date'],
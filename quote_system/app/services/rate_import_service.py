@@ -0,0 +1,408 @@
+import csv
+import io
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam
+
+from quote_system.database.models import db, Supplier
+from quote_system.database.rate_models import Rate, SeasonalRate
+from quote_system.app.quoting.pricing.seasons import seasonal_rate_index
+
+try:
+    from openpyxl import load_workbook
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+# Rows per executemany batch
+BATCH_SIZE = 1000
+
+# Detail kept in the report; the counts always cover every row
+MAX_REPORTED_CHANGES = 200
+MAX_REPORTED_ERRORS = 500
+
+# Accepted header names (lowercase, spaces as underscores) for each field
+COLUMN_ALIASES = {
+    'supplier': ('supplier', 'supplier_name'),
+    'supplier_id': ('supplier_id',),
+    'service_type': ('service_type', 'service', 'rate_name', 'name'),
+    'base_rate': ('base_rate', 'rate', 'rate_value', 'price', 'amount'),
+    'description': ('description', 'notes'),
+    'start_date': ('start_date', 'season_start', 'valid_from', 'from'),
+    'end_date': ('end_date', 'season_end', 'valid_to', 'to'),
+    'season_name': ('season_name', 'season'),
+    'multiplier': ('multiplier', 'season_multiplier'),
+}
+
+# Day-first formats, as used on the contracted rate sheets (ISO dates are tried first)
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d', '%d %b %Y', '%d %B %Y')
+
+EXCEL_EPOCH = date(1899, 12, 30)
+AMOUNT_NOISE = re.compile(r'[^\d.\-]')
+
+
+class RateImportError(ValueError):
+    """A rate sheet that cannot be read at all (bad format, missing columns)."""
+
+
+@dataclass
+class RateRow:
+    """One validated, normalized line of a rate sheet."""
+    line: int
+    supplier_id: int
+    name: str
+    description: str
+    base_rate: float
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    season_name: Optional[str] = None
+    multiplier: float = 1.0
+
+    @property
+    def key(self) -> tuple:
+        return (self.supplier_id, self.name, self.start_date, self.end_date)
+
+    @property
+    def seasons(self) -> List[tuple]:
+        if self.start_date and self.end_date:
+            return [(self.season_name, self.multiplier, self.start_date, self.end_date)]
+        return []
+
+
+@dataclass
+class RateChange:
+    line: int
+    action: str  # 'create' or 'update'
+    name: str
+    before: Optional[Dict[str, Any]] = None
+    after: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class RateImportReport:
+    """What an import did (or, for a dry run, would do)."""
+    dry_run: bool = True
+    applied: bool = False
+    rows_read: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    error_count: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    changes: List[RateChange] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def add_change(self, change: RateChange) -> None:
+        if len(self.changes) < MAX_REPORTED_CHANGES:
+            self.changes.append(change)
+
+
+def _normalize_header(value) -> str:
+    return re.sub(r'\s+', '_', str(value or '').strip().lower())
+
+
+def _map_columns(header: List[Any]) -> Dict[str, int]:
+    positions = {_normalize_header(value): i for i, value in enumerate(header)}
+    columns = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in positions:
+                columns[name] = positions[alias]
+                break
+    missing = [name for name in ('service_type', 'base_rate') if name not in columns]
+    if missing:
+        raise RateImportError(f"Missing required column(s): {', '.join(missing)}")
+    return columns
+
+
+def iter_sheet_rows(stream: IO[bytes], filename: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Stream (line number, {field: value}) pairs from a CSV or XLSX rate sheet.
+
+    XLSX files are opened in openpyxl's read-only mode, so rows are read one
+    at a time instead of loading the whole workbook.
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        if not HAS_OPENPYXL:
+            raise RateImportError('openpyxl is required to import .xlsx rate sheets')
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+        try:
+            yield from _iter_rows(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+    elif extension in ('.csv', '.txt', ''):
+        text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            yield from _iter_rows(csv.reader(text_stream))
+        finally:
+            text_stream.detach()
+    else:
+        raise RateImportError(f'Unsupported rate sheet type: {extension}')
+
+
+def _iter_rows(rows) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise RateImportError('The rate sheet is empty')
+    columns = _map_columns(list(header))
+    for line, values in enumerate(rows, start=2):
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield line, {name: values[i] if i < len(values) else None for name, i in columns.items()}
+
+
+def parse_date(value) -> Optional[date]:
+    """Normalize a sheet date: date/datetime cells, Excel serial numbers, ISO or DATE_FORMATS strings."""
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)):
+        return EXCEL_EPOCH + timedelta(days=int(value))
+    text_value = str(value).strip()
+    try:
+        return date.fromisoformat(text_value)
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text_value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date '{text_value}'")
+
+
+def parse_amount(value) -> float:
+    """Parse a rate amount, ignoring currency symbols, spaces and thousands separators."""
+    if isinstance(value, (int, float)):
+        amount = float(value)
+    else:
+        cleaned = AMOUNT_NOISE.sub('', str(value or ''))
+        if not cleaned:
+            raise ValueError(f"invalid amount '{value}'")
+        amount = float(cleaned)
+    if amount < 0:
+        raise ValueError('amount cannot be negative')
+    return amount
+
+
+def _text(value) -> str:
+    return str(value).strip() if value is not None else ''
+
+
+class RateImportService:
+    """
+    Bulk import of supplier rates from CSV/XLSX rate sheets.
+
+    Each line becomes a Rate named "<supplier> - <service type>" (as the
+    single-rate form does) plus a SeasonalRate when it has season dates.
+    A line matches an existing rate on (supplier, name, start, end); matches
+    are updated when the amount, description or season differ.
+
+    The sheet is validated in full before anything is written. Rows are then
+    written with executemany batches in one transaction. Invalid lines abort
+    the import unless skip_invalid is set.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def import_file(self, stream: IO[bytes], filename: str, supplier_id: Optional[int] = None,
+                    dry_run: bool = True, skip_invalid: bool = False) -> RateImportReport:
+        """
+        Validate a rate sheet and, unless dry_run, write it.
+
+        Args:
+            stream: Binary file object with the sheet contents
+            filename: Original file name, used to pick the CSV or XLSX reader
+            supplier_id: Supplier for every line; otherwise each line needs a
+                supplier or supplier_id column
+            dry_run: Only report what would change
+            skip_invalid: Write the valid lines even if some are invalid
+
+        Returns:
+            RateImportReport with counts, errors and a sample of the changes.
+
+        Raises:
+            RateImportError: If the sheet cannot be read.
+        """
+        report = RateImportReport(dry_run=dry_run)
+        rows = self._validate(iter_sheet_rows(stream, filename), supplier_id, report)
+        inserts, updates = self._diff(rows, report)
+
+        if dry_run or (report.error_count and not skip_invalid):
+            return report
+        if inserts or updates:
+            self._write(inserts, updates)
+            for touched in {row.supplier_id for row in inserts} | {row.supplier_id for row, _ in updates}:
+                # Core statements bypass the mapper events that normally do this
+                seasonal_rate_index.invalidate(touched)
+        report.applied = True
+        return report
+
+    def _validate(self, lines, supplier_id, report) -> List[RateRow]:
+        suppliers_by_id = {}
+        suppliers_by_name = {}
+        for sid, name in db.session.query(Supplier.id, Supplier.name):
+            suppliers_by_id[sid] = name
+            suppliers_by_name.setdefault(name.strip().lower(), sid)
+        if supplier_id is not None and supplier_id not in suppliers_by_id:
+            raise RateImportError(f'Unknown supplier id {supplier_id}')
+
+        rows: List[RateRow] = []
+        seen: Dict[tuple, int] = {}
+        for line, values in lines:
+            report.rows_read += 1
+            try:
+                row = self._normalize(line, values, supplier_id, suppliers_by_id, suppliers_by_name)
+            except ValueError as e:
+                report.add_error(line, str(e))
+                continue
+            if row.key in seen:
+                report.add_error(line, f'duplicate of line {seen[row.key]}')
+                continue
+            seen[row.key] = line
+            rows.append(row)
+        return rows
+
+    def _normalize(self, line, values, supplier_id, suppliers_by_id, suppliers_by_name) -> RateRow:
+        if supplier_id is None:
+            if _text(values.get('supplier_id')):
+                try:
+                    supplier_id = int(float(_text(values['supplier_id'])))
+                except ValueError:
+                    raise ValueError(f"invalid supplier id '{values['supplier_id']}'")
+            elif _text(values.get('supplier')):
+                supplier_id = suppliers_by_name.get(_text(values['supplier']).lower())
+                if supplier_id is None:
+                    raise ValueError(f"unknown supplier '{_text(values['supplier'])}'")
+            else:
+                raise ValueError('supplier is required')
+            if supplier_id not in suppliers_by_id:
+                raise ValueError(f'unknown supplier id {supplier_id}')
+
+        service_type = _text(values.get('service_type'))
+        if not service_type:
+            raise ValueError('service type is required')
+        base_rate = parse_amount(values.get('base_rate'))
+
+        start_date = parse_date(values.get('start_date'))
+        end_date = parse_date(values.get('end_date'))
+        if bool(start_date) != bool(end_date):
+            raise ValueError('both start and end date are required for a seasonal rate')
+        if start_date and start_date > end_date:
+            raise ValueError('start date is after end date')
+
+        multiplier = 1.0
+        if _text(values.get('multiplier')):
+            multiplier = parse_amount(values['multiplier'])
+            if multiplier <= 0:
+                raise ValueError('multiplier must be greater than zero')
+
+        name = f'{suppliers_by_id[supplier_id]} - {service_type}'
+        return RateRow(
+            line=line,
+            supplier_id=supplier_id,
+            name=name[:Rate.name.type.length],
+            description=_text(values.get('description')) or f'Rate for {service_type}',
+            base_rate=base_rate,
+            start_date=start_date,
+            end_date=end_date,
+            season_name=(_text(values.get('season_name')) or f'{service_type} Season')[:SeasonalRate.season_name.type.length]
+            if start_date else None,
+            multiplier=multiplier,
+        )
+
+    def _diff(self, rows: List[RateRow], report) -> Tuple[List[RateRow], List[Tuple[RateRow, int]]]:
+        """Split rows into inserts and (row, rate id) updates, with one query each for rates and seasons."""
+        existing: Dict[tuple, tuple] = {}
+        seasons: Dict[int, List[tuple]] = {}
+        supplier_ids = sorted({row.supplier_id for row in rows})
+        if supplier_ids:
+            for rate in db.session.query(Rate.id, Rate.supplier_id, Rate.name, Rate.start_date,
+                                         Rate.end_date, Rate.base_rate, Rate.description)\
+                    .filter(Rate.supplier_id.in_(supplier_ids)):
+                existing[(rate.supplier_id, rate.name, rate.start_date, rate.end_date)] = rate
+            for season in db.session.query(SeasonalRate.rate_id, SeasonalRate.season_name, SeasonalRate.multiplier,
+                                           SeasonalRate.start_date, SeasonalRate.end_date)\
+                    .join(Rate, SeasonalRate.rate_id == Rate.id)\
+                    .filter(Rate.supplier_id.in_(supplier_ids)):
+                seasons.setdefault(season.rate_id, []).append(tuple(season[1:]))
+
+        inserts, updates = [], []
+        for row in rows:
+            after = {'base_rate': row.base_rate, 'description': row.description, 'seasons': row.seasons}
+            current = existing.get(row.key)
+            if current is None:
+                inserts.append(row)
+                report.created += 1
+                report.add_change(RateChange(row.line, 'create', row.name, after=after))
+                continue
+            before = {'base_rate': current.base_rate, 'description': current.description,
+                      'seasons': sorted(seasons.get(current.id, []))}
+            if before == after:
+                report.unchanged += 1
+            else:
+                updates.append((row, current.id))
+                report.updated += 1
+                report.add_change(RateChange(row.line, 'update', row.name, before=before, after=after))
+        return inserts, updates
+
+    def _write(self, inserts: List[RateRow], updates: List[Tuple[RateRow, int]]) -> None:
+        rate_table = Rate.__table__
+        season_table = SeasonalRate.__table__
+        try:
+            for chunk in self._chunks(inserts):
+                db.session.execute(rate_table.insert(), [{
+                    'supplier_id': row.supplier_id, 'name': row.name, 'description': row.description,
+                    'base_rate': row.base_rate, 'start_date': row.start_date, 'end_date': row.end_date,
+                } for row in chunk])
+
+            update_rate = rate_table.update().where(rate_table.c.id == bindparam('rate_id'))\
+                .values(base_rate=bindparam('new_base_rate'), description=bindparam('new_description'))
+            delete_seasons = season_table.delete().where(season_table.c.rate_id == bindparam('rate_id'))
+            for chunk in self._chunks(updates):
+                db.session.execute(update_rate, [{
+                    'rate_id': rate_id, 'new_base_rate': row.base_rate, 'new_description': row.description,
+                } for row, rate_id in chunk])
+                db.session.execute(delete_seasons, [{'rate_id': rate_id} for _, rate_id in chunk])
+
+            # New rate ids are looked up by key in one query rather than per row
+            seasonal = [(row, rate_id) for row, rate_id in updates if row.seasons]
+            new_seasonal = [row for row in inserts if row.seasons]
+            if new_seasonal:
+                ids = {}
+                query = db.session.query(Rate.id, Rate.supplier_id, Rate.name, Rate.start_date, Rate.end_date)\
+                    .filter(Rate.supplier_id.in_({row.supplier_id for row in new_seasonal}))
+                for rate in query:
+                    ids[(rate.supplier_id, rate.name, rate.start_date, rate.end_date)] = rate.id
+                seasonal.extend((row, ids[row.key]) for row in new_seasonal)
+            for chunk in self._chunks(seasonal):
+                db.session.execute(season_table.insert(), [{
+                    'rate_id': rate_id, 'season_name': row.season_name, 'multiplier': row.multiplier,
+                    'start_date': row.start_date, 'end_date': row.end_date,
+                } for row, rate_id in chunk])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _chunks(self, items: list) -> Iterator[list]:
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
+
+
+# Shared importer used by the supplier blueprint and CLI
+rate_import_service = RateImportService()
@@ -3,6 +3,7 @@ from flask import render_template, request, redirect, url_for, flash
 from flask_login import current_user
 from quote_system.database.models import db, Supplier
 from quote_system.database.rate_models import Rate, SeasonalRate
+from quote_system.app.services.rate_import_service import RateImportError, rate_import_service
 
 # Import the blueprint from __init__.py to avoid circular imports
 from . import bp
@@ -177,3 +178,34 @@ def new_supplier_rate(supplier_id):
     except Exception as e:
         flash(f'Error loading supplier: {str(e)}', 'error')
         return redirect(url_for('supplier_management.list_suppliers'))
+
+@bp.route('/suppliers/<int:supplier_id>/rates/import', methods=['GET', 'POST'])
+@login_required
+def import_supplier_rates(supplier_id):
+    """Bulk import a CSV/XLSX rate sheet, with a dry-run report before writing."""
+    supplier = Supplier.query.get_or_404(supplier_id)
+    report = None
+
+    if request.method == 'POST':
+        upload = request.files.get('rate_file')
+        if not upload or not upload.filename:
+            flash('Choose a CSV or XLSX rate sheet to import', 'error')
+            return redirect(url_for('supplier_management.import_supplier_rates', supplier_id=supplier_id))
+
+        dry_run = request.form.get('dry_run') == 'on'
+        try:
+            report = rate_import_service.import_file(
+                upload.stream, upload.filename, supplier_id=supplier.id,
+                dry_run=dry_run, skip_invalid=request.form.get('skip_invalid') == 'on'
+            )
+        except RateImportError as e:
+            flash(str(e), 'error')
+            return redirect(url_for('supplier_management.import_supplier_rates', supplier_id=supplier_id))
+
+        if report.applied:
+            flash(f'Rates imported: {report.created} created, {report.updated} updated, '
+                  f'{report.unchanged} unchanged.', 'success')
+        elif not dry_run:
+            flash('No rates were imported because some lines are invalid.', 'error')
+
+    return render_template('supplier_management/import_supplier_rates.html', supplier=supplier, report=report)
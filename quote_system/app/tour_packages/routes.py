@@ -3,13 +3,14 @@ from flask_login import login_required, current_user
 from quote_system.app.tour_packages import bp
 from quote_system.database.models import db, TourPackage, TourDay
 from datetime import datetime
+from quote_system.app.reference_data import tour_package_list
 import json
 
 @bp.route('/')
 @login_required
 def list_tours():
     """List all available tour packages."""
-    tours = TourPackage.query.order_by(TourPackage.name).all()
+    tours = tour_package_list()
     return render_template('tour_packages/list.html', tours=tours)
 
 @bp.route('/<int:tour_id>')
@@ -1,11 +1,62 @@
 import logging
 from flask import abort
-from quote_system.database.models import Quote
+from sqlalchemy.orm import joinedload, selectinload
+from quote_system.database.models import Quote, ItineraryDay, Passenger, SupplierBooking
 from flask_login import current_user
 
-def get_quote_or_404(quote_id, check_owner=True):
-    """Fetch a quote by ID or abort with 404. Optionally check user ownership."""
-    quote = Quote.query.get(quote_id)
+# Named eager-loading profiles: the relationships each page walks, loaded up
+# front in a fixed number of queries (joinedload for single objects,
+# selectinload for collections) instead of one lazy load per row.
+QUOTE_LOAD_PROFILES = {
+    'booking_detail': (
+        joinedload(Quote.client),
+        selectinload(Quote.passengers).joinedload(Passenger.room),
+        selectinload(Quote.supplier_bookings).joinedload(SupplierBooking.supplier),
+        selectinload(Quote.operational_notes),
+        selectinload(Quote.activities),
+        selectinload(Quote.itinerary_days).selectinload(ItineraryDay.items),
+    ),
+    'quote_view': (
+        joinedload(Quote.client),
+        joinedload(Quote.agent),
+        selectinload(Quote.activities),
+        selectinload(Quote.itinerary_days).selectinload(ItineraryDay.items),
+    ),
+    # Export jobs render from request data; the stored quote only supplies
+    # where its booking pack is filed (the agent's name)
+    'booking_pack': (
+        joinedload(Quote.agent),
+    ),
+}
+
+
+def quote_load_options(profile):
+    """Return the loader options for a named profile (see QUOTE_LOAD_PROFILES)."""
+    try:
+        return QUOTE_LOAD_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown quote load profile: {profile}")
+
+
+def get_quote_or_404(quote_id, check_owner=True, profile=None):
+    """
+    Fetch a quote by ID or abort with 404. Optionally check user ownership.
+
+    Args:
+        quote_id: ID of the quote
+        check_owner: Abort with 403 unless the current user created the quote
+        profile: Name of a QUOTE_LOAD_PROFILES entry to eager-load the
+            relationships a page needs. The quote is re-read from the database
+            (like session.refresh) so the loaded graph is current.
+    """
+    if profile is None:
+        quote = Quote.query.get(quote_id)
+    else:
+        quote = (Quote.query
+                 .options(*quote_load_options(profile))
+                 .populate_existing()
+                 .filter(Quote.id == quote_id)
+                 .first())
     if not quote:
         abort(404, description="Quote not found.")
     if check_owner and quote.creator_id != current_user.id:
@@ -1,6 +1,7 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Enum, MetaData
+from sqlalchemy import Enum, MetaData, event, inspect
+from sqlalchemy.orm import object_session
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 import enum
@@ -58,6 +59,13 @@ class FormStepStatus(enum.Enum):
 
 class Quote(db.Model):
     """Quote entity with costing, client/agent links, status, itinerary, and flexible group size (FIT/Group). Supports quoting for a fixed or variable number of passengers."""
+    __table_args__ = (
+        # Keyset pagination of quote lists on (updated_at, id), per owner and per filter
+        db.Index('ix_quote_creator_updated', 'creator_id', 'updated_at', 'id'),
+        db.Index('ix_quote_creator_status_updated', 'creator_id', 'status', 'updated_at', 'id'),
+        db.Index('ix_quote_client_updated', 'client_id', 'updated_at', 'id'),
+        db.Index('ix_quote_agent_updated', 'agent_id', 'updated_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     quote_number = db.Column(db.String(20), unique=True, nullable=False)
     title = db.Column(db.String(200))
@@ -69,15 +77,16 @@ class Quote(db.Model):
     booking_type = db.Column(db.String(10), nullable=True)  # 'FIT' or 'GROUP'
     total_cost = db.Column(db.Float, default=0.0)
     margin_percentage = db.Column(db.Float, default=15.0)  # Default 15% margin
-    final_price = db.Column(db.Float, default=0.0)
-    status = db.Column(Enum(QuoteStatus), default=QuoteStatus.DRAFT, index=True)  # Indexed for filtering
+    # active_history keeps the previous value on change, for the quote_metrics_daily rollup
+    final_price = db.column_property(db.Column(db.Float, default=0.0), active_history=True)
+    status = db.column_property(db.Column(Enum(QuoteStatus), default=QuoteStatus.DRAFT, index=True), active_history=True)  # Indexed for filtering
     form_progress = db.Column(db.JSON, default=lambda: json.dumps({
         'client_info': 'not_started',
         'itinerary': 'not_started',
         'costing': 'not_started',
         'review': 'not_started'
     }))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.column_property(db.Column(db.DateTime, default=datetime.utcnow), active_history=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     client_id = db.Column(db.Integer, db.ForeignKey('client.id'))
@@ -99,8 +108,16 @@ class Quote(db.Model):
             return (self.end_date - self.start_date).days + 1
         return 0
 
+    @property
+    def quoted_pax_range(self):
+        """Passenger counts to price: quoted_passenger_min..quoted_passenger_max inclusive."""
+        low = self.quoted_passenger_min or 1
+        high = self.quoted_passenger_max or low
+        return range(low, max(low, high) + 1)
+
     def calculate_final_price(self):
-        self.final_price = self.total_cost * (1 + (self.margin_percentage / 100))
+        margin = self.margin_percentage if self.margin_percentage is not None else 15.0
+        self.final_price = (self.total_cost or 0.0) * (1 + (margin / 100))
         return self.final_price
         
     def update_form_progress(self, step, status):
@@ -113,21 +130,109 @@ class Quote(db.Model):
         return json.loads(self.form_progress)
         
     def calculate_total_cost(self):
+        """
+        Recompute total_cost and final_price from every activity and itinerary item.
+
+        Edits made through the ORM keep the totals up to date incrementally
+        (see apply_cost_delta), so this full walk is only needed to rebuild
+        totals that were changed outside the ORM.
+        """
         total = 0.0
         # Sum up costs from all activities
         for activity in self.activities:
-            total += activity.cost
-            
-        # Sum up costs from itinerary items
+            total += activity.cost or 0.0
+
+        # Sum up costs from itinerary items, refreshing the cached day subtotals
         for day in self.itinerary_days:
-            for item in day.items:
-                if item.is_included:
-                    total += item.cost
-                    
+            day.subtotal = sum(included_cost(item) for item in day.items)
+            total += day.subtotal
+
         self.total_cost = total
         self.calculate_final_price()
         return self.total_cost
 
+    def apply_cost_delta(self, delta):
+        """Add a cost change to total_cost and recompute final_price."""
+        if not delta:
+            return
+        self.total_cost = (self.total_cost or 0.0) + delta
+        self.calculate_final_price()
+
+class QuoteNumberSequence(db.Model):
+    """Counter behind quote numbers; one row per prefix (e.g. 'QUOTE', 'QUOTE-2026')."""
+    __tablename__ = 'quote_number_sequence'
+    name = db.Column(db.String(50), primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class QuoteMetricsDaily(db.Model):
+    """Daily rollup of quote counts and value per status, keyed by the day the quote was created."""
+    __tablename__ = 'quote_metrics_daily'
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    quote_count = db.Column(db.Integer, nullable=False, default=0)
+    total_value = db.Column(db.Float, nullable=False, default=0.0)
+
+
+def _status_key(status):
+    if isinstance(status, QuoteStatus):
+        return status.value
+    return status or QuoteStatus.DRAFT.value
+
+
+def quote_metrics_key(created_at, status):
+    """(day, status) rollup key for a quote created at created_at."""
+    return (created_at or datetime.utcnow()).date(), _status_key(status)
+
+
+def _adjust_rollup(connection, key, count, value):
+    """Add count/value to one rollup row, creating it if needed."""
+    if not count and not value:
+        return
+    day, status = key
+    table = QuoteMetricsDaily.__table__
+    result = connection.execute(
+        table.update()
+        .where(table.c.day == day, table.c.status == status)
+        .values(quote_count=table.c.quote_count + count, total_value=table.c.total_value + value)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(day=day, status=status, quote_count=count, total_value=value))
+
+
+def _previous_value(target, name):
+    """Value of an attribute before the pending flush (the current value if unchanged)."""
+    history = inspect(target).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, name)
+
+
+# The rollup is kept in step with quote inserts, status/price changes and
+# deletes in the same transaction, so charts never scan the quote table.
+@event.listens_for(Quote, 'after_insert')
+def _quote_inserted(mapper, connection, target):
+    _adjust_rollup(connection, quote_metrics_key(target.created_at, target.status), 1, target.final_price or 0.0)
+
+
+@event.listens_for(Quote, 'after_update')
+def _quote_updated(mapper, connection, target):
+    old_key = quote_metrics_key(_previous_value(target, 'created_at'), _previous_value(target, 'status'))
+    new_key = quote_metrics_key(target.created_at, target.status)
+    old_value = _previous_value(target, 'final_price') or 0.0
+    new_value = target.final_price or 0.0
+    if old_key == new_key:
+        _adjust_rollup(connection, new_key, 0, new_value - old_value)
+    else:
+        _adjust_rollup(connection, old_key, -1, -old_value)
+        _adjust_rollup(connection, new_key, 1, new_value)
+
+
+@event.listens_for(Quote, 'after_delete')
+def _quote_deleted(mapper, connection, target):
+    _adjust_rollup(connection, quote_metrics_key(target.created_at, target.status), -1, -(target.final_price or 0.0))
+
+
 class Activity(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -258,7 +363,29 @@ class ItineraryDay(db.Model):
     description = db.Column(db.Text)
     quote_id = db.Column(db.Integer, db.ForeignKey('quote.id'), nullable=False)
     items = db.relationship('ItineraryItem', backref='day', lazy=True, cascade='all, delete-orphan', order_by='ItineraryItem.start_time')
-    
+
+    @property
+    def subtotal(self):
+        """Total of the included items, cached on the instance and kept current by item events."""
+        cached = self.__dict__.get('_subtotal')
+        if cached is None:
+            cached = self._subtotal = sum(included_cost(item) for item in self.items)
+        return cached
+
+    @subtotal.setter
+    def subtotal(self, value):
+        self._subtotal = value
+
+    def apply_cost_delta(self, delta):
+        """Apply an item cost change to the cached subtotal (if computed) and the quote total."""
+        if not delta:
+            return
+        if self.__dict__.get('_subtotal') is not None:
+            self._subtotal += delta
+        quote = self.quote
+        if quote is not None:
+            quote.apply_cost_delta(delta)
+
 class ItineraryItem(db.Model):
     """Item/activity within an itinerary day."""
     id = db.Column(db.Integer, primary_key=True)
@@ -275,6 +402,94 @@ class ItineraryItem(db.Model):
     activities = db.relationship('Activity', backref='itinerary_item', lazy=True)
 
 
+def included_cost(item):
+    """Cost an itinerary item contributes to its day (0 when it is not included)."""
+    return _included_cost(item.cost, item.is_included)
+
+
+def _included_cost(cost, is_included):
+    # is_included defaults to True on insert, so an unset value counts as included
+    return (cost or 0.0) if is_included is not False else 0.0
+
+
+def _attribute_value(value):
+    """Treat SQLAlchemy's 'no value yet' markers as None."""
+    return value if isinstance(value, (int, float)) else None
+
+
+def _apply_item_delta(item, delta):
+    if not delta:
+        return
+    session = object_session(item)
+    if session is None:
+        day = item.day
+    else:
+        # Resolving item.day loads at most one row; don't flush half-edited state
+        with session.no_autoflush:
+            day = item.day
+    if day is not None:
+        day.apply_cost_delta(delta)
+
+
+# Incremental total maintenance: each edit to an item or activity applies its
+# delta to the day subtotal and the quote total instead of re-walking the
+# itinerary. Rows deleted with session.delete() without being removed from
+# their collection are not seen here; calculate_total_cost() rebuilds totals.
+@event.listens_for(ItineraryItem.cost, 'set', active_history=True)
+def _item_cost_set(item, value, oldvalue, initiator):
+    old = _included_cost(_attribute_value(oldvalue), item.is_included)
+    new = _included_cost(_attribute_value(value), item.is_included)
+    _apply_item_delta(item, new - old)
+
+
+@event.listens_for(ItineraryItem.is_included, 'set', active_history=True)
+def _item_included_set(item, value, oldvalue, initiator):
+    old = _included_cost(item.cost, _attribute_value(oldvalue))
+    new = _included_cost(item.cost, _attribute_value(value))
+    _apply_item_delta(item, new - old)
+
+
+@event.listens_for(ItineraryDay.items, 'append')
+def _item_added(day, item, initiator):
+    # Already attached, e.g. ItineraryItem(day=day) followed by day.items.append(item)
+    if item.__dict__.get('day') is day:
+        return
+    day.apply_cost_delta(included_cost(item))
+
+
+@event.listens_for(ItineraryDay.items, 'remove')
+def _item_removed(day, item, initiator):
+    day.apply_cost_delta(-included_cost(item))
+
+
+@event.listens_for(Activity.cost, 'set', active_history=True)
+def _activity_cost_set(activity, value, oldvalue, initiator):
+    delta = (_attribute_value(value) or 0.0) - (_attribute_value(oldvalue) or 0.0)
+    if not delta:
+        return
+    session = object_session(activity)
+    if session is None:
+        quote = activity.quote
+    else:
+        with session.no_autoflush:
+            quote = activity.quote
+    if quote is not None:
+        quote.apply_cost_delta(delta)
+
+
+@event.listens_for(Quote.activities, 'append')
+def _activity_added(quote, activity, initiator):
+    # Already attached, e.g. Activity(quote=quote) followed by quote.activities.append(activity)
+    if activity.__dict__.get('quote') is quote:
+        return
+    quote.apply_cost_delta(activity.cost or 0.0)
+
+
+@event.listens_for(Quote.activities, 'remove')
+def _activity_removed(quote, activity, initiator):
+    quote.apply_cost_delta(-(activity.cost or 0.0))
+
+
 # Association table for tour packages and properties
 tour_properties = db.Table('tour_properties',
     db.Column('tour_id', db.Integer, db.ForeignKey('tour_package.id'), primary_key=True),
@@ -0,0 +1,17 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('run-job-worker')
+@click.option('--workers', type=int, help='Rendering processes (defaults to JOB_WORKERS).')
+@with_appcontext
+def run_job_worker_command(workers):
+    """Render queued PDF and Excel jobs until interrupted."""
+    from quote_system.app.jobs.queue import job_queue
+
+    worker = job_queue.worker(**({'max_workers': workers} if workers else {}))
+    click.echo(f'Job worker started with {worker.max_workers} processes (Ctrl+C to stop).')
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        click.echo('Job worker stopped.')
@@ -0,0 +1,12 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('backfill-quote-metrics')
+@with_appcontext
+def backfill_quote_metrics_command():
+    """Rebuild the quote_metrics_daily rollup from the quote table."""
+    from quote_system.app.dashboard.rollup import backfill_quote_metrics
+
+    rows = backfill_quote_metrics()
+    click.echo(f'Wrote {rows} quote_metrics_daily rows.')
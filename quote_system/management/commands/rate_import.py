@@ -0,0 +1,31 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('import-rates')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--supplier-id', type=int, help='Supplier for every line (otherwise read from a supplier column).')
+@click.option('--apply', 'apply_changes', is_flag=True, help='Write the rates; without it only a dry-run report is shown.')
+@click.option('--skip-invalid', is_flag=True, help='Write the valid lines even if some lines are invalid.')
+@with_appcontext
+def import_rates_command(path, supplier_id, apply_changes, skip_invalid):
+    """Import supplier rates from a CSV or XLSX rate sheet."""
+    from quote_system.app.services.rate_import_service import RateImportError, rate_import_service
+
+    try:
+        with open(path, 'rb') as stream:
+            report = rate_import_service.import_file(stream, path, supplier_id=supplier_id,
+                                                     dry_run=not apply_changes, skip_invalid=skip_invalid)
+    except RateImportError as e:
+        raise click.ClickException(str(e))
+
+    for line, message in report.errors:
+        click.echo(f'line {line}: {message}', err=True)
+    click.echo(f'{report.rows_read} lines: {report.created} new, {report.updated} changed, '
+               f'{report.unchanged} unchanged, {report.error_count} invalid.')
+    if report.applied:
+        click.echo('Rates imported.')
+    elif apply_changes:
+        raise click.ClickException('Nothing was written because some lines are invalid (see --skip-invalid).')
+    else:
+        click.echo('Dry run: nothing was written (use --apply).')
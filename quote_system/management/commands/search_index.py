@@ -0,0 +1,12 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Drop and rebuild the full-text search index from quotes, clients, suppliers and tours."""
+    from quote_system.app.search.index import rebuild_search_index
+
+    documents = rebuild_search_index()
+    click.echo(f'Indexed {documents} search documents.')
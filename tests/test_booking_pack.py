@@ -0,0 +1,78 @@
+import threading
+import time
+import zipfile
+from datetime import date
+
+import pytest
+
+from quote_system.app.document_generation.booking_pack import (
+    BookingPackBuilder, BookingPackError, PackDocument, Voucher, booking_pack_documents
+)
+from quote_system.app.jobs.queue import DONE, PACK_KIND, QUEUED, RUNNING, JobStore, JobWorker
+
+QUOTE_DATA = {
+    'quote_number': 'Q-7', 'client_name': 'Smith', 'start_date': date(2026, 5, 1), 'end_date': date(2026, 5, 3),
+    'itinerary_days': [{'day': 1, 'description': 'Arrival'}],
+}
+
+
+@pytest.fixture(scope='module')
+def builder():
+    builder = BookingPackBuilder(max_workers=2, worker_settings={})
+    yield builder
+    builder.close()
+
+
+def test_standard_pack_documents():
+    documents = booking_pack_documents(QUOTE_DATA, {'invoice_number': 'INV-1'},
+                                       [Voucher('Lodge / Camp', '<p>a</p>'), Voucher('Lodge / Camp', '<p>b</p>')])
+
+    assert [document.kind for document in documents] == [
+        'quote_pdf', 'itinerary_pdf', 'invoice_pdf', 'itinerary_excel', 'voucher_pdf', 'voucher_pdf']
+    assert documents[4].filename == 'vouchers/voucher_Lodge _ Camp.pdf'
+
+
+def test_pack_zips_every_document(builder, tmp_path):
+    documents = [
+        PackDocument('quote_excel', {'data': QUOTE_DATA}, 'Q-7.xlsx'),
+        PackDocument('itinerary_excel', {'data': QUOTE_DATA}, 'Q-7.xlsx'),
+    ]
+    names = builder.build(documents, str(tmp_path / 'pack.zip'))
+
+    with zipfile.ZipFile(tmp_path / 'pack.zip') as archive:
+        assert sorted(archive.namelist()) == sorted(names) == ['Q-7.xlsx', 'Q-7_2.xlsx']
+        assert archive.testzip() is None
+
+
+def test_pack_fails_when_a_document_fails(builder, tmp_path):
+    documents = [
+        PackDocument('quote_excel', {'data': QUOTE_DATA}, 'quote.xlsx'),
+        PackDocument('itinerary_excel', {'data': None}, 'itinerary.xlsx'),
+    ]
+    with pytest.raises(BookingPackError) as error:
+        builder.build(documents, str(tmp_path / 'pack.zip'))
+    assert [name for name, _ in error.value.failures] == ['itinerary.xlsx']
+
+
+def test_worker_builds_pack_jobs(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    job = store.enqueue(PACK_KIND, {'name': 'Q-7', 'documents': [
+        PackDocument('quote_excel', {'data': QUOTE_DATA}, 'quote.xlsx'),
+        PackDocument('itinerary_excel', {'data': QUOTE_DATA}, 'itinerary.xlsx'),
+    ]})
+    worker = JobWorker(store, str(tmp_path / 'results'), max_workers=2, poll_interval=0.05)
+    stop = threading.Event()
+    thread = threading.Thread(target=worker.run, args=(stop,))
+    thread.start()
+    try:
+        deadline = time.time() + 60
+        while time.time() < deadline and store.get(job.id).status in (QUEUED, RUNNING):
+            time.sleep(0.1)
+    finally:
+        stop.set()
+        thread.join()
+
+    done = store.get(job.id)
+    assert done.status == DONE and done.filename == 'Q-7_booking_pack.zip'
+    with zipfile.ZipFile(done.result_path) as archive:
+        assert sorted(archive.namelist()) == ['itinerary.xlsx', 'quote.xlsx']
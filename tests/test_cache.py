@@ -0,0 +1,97 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from quote_system.app.cache import Cache, MemoryCache, SQLiteCache
+
+
+def test_memory_cache_ttl_and_lru():
+    backend = MemoryCache(max_entries=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    backend.get('a')
+    backend.set('c', 3, ttl=60)  # evicts the least recently used key, 'b'
+
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+    assert backend.get('b') is backend.get('missing')
+
+    backend.set('d', 4, ttl=-1)  # already expired
+    assert backend.get('d') is backend.get('missing')
+
+
+def test_sqlite_cache_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    SQLiteCache(path).set('suppliers:options', [(1, 'Lodge')], ttl=60)
+    other = SQLiteCache(path)
+
+    assert other.get('suppliers:options') == [(1, 'Lodge')]
+    other.delete_prefix('suppliers:')
+    assert SQLiteCache(path).get('suppliers:options') is other.get('missing')
+
+
+def test_cache_invalidated_on_commit():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+    db = SQLAlchemy(app)
+
+    class Vendor(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    cache = Cache()
+    cache.init_app(app)
+    cache.watch(Vendor, 'vendors')
+    calls = []
+
+    def names():
+        calls.append(1)
+        return [vendor.name for vendor in Vendor.query.order_by(Vendor.name)]
+
+    with app.app_context():
+        db.create_all()
+        assert cache.cached('vendors', 'names', names) == []
+        assert cache.cached('vendors', 'names', names) == []
+        assert len(calls) == 1
+
+        db.session.add(Vendor(name='Camp'))
+        db.session.flush()
+        assert cache.cached('vendors', 'names', names) == []  # not committed yet
+        db.session.commit()
+
+        assert cache.cached('vendors', 'names', names) == ['Camp']
+        assert len(calls) == 2
+
+
+def test_rollback_discards_pending_invalidations():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+    db = SQLAlchemy(app)
+
+    class Lodge(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    cache = Cache()
+    cache.init_app(app)
+    cache.watch(Lodge, 'lodges')
+    calls = []
+
+    def names():
+        calls.append(1)
+        return [lodge.name for lodge in Lodge.query.order_by(Lodge.name)]
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Lodge(name='River'))
+        db.session.commit()
+        assert cache.cached('lodges', 'names', names) == ['River']
+
+        db.session.add(Lodge(name='Dune'))
+        db.session.flush()
+        assert db.session.info['cache_invalidate'] == {'lodges'}
+        db.session.rollback()
+
+        assert 'cache_invalidate' not in db.session.info
+        db.session.commit()  # nothing pending: the cached list stays
+        assert cache.cached('lodges', 'names', names) == ['River']
+        assert len(calls) == 1
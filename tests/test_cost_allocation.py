@@ -11,3 +11,36 @@ def test_variable_cost_scaling():
 def test_crew_cost_handling():
     quote = Quote(pax=8, crew=2, meal_plan="truck", days=5)
     assert quote.crew_meal_cost == 2 * 50 * 5  # Crew meals always at truck rate
+
+def test_sliding_scale_matches_single_quotes():
+    from quote_system.app.quoting.pricing.money import money_to_float
+    from quote_system.app.quoting.pricing.sliding_scale import SlidingScaleEngine
+    fixed = [CostComponent(name="Truck", amount=1403.56), CostComponent(name="Guide", amount=900)]
+    variable = [CostComponent(name="Park Fee", amount=200)]
+    scale = SlidingScaleEngine().generate(
+        Quote(pax=1, fixed_costs=fixed, variable_costs=variable, crew=2, meal_plan="truck", days=5),
+        range(1, 41)
+    )
+    assert list(scale) == list(range(1, 41))
+    for pax, row in scale.items():
+        quote = Quote(pax=pax, fixed_costs=fixed, variable_costs=variable, crew=2, meal_plan="truck", days=5)
+        assert row['fixed_per_pax'] == quote.cost_per_pax
+        assert row['crew_per_pax'] == money_to_float(quote.crew_meal_cost / pax)
+    assert scale[8]['discount'] == 0.05
+    assert scale[20]['discount'] == 0.15
+    assert scale[8]['price_per_pax'] == 522.93  # (287.95 + 62.50 + 200) * 0.95
+
+def test_sliding_scale_seasonal_and_margin():
+    from quote_system.app.quoting.pricing.sliding_scale import SlidingScaleEngine
+    quote = Quote(pax=1, fixed_costs=[CostComponent(name="Truck", amount=1000)])
+    scale = SlidingScaleEngine().generate(quote, [1, 10], seasonal_multiplier=1.2, margin_percentage=10)
+    assert scale[1]['price_per_pax'] == 1320.0  # 1000 * 1.2 * 1.1
+    assert scale[10]['price_per_pax'] == 118.8  # 100 * 1.2 * 0.9 * 1.1
+    assert scale[10]['total'] == 1188.0
+
+def test_fixed_costs_summed_without_float_drift():
+    from decimal import Decimal
+    quote = Quote(pax=3, fixed_costs=[CostComponent(name="Fee", amount=0.1) for _ in range(10)])
+    assert quote.total_fixed_cost == Decimal('1.0')
+    assert quote.cost_per_pax == 0.33
+    assert Quote(pax=8, fixed_costs=[CostComponent(name="Truck", amount=1403.56)]).cost_per_pax == 175.45
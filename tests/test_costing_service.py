@@ -0,0 +1,76 @@
+from datetime import date
+from decimal import Decimal
+
+from flask import Flask
+from sqlalchemy import event
+
+from quote_system.database.models import db, User, Quote, Supplier, ItineraryDay, ItineraryItem
+from quote_system.database.rate_models import Rate
+from quote_system.app.services.costing_service import CostingService
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+    db.init_app(app)
+    return app
+
+
+def seed():
+    user = User(username='costing', email='costing@example.com')
+    lodge, camp = Supplier(name='River Lodge'), Supplier(name='Dune Camp')
+    db.session.add_all([user, lodge, camp])
+    db.session.flush()
+    quote = Quote(quote_number='QUOTE-0100', creator_id=user.id)
+    db.session.add(quote)
+    db.session.flush()
+    db.session.add_all([
+        Rate(name='Low', supplier_id=lodge.id, start_date=date(2026, 1, 1), end_date=date(2026, 11, 30), base_rate=100.0),
+        Rate(name='Peak', supplier_id=lodge.id, start_date=date(2026, 12, 1), end_date=date(2027, 1, 15), base_rate=150.0),
+        Rate(name='Any', supplier_id=camp.id, start_date=None, end_date=None, base_rate=80.0),
+        Rate(name='Promo', supplier_id=camp.id, start_date=date(2026, 12, 1), end_date=date(2026, 12, 1), base_rate=60.0),
+    ])
+    items = {}
+    for number, day_date in enumerate([date(2026, 11, 30), date(2026, 12, 1), date(2026, 12, 2)], 1):
+        day = ItineraryDay(day_number=number, date=day_date, quote_id=quote.id)
+        db.session.add(day)
+        db.session.flush()
+        for supplier in (lodge, camp):
+            item = ItineraryItem(title=f'{supplier.name} {number}', itinerary_day_id=day.id, supplier_id=supplier.id)
+            db.session.add(item)
+            items[(supplier.name, number)] = item
+    db.session.commit()
+    return quote, items
+
+
+def test_quote_cost_resolves_all_rates_in_two_queries():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        quote, items = seed()
+        quote_id = quote.id
+        db.session.expire_all()
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        service = CostingService()
+        breakdown = service.calculate_quote_cost(quote_id)
+
+        assert len(statements) == 2  # items with their days, then every candidate rate
+        costs = {entry['item'].title: entry['costs']['base_cost'] for entry in breakdown['items']}
+        assert costs == {
+            'River Lodge 1': Decimal('100.00'), 'Dune Camp 1': Decimal('80.00'),
+            'River Lodge 2': Decimal('150.00'), 'Dune Camp 2': Decimal('60.00'),
+            'River Lodge 3': Decimal('150.00'), 'Dune Camp 3': Decimal('80.00'),
+        }
+        assert breakdown['subtotal'] == Decimal('620.00')
+
+        # The single-item lookup applies the same rule
+        for (supplier, number), item in items.items():
+            day = db.session.get(ItineraryDay, item.itinerary_day_id)
+            rate = service.get_applicable_rate(item.supplier_id, day.date)
+            assert to_cents(rate.base_rate) == costs[f'{supplier} {number}']
+
+
+def to_cents(value):
+    return Decimal(str(value)).quantize(Decimal('0.01'))
@@ -9,7 +9,7 @@ from sqlalchemy.orm import sessionmaker
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the actual models and db instance
-from quote_system.database.models import db, User, Quote, Activity, Supplier, Client, Agent
+from quote_system.database.models import db, User, Quote, Activity, Supplier, Client, Agent, ItineraryDay, ItineraryItem, QuoteMetricsDaily, QuoteStatus
 from quote_system.database.rate_models import Rate, SeasonalRate
 
 # Create a test database in memory
@@ -251,5 +251,57 @@ class TestDatabaseModels(BaseTestCase):
         self.assertEqual(activity.quote_id, quote.id)
         self.assertEqual(activity.supplier_id, supplier.id)
 
+    def test_incremental_quote_totals(self):
+        """Editing one itinerary item updates the day subtotal and quote total by its delta"""
+        user = User(username='totals', email='totals@example.com', role='agent')
+        self.session.add(user)
+        self.session.commit()
+
+        quote = Quote(quote_number='QT-003', creator_id=user.id, margin_percentage=10.0)
+        self.session.add(quote)
+        days = []
+        for day_number in range(1, 31):
+            day = ItineraryDay(day_number=day_number, quote=quote)
+            self.session.add(day)
+            for _ in range(10):
+                self.session.add(ItineraryItem(title='Item', cost=10.0, day=day))
+            days.append(day)
+        self.session.commit()
+        self.assertEqual(quote.total_cost, 3000.0)
+
+        item = days[4].items[0]
+        item.cost = 25.0
+        self.assertEqual(days[4].subtotal, 115.0)
+        self.assertEqual(quote.total_cost, 3015.0)
+        self.assertAlmostEqual(quote.final_price, 3316.5)
+
+        item.is_included = False
+        self.assertEqual(days[4].subtotal, 90.0)
+        self.assertEqual(quote.total_cost, 2990.0)
+
+        days[0].items.remove(days[0].items[0])
+        self.assertEqual(quote.total_cost, 2980.0)
+        self.assertEqual(quote.calculate_total_cost(), 2980.0)
+
+    def test_quote_metrics_rollup(self):
+        """Quote inserts and status/price changes keep the daily rollup in step"""
+        user = User(username='rollup', email='rollup@example.com', role='agent')
+        self.session.add(user)
+        self.session.commit()
+
+        created = datetime(2025, 6, 1, 9, 30)
+        quote = Quote(quote_number='QT-004', creator_id=user.id, final_price=1000.0, created_at=created)
+        self.session.add(quote)
+        self.session.commit()
+
+        quote.status = QuoteStatus.CONFIRMED
+        quote.final_price = 1200.0
+        self.session.commit()
+
+        rows = {row.status: row for row in self.session.query(QuoteMetricsDaily).filter_by(day=date(2025, 6, 1))}
+        self.assertEqual(rows['draft'].quote_count, 0)
+        self.assertEqual(rows['confirmed'].quote_count, 1)
+        self.assertEqual(rows['confirmed'].total_value, 1200.0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import io
 import os
 import sys
 import tempfile
@@ -184,5 +185,71 @@ class TestExcelGenerator(unittest.TestCase):
         except Exception as e:
             self.fail(f"Excel generation failed with error: {str(e)}")
 
+    def test_streaming_export_to_file_object(self):
+        """Workbooks can be streamed to a file object, with columns sized from the data"""
+        buffer = io.BytesIO()
+        self.excel_generator.write_itinerary_excel(self.itinerary_data, buffer)
+        buffer.seek(0)
+
+        day_data = pd.read_excel(buffer, sheet_name='Day 1')
+        self.assertEqual(list(day_data['title']), ['Airport Pickup', 'Welcome Dinner'])
+
+        buffer.seek(0)
+        from openpyxl import load_workbook
+        worksheet = load_workbook(buffer)['Day 1']
+        self.assertEqual(worksheet.column_dimensions['C'].width, len('Meet and greet at Kilimanjaro Airport') + 2)
+
+    def test_pandas_and_streaming_exports_match(self):
+        """The streaming writer produces the same sheets and values as the pandas writer"""
+        pandas_path = ExcelGenerator(streaming=False).generate_quote_excel(self.quote_data)
+        streaming_path = self.excel_generator.generate_quote_excel(self.quote_data)
+        try:
+            expected = pd.read_excel(pandas_path, sheet_name=None)
+            actual = pd.read_excel(streaming_path, sheet_name=None)
+            self.assertEqual(list(expected), list(actual))
+            for sheet_name in expected:
+                pd.testing.assert_frame_equal(expected[sheet_name], actual[sheet_name])
+        finally:
+            os.remove(pandas_path)
+            os.remove(streaming_path)
+
+    def test_decimal_amounts_are_numeric_in_both_writers(self):
+        """Decimal amounts from the money pipeline are written as numbers, not text"""
+        from decimal import Decimal
+        from openpyxl import load_workbook
+        quote_data = dict(self.quote_data)
+        quote_data['cost_breakdown'] = [dict(item, unit_price=Decimal('1234.50'), total=Decimal('4938.00'))
+                                        for item in self.quote_data['cost_breakdown']]
+        pandas_path = ExcelGenerator(streaming=False).generate_quote_excel(quote_data)
+        streaming_path = self.excel_generator.generate_quote_excel(quote_data)
+        try:
+            expected = pd.read_excel(pandas_path, sheet_name=None)
+            actual = pd.read_excel(streaming_path, sheet_name=None)
+            for sheet_name in expected:
+                pd.testing.assert_frame_equal(expected[sheet_name], actual[sheet_name])
+            values = [cell.value for row in load_workbook(streaming_path)['Cost Breakdown'].iter_rows()
+                      for cell in row]
+            self.assertIn(1234.5, values)
+            self.assertNotIn('1234.50', values)
+        finally:
+            os.remove(pandas_path)
+            os.remove(streaming_path)
+
+    def test_excel_buffer_and_temp_file_cleanup(self):
+        """Buffers need no temp file; unclaimed temp paths are purged once old"""
+        from quote_system.app.document_generation import output
+
+        buffer = self.excel_generator.quote_excel_buffer(self.quote_data)
+        self.assertEqual(buffer.tell(), 0)
+        self.assertEqual(pd.read_excel(buffer, sheet_name='Quote Details')['Client Name'][0], 'John Smith')
+        self.assertFalse(buffer._rolled)  # still in memory
+        buffer.close()
+
+        path = self.excel_generator.generate_quote_excel(self.quote_data)
+        self.assertEqual(os.path.dirname(path), output.temp_output_dir())
+        os.utime(path, (0, 0))
+        self.assertGreaterEqual(output.cleanup_temp_outputs(), 1)
+        self.assertFalse(os.path.exists(path))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,120 @@
+import pytest
+from quote_system.app.quoting.pricing.formula_engine import (
+    compile_formula, clear_formula_cache, formula_cache_info
+)
+from quote_system.app.quoting.pricing.pricing_service import PricingService
+
+def test_formula_compiled_once():
+    """The same formula string should be compiled only once."""
+    clear_formula_cache()
+    first = compile_formula('=base*days')
+    second = compile_formula('=base*days')
+
+    assert first is second
+    assert formula_cache_info().hits == 1
+    assert first.names == ('base', 'days')
+
+def test_compiled_formula_many_contexts():
+    """A compiled formula can be evaluated against many contexts."""
+    compiled = compile_formula('=base*days+quantity')
+
+    assert compiled.evaluate({'base': 100, 'days': 2, 'quantity': 5}) == 205
+    assert compiled.evaluate({'base': 50, 'days': 3, 'quantity': 0}) == 150
+    assert compiled.evaluate({'base': '10', 'days': 1, 'quantity': None}) == 10
+
+def test_constant_formulas_are_folded():
+    """Formulas without variables are evaluated at compile time."""
+    compiled = compile_formula('=2^3+1')
+
+    assert compiled.code is None
+    assert compiled.constant == 9
+    assert compiled.evaluate({}) == 9
+
+def test_cell_ranges():
+    """Cell ranges expand to every cell, empty cells count as zero."""
+    context = {'cell_1_1': 1, 'cell_1_2': 2, 'cell_2_1': 3}
+
+    assert compile_formula('=SUM(A1:B2)').evaluate(context) == 6
+    assert compile_formula('=MAX(A1:B2)').evaluate(context) == 3
+    assert compile_formula('=AA1').names == ('cell_1_27',)
+
+def test_unsafe_formulas_rejected():
+    """Attribute access, subscripts and unknown functions are not allowed."""
+    for formula in ['=base.__class__', '=base[0]', '=open(1)', "='text'", '=__import__']:
+        compiled = compile_formula(formula)
+        assert compiled.code is None
+        assert compiled.evaluate({'base': 1}) == 0.0
+
+def test_missing_variables():
+    """Unknown variables evaluate to zero rather than raising."""
+    assert compile_formula('=missing*2').evaluate({'base': 1}) == 0.0
+
+def test_pricing_service_uses_compiled_formulas():
+    """PricingService evaluates formulas through the compiled cache."""
+    service = PricingService()
+    clear_formula_cache()
+
+    for group in range(1, 11):
+        result = service.formula_parser('=base*group', {'base': 10, 'group': group})
+        assert result == pytest.approx(10 * group)
+
+    assert formula_cache_info().misses == 1
+
+def test_batch_matches_scalar_evaluation():
+    """Batch evaluation gives the same result as evaluating each row."""
+    np = pytest.importorskip('numpy')
+    columns = {
+        'base': np.array([100.0, 200.0, 300.0]),
+        'days': np.array([1, 2, 3]),
+        'group': 4,
+    }
+    formulas = [
+        '=base*days*group',
+        '=IF(days>1,base,0)+MAX(base,250)',
+        '=ROUND(base/3,0)',
+        '=base*(days>1 and 1.2 or 1.0)',
+    ]
+
+    for formula in formulas:
+        compiled = compile_formula(formula)
+        expected = [compiled.evaluate({'base': b, 'days': d, 'group': 4})
+                    for b, d in zip(columns['base'], columns['days'])]
+        assert list(compiled.evaluate_batch(columns)) == pytest.approx(expected)
+
+def test_batch_errors_become_zero():
+    """Rows that divide by zero evaluate to zero like the scalar path."""
+    np = pytest.importorskip('numpy')
+    result = compile_formula('=base/days').evaluate_batch({'base': 10, 'days': np.array([0, 2, 5])})
+
+    assert list(result) == [0.0, 5.0, 2.0]
+    assert list(compile_formula('=missing').evaluate_batch({'days': np.array([1, 2])})) == [0.0, 0.0]
+
+def test_complex_cost_batch_matches_per_group():
+    """A pax sweep in one call matches calculate_complex_cost for each group size."""
+    pytest.importorskip('numpy')
+    service = PricingService()
+    charges = [
+        {'type': 'fixed', 'value': 0, 'formula': '=base*seasonal*group'},
+        {'type': 'percentage', 'value': 0.1, 'formula': '=0.1'},
+        {'type': 'fixed', 'value': 1500},
+        {'type': 'fixed', 'value': 0, 'days': 5, 'formula': '=50*days'},
+    ]
+    groups = list(range(1, 41))
+
+    batch = service.calculate_complex_cost_batch(100, 1.2, groups, charges)
+
+    expected = [service.calculate_complex_cost(100, 1.2, group, charges) for group in groups]
+    assert list(batch) == pytest.approx(expected)
+
+    with pytest.raises(ValueError):
+        service.calculate_complex_cost_batch(100, 1.2, [0, 1], charges)
+
+def test_batch_falls_back_to_rows_for_truth_values():
+    """Formulas that need one truth value per row give the scalar results, not zeros."""
+    np = pytest.importorskip('numpy')
+    groups = np.array([5, 20])
+    for formula in ['=IF(not group>10, 100, 50)', '=IF(group in [5, 6], 1, 2)', '=ROUND(group/3, group>10)']:
+        compiled = compile_formula(formula)
+        expected = [compiled.evaluate({'group': group}) for group in groups]
+        assert list(compiled.evaluate_batch({'group': groups})) == pytest.approx(expected)
+    assert list(compile_formula('=IF(not group>10, 100, 50)').evaluate_batch({'group': groups})) == [100.0, 50.0]
@@ -0,0 +1,57 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+from quote_system.app.instrumentation import RequestMetrics, init_instrumentation
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', DEVELOPMENT_MODE=True)
+    db = SQLAlchemy(app)
+
+    @app.route('/items/<int:count>')
+    def items(count):
+        for _ in range(count):
+            db.session.execute(text('SELECT 1'))
+        return 'ok'
+
+    init_instrumentation(app)
+    return app
+
+
+def test_request_headers_report_sql_count():
+    client = make_app().test_client()
+
+    response = client.get('/items/3')
+
+    assert response.headers['X-SQL-Count'] == '3'
+    assert float(response.headers['X-Response-Time-ms']) >= float(response.headers['X-SQL-Time-ms'])
+
+
+def test_admin_summary_orders_by_sql_count():
+    app = make_app()
+    client = app.test_client()
+    client.get('/items/1')
+    client.get('/items/12')
+    client.get('/items/8')
+
+    summary = client.get('/admin/instrumentation/requests').get_json()
+
+    items = next(e for e in summary['endpoints'] if e['endpoint'] == 'items')
+    assert summary['endpoints'][0]['endpoint'] == 'items'
+    assert items['requests'] == 3
+    assert items['sql_count_max'] == 12
+    assert items['sql_count_mean'] == 7
+    assert sum(items['latency_histogram'].values()) == 3
+    assert items['slowest_sql'] == 'SELECT 1'
+
+
+def test_rolling_window_drops_old_requests():
+    metrics = RequestMetrics(window=2)
+    for count in (50, 1, 2):
+        metrics.record('dashboard.index', 'GET', 200, count, 0.001, 0.001, 'SELECT 1', 0.01)
+
+    [dashboard] = metrics.summary()
+    assert dashboard['requests'] == 2
+    assert dashboard['sql_count_max'] == 2
@@ -0,0 +1,105 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+from openpyxl import load_workbook
+
+from quote_system.app.jobs.queue import DONE, FAILED, PACK_KIND, QUEUED, RUNNING, JobStore, JobWorker
+
+
+def test_job_store_claims_each_job_once_in_order(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    first = store.enqueue('quote_pdf', {'data': {'quote_number': 'Q-1'}}, owner_id=7)
+    second = store.enqueue('quote_excel', {'data': {}})
+
+    job, payload = store.claim()
+    assert job.id == first.id and job.status == RUNNING
+    assert payload == {'data': {'quote_number': 'Q-1'}}
+    assert store.claim()[0].id == second.id
+    assert store.claim() is None
+
+    store.finish(first.id, str(tmp_path / 'q.pdf'), 'Q-1.pdf')
+    store.fail(second.id, 'boom')
+    assert store.get(first.id).status == DONE
+    assert store.get(second.id).error == 'boom'
+    assert 'result_path' not in store.get(first.id).to_dict()
+
+
+def test_job_store_requeues_stale_and_purges_finished(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    lost = store.enqueue('quote_pdf', {'data': {}})
+    store.claim()
+    assert store.requeue_stale(timeout=3600) == 0
+    assert store.requeue_stale(timeout=-1) == 1
+    assert store.get(lost.id).status == QUEUED
+
+    store.claim()
+    store.finish(lost.id, 'result.pdf', 'quote.pdf')
+    assert store.purge(max_age=3600) == []
+    assert store.purge(max_age=-1) == ['result.pdf']
+    assert store.get(lost.id) is None
+
+
+def test_worker_renders_in_process_pool(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    ok = store.enqueue('quote_excel', {'data': {
+        'quote_number': 'Q-42', 'client_name': 'Smith', 'start_date': date(2026, 5, 1),
+        'cost_breakdown': [{'item': 'Lodge', 'amount': 100}],
+    }})
+    broken = store.enqueue('itinerary_excel', {'data': None})
+
+    worker = JobWorker(store, str(tmp_path / 'results'), max_workers=1, poll_interval=0.05)
+    stop = threading.Event()
+    thread = threading.Thread(target=worker.run, args=(stop,))
+    thread.start()
+    try:
+        deadline = time.time() + 60
+        while time.time() < deadline and any(store.get(j.id).status in (QUEUED, RUNNING) for j in (ok, broken)):
+            time.sleep(0.1)
+    finally:
+        stop.set()
+        thread.join()
+
+    done = store.get(ok.id)
+    assert done.status == DONE
+    assert done.filename == 'Q-42.xlsx'
+    assert 'Quote Details' in load_workbook(done.result_path).sheetnames
+    assert store.get(broken.id).status == FAILED
+
+
+@pytest.mark.parametrize('kind', ['quote_pdf', 'quote_excel', 'voucher_pdf'])
+def test_every_kind_has_a_task(kind):
+    from quote_system.app.jobs.tasks import SUFFIXES, TASKS
+
+    assert kind in TASKS and SUFFIXES[kind] in ('.pdf', '.xlsx')
+
+
+def test_packs_take_a_worker_slot_per_document(tmp_path):
+    from concurrent.futures import Future
+    from quote_system.app.document_generation.booking_pack import PackDocument
+
+    class Recorder:
+        def __init__(self):
+            self.futures = []
+
+        def submit(self, fn, *args):
+            self.futures.append(Future())
+            return self.futures[-1]
+
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    single = store.enqueue('quote_excel', {'data': {}})
+    pack = store.enqueue(PACK_KIND, {'documents': [PackDocument('quote_excel', {'data': {}}, f'{n}.xlsx')
+                                                   for n in range(3)]})
+    store.enqueue('quote_excel', {'data': {}})
+    worker = JobWorker(store, str(tmp_path / 'results'), max_workers=2)
+    pool, packs = Recorder(), Recorder()
+
+    worker._dispatch(pool, None, packs)
+    assert (len(pool.futures), len(packs.futures)) == (1, 0)  # the pack needs both slots
+
+    pool.futures[0].set_result('quote.xlsx')
+    assert store.get(single.id).status == DONE
+    worker._dispatch(pool, None, packs)
+    assert (len(pool.futures), len(packs.futures)) == (1, 1)  # the pack runs alone, the next job waits
+    assert store.get(pack.id).status == RUNNING
@@ -0,0 +1,152 @@
+import socket
+
+import pytest
+from flask import Flask
+from flask_login import LoginManager, UserMixin
+
+from quote_system.app.jobs import bp
+from quote_system.app.jobs.queue import callback_url_allowed, job_queue
+
+
+class _User(UserMixin):
+    def __init__(self, user_id, role='agent'):
+        self.id = user_id
+        self.role = role
+
+
+USERS = {'1': _User(1), '2': _User(2), '9': _User(9, role='admin')}
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY='test', DEVELOPMENT_MODE=True,
+                      JOB_QUEUE_PATH=str(tmp_path / 'jobs.sqlite3'), JOB_OUTPUT_DIR=str(tmp_path / 'results'),
+                      JOB_CALLBACK_HOSTS=['hooks.example.internal'])
+    login_manager = LoginManager(app)
+    login_manager.request_loader(lambda request: USERS.get(request.headers.get('X-User')))
+    job_queue.init_app(app)
+    app.register_blueprint(bp)
+    return app.test_client()
+
+
+def _enqueue(client, user='1', **body):
+    return client.post('/jobs/', json={'kind': 'quote_excel', 'data': {'quote_number': 'Q-1'}, **body},
+                       headers={'X-User': user})
+
+
+def test_jobs_are_only_visible_to_their_owner_and_admins(client, tmp_path):
+    response = _enqueue(client)
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job['status'] == 'queued' and job['owner_id'] == 1
+
+    assert client.get(job['status_url'], headers={'X-User': '1'}).status_code == 200
+    assert client.get(job['status_url'], headers={'X-User': '9'}).status_code == 200
+    assert client.get(job['status_url'], headers={'X-User': '2'}).status_code == 404
+    assert client.get(f"/jobs/{job['id']}/download", headers={'X-User': '2'}).status_code == 404
+    assert client.get(f"/jobs/{job['id']}/download", headers={'X-User': '1'}).status_code == 409
+
+    result = tmp_path / 'Q-1.xlsx'
+    result.write_bytes(b'workbook')
+    job_queue.store.claim()
+    job_queue.store.finish(job['id'], str(result), 'Q-1.xlsx')
+    status = client.get(job['status_url'], headers={'X-User': '1'}).get_json()
+    download = client.get(status['download_url'], headers={'X-User': '1'})
+    assert download.status_code == 200 and download.data == b'workbook'
+
+
+def test_enqueue_rejects_unknown_kinds_and_templates(client):
+    assert _enqueue(client, kind='voucher_pdf').status_code == 400
+    assert _enqueue(client, data=[]).status_code == 400
+    assert _enqueue(client, kind='quote_pdf', template='quote.html').status_code == 202
+    assert _enqueue(client, kind='quote_pdf', template='invoice.html').status_code == 400
+    assert _enqueue(client, kind='quote_pdf', template='../../app/templates/base.html').status_code == 400
+
+
+@pytest.mark.parametrize('url', [
+    'http://127.0.0.1:5000/hook', 'http://localhost/hook', 'http://169.254.169.254/latest/meta-data',
+    'http://10.1.2.3/hook', 'http://192.168.0.10/hook', 'http://[::1]/hook', 'ftp://hooks.example.internal/',
+    'http://[::ffff:127.0.0.1]/hook',
+])
+def test_callbacks_to_internal_addresses_are_rejected(client, url):
+    assert _enqueue(client, callback_url=url).status_code == 400
+
+
+def test_callbacks_to_allowed_and_public_hosts(client, monkeypatch):
+    assert _enqueue(client, callback_url='https://hooks.example.internal/jobs').status_code == 202
+
+    def resolve(host, port, *args, **kwargs):
+        address = {'hooks.partner.test': '93.184.216.34', 'rebound.test': '10.0.0.8'}[host]
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, port))]
+
+    monkeypatch.setattr(socket, 'getaddrinfo', resolve)
+    assert callback_url_allowed('https://hooks.partner.test/done')
+    assert not callback_url_allowed('https://rebound.test/done')
+
+
+def test_packs_are_filed_under_the_users_own_quote(tmp_path, monkeypatch):
+    from quote_system.database.models import db, Agent, Quote, User
+    from quote_system.database import rate_models  # noqa: F401 (Supplier.rates)
+
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY='test', DEVELOPMENT_MODE=True, SQLALCHEMY_DATABASE_URI='sqlite://',
+                      JOB_QUEUE_PATH=str(tmp_path / 'jobs.sqlite3'), JOB_OUTPUT_DIR=str(tmp_path / 'results'))
+    db.init_app(app)
+    login_manager = LoginManager(app)
+    login_manager.request_loader(lambda request: USERS.get(request.headers.get('X-User')))
+    job_queue.init_app(app)
+    app.register_blueprint(bp)
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        owner = User(id=1, username='owner', email='owner@example.com')
+        agent = Agent(name='Safari Desk', code='SD')
+        db.session.add_all([owner, agent])
+        db.session.flush()
+        db.session.add(Quote(quote_number='QUOTE-0042', creator_id=owner.id, agent_id=agent.id))
+        db.session.commit()
+
+    def pack(user, quote_number):
+        data = {'quote_number': quote_number, 'agent_name': '..'}
+        response = client.post('/jobs/', json={'kind': 'booking_pack', 'data': data}, headers={'X-User': user})
+        assert response.status_code == 202
+        return job_queue.store.claim()[1]
+
+    from sqlalchemy import event
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    assert pack('1', 'QUOTE-0042')['storage']['agent_name'] == 'Safari Desk'
+    assert len(statements) == 1  # the quote and its agent (booking_pack profile)
+    assert pack('1', 'QUOTE-0042')['storage']['quote_number'] == 'QUOTE-0042'
+    assert 'storage' not in pack('2', 'QUOTE-0042')  # someone else's quote
+    assert 'storage' not in pack('1', 'QUOTE-9999')  # not a stored quote
+    assert pack('9', 'QUOTE-0042')['storage']['agent_name'] == 'Safari Desk'
+
+    # Vouchers come from a booking of the user's own stored quote
+    from quote_system.app.document_generation.booking_pack import Voucher
+    from quote_system.app.jobs import routes
+    monkeypatch.setattr(routes, '_booking_vouchers',
+                        lambda booking_id, quote: [Voucher('River Lodge', f'<p>{booking_id} {quote.quote_number}</p>')])
+
+    def pack_for_booking(user, booking_id):
+        return client.post('/jobs/', json={'kind': 'booking_pack', 'data': {'quote_number': 'QUOTE-0042'},
+                                           'booking_id': booking_id}, headers={'X-User': user})
+
+    assert pack_for_booking('1', 5).status_code == 202
+    documents = job_queue.store.claim()[1]['documents']
+    assert documents[-1].filename == 'vouchers/voucher_River Lodge.pdf'
+    assert documents[-1].payload['html'] == '<p>5 QUOTE-0042</p>'
+    assert pack_for_booking('2', 5).status_code == 400
+    assert pack_for_booking('1', '5').status_code == 400
+
+
+def test_storage_paths_stay_under_the_storage_root(tmp_path):
+    from quote_system.app.services.file_storage_service import FileStorageService
+
+    storage = FileStorageService(str(tmp_path))
+    assert storage.get_storage_path('Safari Desk', 2026, 'Q-1', 'booking_pack').parent.parent.parent.parent == tmp_path
+    with pytest.raises(ValueError):
+        storage.get_storage_path('..', 2026, 'Q-1', 'booking_pack')
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from quote_system.app.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 1, 2, 3, 4, 5), 42]
+    assert decode_cursor(encode_cursor(values)) == values
+    assert decode_cursor('not-a-cursor') is None
+
+
+def test_keyset_pages_cover_every_row_once():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+    db = SQLAlchemy(app)
+
+    class Entry(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        updated_at = db.Column(db.DateTime)
+
+    with app.app_context():
+        db.create_all()
+        start = datetime(2026, 1, 1)
+        # Three rows share each timestamp, so the id tie-breaker matters
+        db.session.add_all([Entry(updated_at=start + timedelta(hours=i // 3)) for i in range(47)])
+        db.session.commit()
+
+        seen, cursor = [], None
+        while True:
+            page = keyset_paginate(Entry.query, (Entry.updated_at, Entry.id), cursor, per_page=10)
+            seen.extend(entry.id for entry in page.items)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        expected = [entry.id for entry in Entry.query.order_by(Entry.updated_at.desc(), Entry.id.desc())]
+        assert seen == expected
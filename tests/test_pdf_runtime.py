@@ -0,0 +1,30 @@
+from quote_system.app.document_generation.pdf_runtime import PDFRuntime
+
+
+def test_assets_are_read_once_per_process(tmp_path):
+    logo = tmp_path / 'logo.png'
+    logo.write_bytes(b'first')
+    runtime = PDFRuntime(str(tmp_path))
+
+    fetched = runtime.fetch(logo.as_uri())
+    logo.write_bytes(b'second')
+
+    assert fetched['string'] == b'first'
+    assert fetched['mime_type'] == 'image/png'
+    assert runtime.fetch(logo.as_uri())['string'] == b'first'
+
+
+def test_only_asset_files_are_cached(tmp_path):
+    runtime = PDFRuntime(str(tmp_path / 'assets'))
+
+    assert runtime._asset_path((tmp_path / 'assets' / 'logo.svg').as_uri()) is not None
+    assert runtime._asset_path((tmp_path / 'assets' / 'notes.txt').as_uri()) is None
+    assert runtime._asset_path((tmp_path / 'elsewhere.png').as_uri()) is None
+    assert runtime._asset_path('https://example.com/assets/logo.png') is None
+
+
+def test_missing_stylesheet_files_are_skipped(tmp_path):
+    runtime = PDFRuntime(str(tmp_path))
+
+    assert runtime.stylesheet('pdf.css') is None
+    assert runtime.stylesheets(['missing.css']) == []
@@ -135,3 +135,45 @@ def test_edge_cases():
     # Test invalid seasonal factor
     with pytest.raises(ValueError):
         service.calculate_complex_cost(100, 0, 10, [])
+
+def test_money_paths_stay_in_decimal():
+    """Seasonal, complex-cost and sliding-scale amounts round half up from exact Decimals."""
+    from decimal import Decimal
+    from quote_system.app.quoting.pricing.sliding_scale import SlidingScaleEngine
+    from quote_system.app.quoting.pricing.tdd_models import Quote, CostComponent
+    service = PricingService()
+
+    assert service.seasonal_multiplier(date(2025, 6, 15)) == Decimal('1.2')
+    # 1.005 is 1.00499999... as a float, so float rounding gives 1.0
+    assert service.calculate_complex_cost(0, 1, 1, [{'type': 'fixed', 'value': 1.005}]) == 1.01
+    assert service.apply_seasonal_rates_per_night(0.1, date(2025, 6, 1), date(2025, 6, 4))['total_cost'] == 0.36
+
+    scale = SlidingScaleEngine().generate(Quote(pax=1, variable_costs=[CostComponent(name='Fee', amount=0.335)]),
+                                          [1], seasonal_multiplier=1.0)
+    assert scale[1]['price_per_pax'] == 0.34
+
+def test_batch_complex_cost_matches_scalar_on_half_cents():
+    """The vectorized path rounds half up to the same cent as calculate_complex_cost."""
+    service = PricingService()
+    charges = [{'formula': '=base'}]
+    for base, expected in [(1.005, 1.01), (0.125, 0.13), (10.345, 10.35)]:
+        batch = service.calculate_complex_cost_batch(base, 1, [3, 12], charges)
+        assert service.calculate_complex_cost(base, 1, 3, charges) == expected
+        assert list(batch) == [service.calculate_complex_cost(base, 1, group, charges) for group in (3, 12)]
+
+def test_money_arithmetic_ignores_the_ambient_context():
+    """Money math runs under MONEY_CONTEXT whatever the caller's decimal context is."""
+    from decimal import Context, Decimal, localcontext, ROUND_DOWN
+    from quote_system.app.quoting.pricing_engine import QuoteEngine
+    service, engine = PricingService(), QuoteEngine()
+    activities = [{'cost': 333.335}]
+    expected = service.create_quote(activities, date(2025, 6, 1), date(2025, 6, 8), 12)
+
+    with localcontext(Context(prec=4, rounding=ROUND_DOWN)):
+        assert service.create_quote(activities, date(2025, 6, 1), date(2025, 6, 8), 12) == expected
+        assert engine.create_quote(activities, date(2025, 6, 1), date(2025, 6, 8), 12)['final_price'] == \
+            expected['final_price']
+
+    assert engine.seasonal_multiplier(date(2025, 11, 1)) == Decimal('0.8')
+    assert engine.group_discount_factor(15) == Decimal('0.9')
+    assert engine.subcontracting_factor() == Decimal('1.15')
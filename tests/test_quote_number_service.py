@@ -0,0 +1,64 @@
+from flask import Flask
+
+from quote_system.database.models import db, User, Quote
+from quote_system.database import rate_models  # noqa: F401 (Supplier.rates)
+from quote_system.app.services.quote_number_service import QuoteNumberService
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+    db.init_app(app)
+    return app
+
+
+def test_numbers_continue_after_existing_quotes():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='numbers', email='numbers@example.com')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Quote(quote_number='QUOTE-0007', creator_id=user.id))
+        db.session.commit()
+
+        service = QuoteNumberService()
+        assert service.next_number() == 'QUOTE-0008'
+        assert service.next_number() == 'QUOTE-0009'
+
+
+def test_block_allocation_and_prefixes():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        first = QuoteNumberService(block_size=10)
+        second = QuoteNumberService(block_size=10)
+
+        numbers = [first.next_number(), second.next_number(), first.next_number()]
+        assert numbers == ['QUOTE-0001', 'QUOTE-0011', 'QUOTE-0002']
+
+        per_agent = QuoteNumberService(per_year=True, per_agent=True)
+        assert per_agent.next_number(agent_code='ab', year=2026) == 'QUOTE-2026-AB-0001'
+        assert per_agent.next_number(year=2026) == 'QUOTE-2026-0001'
+
+
+def test_new_quotes_use_the_chosen_or_the_users_own_agent():
+    from quote_system.database.models import Agent
+    from quote_system.app.services.quote_service import QuoteService
+
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username='agent-user', email='agent-user@example.com')
+        db.session.add(user)
+        db.session.flush()
+        own, other = Agent(name='Safari Desk', code='SD', user_id=user.id), Agent(name='Dune Tours', code='DT')
+        db.session.add_all([own, other])
+        db.session.commit()
+
+        assert QuoteService.quote_agent(user_id=user.id) is own
+        assert QuoteService.quote_agent(other.id, user.id) is other
+        assert QuoteService.quote_agent() is None
+
+        service = QuoteNumberService(per_agent=True)
+        assert service.next_number(agent_code=QuoteService.quote_agent(user_id=user.id).code) == 'QUOTE-SD-0001'
@@ -0,0 +1,88 @@
+import io
+from datetime import date
+
+import pytest
+from flask import Flask
+
+from quote_system.database.models import db, Supplier
+from quote_system.database.rate_models import Rate, SeasonalRate
+from quote_system.app.services.rate_import_service import (
+    RateImportError, RateImportService, iter_sheet_rows, parse_amount, parse_date
+)
+
+SHEET = (
+    "Service Type,Rate,Season Start,Season End,Season,Multiplier\n"
+    "Double Room,\"R 1,250.00\",01/12/2027,15/01/2028,Peak,1.25\n"
+    "Single Room,900,,,,\n"
+    "Bad Room,abc,,,,\n"
+)
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+    db.init_app(app)
+    return app
+
+
+def test_parse_date_and_amount():
+    assert parse_date('2027-03-01') == date(2027, 3, 1)
+    assert parse_date('01/03/2027') == date(2027, 3, 1)
+    assert parse_date(46082) == date(2026, 3, 1)
+    assert parse_date('') is None
+    assert parse_amount('R 1,250.50') == 1250.5
+    with pytest.raises(ValueError):
+        parse_date('March-ish')
+    with pytest.raises(ValueError):
+        parse_amount('-5')
+
+
+def test_dry_run_reports_without_writing():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        supplier = Supplier(name='River Lodge')
+        db.session.add(supplier)
+        db.session.commit()
+
+        service = RateImportService()
+        report = service.import_file(io.BytesIO(SHEET.encode()), 'rates.csv', supplier_id=supplier.id)
+        assert (report.rows_read, report.created, report.error_count) == (3, 2, 1)
+        assert report.errors == [(4, "invalid amount 'abc'")]
+        assert not report.applied and Rate.query.count() == 0
+
+        # Invalid lines block the write unless skip_invalid is set
+        report = service.import_file(io.BytesIO(SHEET.encode()), 'rates.csv', supplier_id=supplier.id, dry_run=False)
+        assert not report.applied and Rate.query.count() == 0
+
+
+def test_import_writes_rates_and_updates_on_reimport():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        supplier = Supplier(name='River Lodge')
+        db.session.add(supplier)
+        db.session.commit()
+
+        service = RateImportService(batch_size=1)
+        report = service.import_file(io.BytesIO(SHEET.encode()), 'rates.csv', supplier_id=supplier.id,
+                                     dry_run=False, skip_invalid=True)
+        assert report.applied and report.created == 2
+        peak = Rate.query.filter_by(name='River Lodge - Double Room').one()
+        assert peak.base_rate == 1250.0
+        assert [(s.season_name, s.multiplier, s.start_date) for s in peak.seasonal_rates] == \
+            [('Peak', 1.25, date(2027, 12, 1))]
+
+        changed = SHEET.replace('900', '950')
+        report = service.import_file(io.BytesIO(changed.encode()), 'rates.csv', supplier_id=supplier.id,
+                                     dry_run=False, skip_invalid=True)
+        assert (report.created, report.updated, report.unchanged) == (0, 1, 1)
+        assert Rate.query.filter_by(name='River Lodge - Single Room').one().base_rate == 950.0
+        assert Rate.query.count() == 2 and SeasonalRate.query.count() == 1
+
+
+def test_missing_columns_are_rejected():
+    with pytest.raises(RateImportError):
+        list(iter_sheet_rows(io.BytesIO(b'foo,bar\n1,2\n'), 'rates.csv'))
+    with pytest.raises(RateImportError):
+        list(iter_sheet_rows(io.BytesIO(b''), 'rates.pdf'))
@@ -0,0 +1,126 @@
+import os
+import time
+from datetime import date
+
+from sqlalchemy import ForeignKey, create_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship
+
+from quote_system.app.document_generation import pdf_generator
+from quote_system.app.document_generation.pdf_generator import PDFGenerator
+from quote_system.app.document_generation.pdf_runtime import pdf_runtime
+from quote_system.app.document_generation.render_cache import RenderCache
+from quote_system.app.document_generation.templating import get_environment
+
+
+def test_key_depends_on_template_and_normalized_context(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    key = cache.key('<p>{{ quote.total }}</p>', {'total': 100, 'start_date': date(2026, 5, 1), 'tags': {'b', 'a'}})
+
+    assert key == cache.key('<p>{{ quote.total }}</p>', {'tags': {'a', 'b'}, 'start_date': date(2026, 5, 1), 'total': 100})
+    assert key != cache.key('<p>{{ quote.total }}</p>', {'total': 101, 'start_date': date(2026, 5, 1), 'tags': {'a', 'b'}})
+    assert key != cache.key('<b>{{ quote.total }}</b>', {'total': 100, 'start_date': date(2026, 5, 1), 'tags': {'a', 'b'}})
+    assert key != cache.key('<p>{{ quote.total }}</p>', {'total': 100, 'start_date': date(2026, 5, 1), 'tags': {'a', 'b'}},
+                            template_version=2)
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Client(_Base):
+    __tablename__ = 'client'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+class _Booking(_Base):
+    __tablename__ = 'booking'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    client_id: Mapped[int] = mapped_column(ForeignKey('client.id'))
+    client: Mapped[_Client] = relationship()
+
+
+def test_key_changes_when_a_related_row_changes(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    engine = create_engine('sqlite://')
+    _Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(_Booking(id=1, client=_Client(id=1, name='Ada')))
+        session.commit()
+        template = '<p>{{ booking.client.name }}</p>'
+        before = cache.key(template, {'booking': session.get(_Booking, 1)})
+
+        session.get(_Client, 1).name = 'Ada Lovelace'
+        session.commit()
+
+        assert cache.key(template, {'booking': session.get(_Booking, 1)}) != before
+
+
+
+def test_template_key_covers_referenced_templates_and_pdf_assets(tmp_path):
+    templates = tmp_path / 'templates'
+    templates.mkdir()
+    (templates / 'base.html').write_text('<body>{% block content %}{% endblock %}</body>')
+    (templates / 'quote.html').write_text('{% extends "base.html" %}{% block content %}{{ n }}{% endblock %}')
+    (templates / 'pdf.css').write_text('body { margin: 0 }')
+    cache = RenderCache(str(tmp_path / 'cache'))
+    env = get_environment(str(templates))
+    pdf_runtime.configure(str(templates))
+    try:
+        keys = [cache.template_key(env, 'quote.html', {'n': 1}, stylesheets=['test_sheet'])]
+        (templates / 'base.html').write_text('<main>{% block content %}{% endblock %}</main>')
+        keys.append(cache.template_key(env, 'quote.html', {'n': 1}, stylesheets=['test_sheet']))
+        (templates / 'pdf.css').write_text('body { margin: 1cm }')
+        keys.append(cache.template_key(env, 'quote.html', {'n': 1}, stylesheets=['test_sheet']))
+        (templates / 'logo.png').write_bytes(b'png')
+        keys.append(cache.template_key(env, 'quote.html', {'n': 1}, stylesheets=['test_sheet']))
+        pdf_runtime.register_stylesheet('test_sheet', 'h1 { color: red }')
+        keys.append(cache.template_key(env, 'quote.html', {'n': 1}, stylesheets=['test_sheet']))
+
+        assert len(set(keys)) == len(keys)
+        assert cache.template_key(env, 'quote.html', {'n': 1}, stylesheets=['test_sheet']) == keys[-1]
+    finally:
+        pdf_runtime.configure()
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path / 'pdf'), max_bytes=25)
+    source = tmp_path / 'doc.pdf'
+    source.write_bytes(b'x' * 10)
+    for key in ('a', 'b'):
+        cache.put_file(key, str(source))
+    past = time.time() - 60
+    os.utime(cache.get('a'), (past, past))
+    os.utime(cache.get('b'), (past - 60, past - 60))
+    cache.get('b')  # a hit makes 'b' the most recently used
+
+    cache.put_file('c', str(source))
+
+    assert cache.get('a') is None
+    assert cache.get('b') and cache.get('c')
+
+
+def test_repeat_quote_pdf_is_served_from_cache(tmp_path, monkeypatch):
+    templates = tmp_path / 'templates'
+    templates.mkdir()
+    (templates / 'quote.html').write_text('<h1>{{ quote.quote_number }}</h1>')
+    layouts = []
+
+    def fake_write_pdf(self, html, output_path):
+        layouts.append(html)
+        with open(output_path, 'wb') as f:
+            f.write(html.encode())
+        return output_path
+
+    monkeypatch.setattr(pdf_generator, 'HAS_WEASYPRINT', True)
+    monkeypatch.setattr(PDFGenerator, '_write_pdf', fake_write_pdf)
+    generator = PDFGenerator(str(templates), render_cache=RenderCache(str(tmp_path / 'cache')))
+
+    first = generator.generate_quote_pdf({'quote_number': 'Q-1'}, output_path=str(tmp_path / 'a.pdf'))
+    second = generator.generate_quote_pdf({'quote_number': 'Q-1'}, output_path=str(tmp_path / 'b.pdf'))
+    generator.generate_quote_pdf({'quote_number': 'Q-2'}, output_path=str(tmp_path / 'c.pdf'))
+
+    assert len(layouts) == 2
+    assert open(first, 'rb').read() == open(second, 'rb').read() == b'<h1>Q-1</h1>'
+    with generator.quote_pdf_buffer({'quote_number': 'Q-2'}) as buffer:
+        assert buffer.read() == b'<h1>Q-2</h1>'
+    assert len(layouts) == 2
@@ -0,0 +1,89 @@
+from flask import Flask
+
+from quote_system.database.models import db, User, Quote, Client, Supplier, TourPackage
+from quote_system.app.search import index as search_index
+from quote_system.app.search.index import create_search_schema, rebuild_search_index, search, search_terms
+
+
+def make_app(indexed=True):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+    db.init_app(app)
+    if indexed:
+        search_index.init_app(app)
+    return app
+
+
+def seed():
+    agent = User(username='agent', email='agent@example.com')
+    other = User(username='other', email='other@example.com')
+    db.session.add_all([agent, other])
+    db.session.flush()
+    quote = Quote(quote_number='Q-0001', title='Cape Town safari', description='Winelands', creator_id=agent.id)
+    db.session.add_all([
+        quote,
+        Quote(quote_number='Q-0002', title='Kruger', description='Cape buffalo', creator_id=other.id),
+        Client(first_name='Zoë', last_name='Capel', email='zoe@example.com'),
+        Supplier(name='Capetonian Lodges', services='accommodation, transfers'),
+        TourPackage(name='Cape Explorer', code='CPX12', duration=5, type='Accommodated', countries='ZA',
+                    departure_location='Cape Town', ending_location='Cape Town', max_passengers=12),
+    ])
+    db.session.commit()
+    return agent, quote
+
+
+def test_search_terms_strip_query_syntax():
+    assert search_terms('Cape "Town" OR -safari*') == ['cape', 'town', 'or', 'safari']
+    assert search_terms('  ') == []
+
+
+def test_prefix_search_ranks_title_matches_first():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        create_search_schema()
+        agent, quote = seed()
+
+        results = search('cap')
+        assert {result.kind for result in results} == {'quote', 'client', 'supplier', 'tour_package'}
+        # Q-0002 only matches in its description
+        assert (results[-1].kind, results[-1].title) == ('quote', 'Q-0002 Kruger')
+
+        assert [r.title for r in search('cape tow')] == ['Q-0001 Cape Town safari']
+        assert [r.kind for r in search('zoe')] == ['client']
+        assert [r.kind for r in search('cap', kinds=['supplier'])] == ['supplier']
+        assert 'Q-0002 Kruger' not in [r.title for r in search('cape', owner_id=agent.id)]
+
+
+def test_index_follows_model_changes_and_rebuild():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        create_search_schema()
+        _, quote = seed()
+
+        quote.title = 'Durban beaches'
+        db.session.commit()
+        assert search('safari') == []
+        assert [r.record_id for r in search('durb')] == [quote.id]
+
+        db.session.delete(Supplier.query.one())
+        db.session.commit()
+        assert search('capetonian') == []
+
+        assert rebuild_search_index() == 4
+        assert [r.record_id for r in search('durban')] == [quote.id]
+
+
+def test_apps_without_search_index_write_without_the_table():
+    make_app()  # another app in the process keeps its index in sync
+    app = make_app(indexed=False)
+    with app.app_context():
+        db.create_all()
+        supplier = Supplier(name='Capetonian Lodges')
+        db.session.add(supplier)
+        db.session.commit()
+        supplier.name = 'Cape Lodges'
+        db.session.commit()
+        db.session.delete(supplier)
+        db.session.commit()
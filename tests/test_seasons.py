@@ -0,0 +1,155 @@
+import pytest
+from datetime import date, datetime
+from quote_system.app.quoting.pricing.seasons import SeasonIndex, SeasonInterval
+from quote_system.app.quoting.pricing.pricing_service import PricingService
+
+@pytest.fixture
+def season_index():
+    return SeasonIndex([
+        SeasonInterval(date(2025, 1, 1), date(2025, 4, 30), 0.8, 'low', 1),
+        SeasonInterval(date(2025, 5, 1), date(2025, 10, 31), 1.2, 'high', 2),
+        SeasonInterval(date(2025, 7, 15), date(2025, 8, 15), 1.5, 'peak', 3),
+        SeasonInterval(date(2025, 12, 15), date(2026, 1, 5), 1.3, 'festive', 4),
+    ])
+
+def test_lookup_by_date(season_index):
+    """Each date resolves to the season that covers it."""
+    assert season_index.multiplier_for(date(2025, 1, 1)) == 0.8
+    assert season_index.multiplier_for(date(2025, 4, 30)) == 0.8
+    assert season_index.multiplier_for(date(2025, 5, 1)) == 1.2
+    assert season_index.multiplier_for(date(2026, 1, 5)) == 1.3
+    assert season_index.lookup(datetime(2025, 3, 1, 12, 30)).season_name == 'low'
+
+def test_nested_season_wins(season_index):
+    """A season defined inside a broader one takes precedence for its dates."""
+    assert season_index.multiplier_for(date(2025, 7, 14)) == 1.2
+    assert season_index.multiplier_for(date(2025, 7, 15)) == 1.5
+    assert season_index.multiplier_for(date(2025, 8, 15)) == 1.5
+    assert season_index.multiplier_for(date(2025, 8, 16)) == 1.2
+    assert [s.season_name for _, _, s in season_index.segments] == \
+        ['low', 'high', 'peak', 'high', 'festive']
+
+def test_dates_outside_seasons(season_index):
+    """Dates outside every season use the default multiplier."""
+    assert season_index.lookup(date(2025, 11, 20)) is None
+    assert season_index.multiplier_for(date(2024, 12, 31)) == 1.0
+    assert season_index.multiplier_for(date(2026, 2, 1), default=0.9) == 0.9
+    assert len(SeasonIndex()) == 0
+
+def test_pricing_service_uses_season_index(season_index):
+    """apply_seasonal_rates prefers the index and falls back to months."""
+    service = PricingService()
+    assert service.apply_seasonal_rates(100, date(2025, 7, 20), season_index) == 150
+    assert service.apply_seasonal_rates(100, date(2025, 3, 15), season_index) == 80
+    # November is not covered by the index: month-based low season applies
+    assert service.apply_seasonal_rates(100, date(2025, 11, 15), season_index) == 80
+
+def test_split_across_season_boundaries(season_index):
+    """A stay is split into runs at every season change, including gaps."""
+    runs = season_index.split(date(2025, 4, 25), date(2025, 5, 5))
+    assert [(first, last, season.season_name) for first, last, season in runs] == [
+        (date(2025, 4, 25), date(2025, 4, 30), 'low'),
+        (date(2025, 5, 1), date(2025, 5, 4), 'high'),
+    ]
+
+    runs = season_index.split(date(2025, 10, 30), date(2025, 12, 17))
+    assert [(first, last, season and season.season_name) for first, last, season in runs] == [
+        (date(2025, 10, 30), date(2025, 10, 31), 'high'),
+        (date(2025, 11, 1), date(2025, 12, 14), None),
+        (date(2025, 12, 15), date(2025, 12, 16), 'festive'),
+    ]
+    assert season_index.split(date(2025, 5, 5), date(2025, 5, 5)) == []
+
+def test_per_night_pricing_straddling_seasons(season_index):
+    """A 21-night tour is charged per night at each season's rate."""
+    service = PricingService()
+    result = service.apply_seasonal_rates_per_night(100, date(2025, 4, 20), date(2025, 5, 11), season_index)
+
+    assert result['nights'] == 21
+    assert [(s['season'], s['nights']) for s in result['segments']] == [('low', 11), ('high', 10)]
+    assert result['total_cost'] == pytest.approx(11 * 80 + 10 * 120)
+
+def test_per_night_pricing_month_fallback():
+    """Without a season index, nights are priced by their month."""
+    service = PricingService()
+    result = service.apply_seasonal_rates_per_night(100, date(2025, 5, 30), date(2025, 6, 3))
+
+    assert [(s['season'], s['nights']) for s in result['segments']] == [('low', 2), ('high', 2)]
+    assert result['total_cost'] == pytest.approx(2 * 80 + 2 * 120)
+
+def test_price_itinerary_nights(season_index):
+    """Lines for several suppliers are priced against their own season index."""
+    service = PricingService()
+    lines = [
+        {'supplier_id': 1, 'nightly_cost': 100, 'start_date': date(2025, 7, 13), 'end_date': date(2025, 7, 17)},
+        {'supplier_id': 2, 'nightly_cost': 50, 'start_date': date(2025, 7, 13), 'end_date': date(2025, 7, 17)},
+    ]
+    result = service.price_itinerary_nights(lines, {1: season_index, 2: SeasonIndex()})
+
+    assert result['lines'][0]['total_cost'] == pytest.approx(2 * 120 + 2 * 150)
+    assert result['lines'][1]['total_cost'] == pytest.approx(4 * 60)
+    assert result['total_cost'] == pytest.approx(540 + 240)
+
+def make_rate_app():
+    from flask import Flask
+    from quote_system.database.models import db, Supplier
+    from quote_system.database.rate_models import Rate, SeasonalRate
+
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+    db.init_app(app)
+    return app, db, Supplier, Rate, SeasonalRate
+
+def test_rate_index_invalidated_on_commit_only():
+    """Seasons changed in a transaction are dropped on commit, not on flush or rollback."""
+    from quote_system.app.quoting.pricing.seasons import SeasonalRateIndex
+
+    app, db, Supplier, Rate, SeasonalRate = make_rate_app()
+    with app.app_context():
+        db.create_all()
+        lodge = Supplier(name='River Lodge')
+        db.session.add(lodge)
+        db.session.flush()
+        rate = Rate(name='2025', supplier_id=lodge.id, start_date=date(2025, 1, 1), end_date=date(2025, 12, 31), base_rate=100.0)
+        rate.seasonal_rates.append(SeasonalRate(season_name='high', multiplier=1.2,
+                                                start_date=date(2025, 5, 1), end_date=date(2025, 10, 31)))
+        db.session.add(rate)
+        db.session.commit()
+
+        index = SeasonalRateIndex()
+        assert index.multiplier_for(lodge.id, date(2025, 7, 1)) == 1.2
+
+        rate.seasonal_rates[0].multiplier = 1.5
+        db.session.flush()
+        assert db.session.info['season_invalidate'] == {lodge.id}
+        assert index.multiplier_for(lodge.id, date(2025, 7, 1)) == 1.2
+        db.session.rollback()
+        assert 'season_invalidate' not in db.session.info
+        assert index.multiplier_for(lodge.id, date(2025, 7, 1)) == 1.2
+
+        rate.seasonal_rates[0].multiplier = 1.5
+        db.session.commit()
+        assert index.multiplier_for(lodge.id, date(2025, 7, 1)) == 1.5
+
+def test_rate_index_expires_after_ttl():
+    """Changes committed elsewhere are picked up once an index expires."""
+    from sqlalchemy import update
+    from quote_system.app.quoting.pricing.seasons import SeasonalRateIndex
+
+    app, db, Supplier, Rate, SeasonalRate = make_rate_app()
+    with app.app_context():
+        db.create_all()
+        rate = Rate(name='Any', start_date=date(2025, 1, 1), end_date=date(2025, 12, 31), base_rate=80.0)
+        rate.seasonal_rates.append(SeasonalRate(season_name='low', multiplier=0.8))
+        db.session.add(rate)
+        db.session.commit()
+
+        cached, expiring = SeasonalRateIndex(), SeasonalRateIndex(ttl=-1)
+        assert cached.multiplier_for(None, date(2025, 3, 1)) == 0.8
+        assert expiring.multiplier_for(None, date(2025, 3, 1)) == 0.8
+
+        # Core statements (or another process) bypass the session events
+        db.session.execute(update(SeasonalRate).values(multiplier=0.7))
+        db.session.commit()
+        assert cached.multiplier_for(None, date(2025, 3, 1)) == 0.8
+        assert expiring.multiplier_for(None, date(2025, 3, 1)) == 0.7
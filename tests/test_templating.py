@@ -0,0 +1,51 @@
+import os
+
+from flask import Flask
+
+from quote_system.app.document_generation import templating
+from quote_system.app.services.pdf_service import PDFService
+
+
+def test_shared_environment_compiles_once_into_bytecode_cache(tmp_path):
+    templates = tmp_path / 'templates'
+    templates.mkdir()
+    (templates / 'quote.html').write_text('<h1>{{ quote.title }}</h1>')
+    (templates / 'broken.html').write_text('{% if %}')
+    templating.configure(str(tmp_path / 'bytecode'))
+    try:
+        env = templating.get_environment(str(templates))
+        assert templating.get_environment(str(templates)) is env
+        assert templating.get_environment(str(templates), autoescape=False) is not env
+
+        assert templating.precompile(env) == 1
+        assert os.listdir(tmp_path / 'bytecode')
+        assert env.get_template('quote.html').render(quote={'title': '<Safari>'}) == '<h1>&lt;Safari&gt;</h1>'
+    finally:
+        templating.configure()
+
+
+
+def test_bytecode_cache_is_never_a_shared_temp_directory(tmp_path):
+    import jinja2
+
+    templating.configure()
+    try:
+        assert templating.bytecode_cache().directory == jinja2.FileSystemBytecodeCache().directory
+
+        app = Flask(__name__, instance_path=str(tmp_path / 'instance'))
+        templating.init_app(app)
+        directory = templating.bytecode_cache().directory
+        assert directory == str(tmp_path / 'instance' / templating.INSTANCE_BYTECODE_CACHE_DIR)
+        assert os.stat(directory).st_mode & 0o077 == 0
+    finally:
+        templating.configure()
+
+def test_voucher_html_is_rendered_once_with_context_processors(tmp_path):
+    (tmp_path / 'voucher.html').write_text('{{ agency }}: {{ booking }} {{ "{{ not a template }}" }}')
+    app = Flask(__name__, template_folder=str(tmp_path))
+    app.context_processor(lambda: {'agency': 'VIV'})
+
+    html = PDFService(app).render_voucher_html('voucher.html', {'booking': 'B-1'})
+
+    # The output is not rendered again as a template
+    assert html == 'VIV: B-1 {{ not a template }}'
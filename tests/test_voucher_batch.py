@@ -0,0 +1,64 @@
+import os
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import jinja2
+
+from quote_system.app.booking.rooming import group_by_supplier, passenger_allocations, room_allocations, split_rooms
+from quote_system.app.document_generation.booking_pack import Voucher, voucher_documents
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'quote_system', 'app', 'templates')
+
+
+def _passengers(count):
+    return [SimpleNamespace(id=i, name=f'Guest {i}', age=30) for i in range(1, count + 1)]
+
+
+def _item(supplier_id, start, end):
+    return SimpleNamespace(supplier_id=supplier_id, start_date=start, end_date=end, notes=None)
+
+
+def test_rooms_are_split_once_and_shared_by_every_stay():
+    passengers = _passengers(3)
+    rooms = split_rooms(passengers)
+    items = [_item(1, date(2026, 5, 1), date(2026, 5, 3)), _item(1, date(2026, 5, 3), date(2026, 5, 5))]
+
+    allocations = room_allocations(items, rooms)
+    by_passenger = passenger_allocations(allocations)
+
+    assert [[p.id for p in room] for room in rooms] == [[1, 2], [3]]
+    assert [a['room_number'] for a in allocations] == ['Room 1', 'Room 2', 'Room 1', 'Room 2']
+    assert allocations[0]['passengers'] is allocations[2]['passengers']
+    assert [a['check_in'] for a in by_passenger[3]] == [date(2026, 5, 1), date(2026, 5, 3)]
+
+
+def test_items_are_grouped_by_supplier_in_order():
+    items = [_item(2, None, None), _item(None, None, None), _item(1, None, None), _item(2, None, None)]
+
+    groups = group_by_supplier(items)
+
+    assert list(groups) == [2, None, 1]
+    assert groups[2] == [items[0], items[3]]
+
+
+def test_voucher_section_uses_passenger_allocations():
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+    passengers = _passengers(2)
+    allocations = room_allocations([_item(7, date(2026, 5, 1), date(2026, 5, 4))], split_rooms(passengers))
+    booking = SimpleNamespace(id=12, created_at=datetime(2026, 4, 1), special_requests=None,
+                              client=SimpleNamespace(name='Ada', email='', phone='', address='', city='', country=''))
+
+    html = env.get_template('booking/voucher/_voucher_section.html').render(
+        booking=booking, passengers=passengers, supplier=SimpleNamespace(name='Lodge One'),
+        room_allocations=allocations, passenger_allocations=passenger_allocations(allocations), datetime=datetime)
+
+    assert 'Lodge One' in html
+    assert html.count('04 May 2026') == 3  # both passengers' rows and the room table
+
+
+def test_voucher_documents_one_pdf_per_supplier():
+    documents = voucher_documents([Voucher('Lodge One', '<p>1</p>', 'k1'), Voucher('Camp/Two', '<p>2</p>')])
+
+    assert [d.filename for d in documents] == ['voucher_Lodge One.pdf', 'voucher_Camp_Two.pdf']
+    assert documents[0].kind == 'voucher_pdf'
+    assert documents[0].payload == {'html': '<p>1</p>', 'name': 'voucher_Lodge One', 'cache_key': 'k1'}